@@ -0,0 +1,60 @@
+"""
+embeddings.py
+Embedding helpers shared by the session_a agents and the session_b RAG scripts.
+
+- load_embedding_model: the sentence-transformer both sessions use
+- LazyEmbeddings: defers loading it until something must be embedded
+- normalize: unit-length rows, so a dot product is the cosine similarity
+
+Only numpy and langchain-core are imported here: torch and
+sentence-transformers load with the model, not with this module.
+"""
+
+import threading
+from typing import Callable
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def load_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL) -> Embeddings:
+    # Imported here: torch and sentence-transformers take seconds to load
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+class LazyEmbeddings(Embeddings):
+    """Builds the wrapped embedding model on first use, so a warm start does not load it."""
+
+    def __init__(self, factory: Callable[[], Embeddings] = load_embedding_model):
+        self.factory = factory
+        self._embeddings = None
+        self._lock = threading.Lock()  # concurrent first calls load the model once
+
+    @property
+    def loaded(self) -> bool:
+        return self._embeddings is not None
+
+    def _model(self) -> Embeddings:
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = self.factory()
+        return self._embeddings
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._model().embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._model().embed_query(text)
+
+
+def normalize(vectors) -> np.ndarray:
+    """float32 rows scaled to unit length (a single vector becomes one row)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
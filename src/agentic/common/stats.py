@@ -0,0 +1,14 @@
+"""
+stats.py
+Latency percentiles with the standard library only.
+"""
+
+import statistics
+
+
+def percentile(values: list[float], q: int) -> float:
+    """Linear-interpolated percentile (numpy's default method), q in 1..99."""
+    values = list(values)
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
@@ -0,0 +1,85 @@
+"""
+streaming.py
+Print a streamed LLM reply as it arrives and measure what the user feels.
+
+For an interactive agent the latency that matters is the time to the first
+token (TTFT), not the time to the last one. `stream_text` consumes a stream
+and returns the full text with, separately:
+- ttft_s: request start -> first non-empty piece
+- tokens_per_s: generation rate after the first piece
+- total_s: request start -> last piece
+
+It accepts LangChain message chunks (`chain.stream(...)`), OpenAI chat
+completion chunks (`stream=True`) and plain strings (a rule-based reply is
+one piece). Token counts are stream pieces: servers send about one token
+per chunk, close enough for a rate.
+"""
+
+import time
+from typing import Iterable, TypedDict
+
+from agentic.common.stats import percentile
+
+
+class StreamStats(TypedDict):
+    ttft_s: float
+    total_s: float
+    tokens: int
+    tokens_per_s: float | None
+
+
+def chunk_text(chunk) -> str:
+    if isinstance(chunk, str):
+        return chunk
+    if hasattr(chunk, "choices"):  # OpenAI ChatCompletionChunk
+        return (chunk.choices[0].delta.content or "") if chunk.choices else ""
+    return getattr(chunk, "content", "") or ""
+
+
+def stream_text(chunks: Iterable | str, start: float | None = None, echo: bool = True) -> tuple[str, StreamStats]:
+    """Print (with `echo`) and join the pieces of a stream; `start` defaults to now."""
+    start = time.perf_counter() if start is None else start
+    if isinstance(chunks, str):
+        chunks = [chunks]
+    parts, first = [], None
+    for chunk in chunks:
+        text = chunk_text(chunk)
+        if not text:
+            continue
+        if first is None:
+            first = time.perf_counter()
+        parts.append(text)
+        if echo:
+            print(text, end="", flush=True)
+    end = time.perf_counter()
+    if echo:
+        print()
+
+    first = end if first is None else first
+    generation = end - first
+    return "".join(parts), {
+        "ttft_s": round(first - start, 3),
+        "total_s": round(end - start, 3),
+        "tokens": len(parts),
+        "tokens_per_s": round((len(parts) - 1) / generation, 1) if len(parts) > 1 and generation > 0 else None,
+    }
+
+
+def format_stats(stats: StreamStats) -> str:
+    rate = f"{stats['tokens_per_s']} tok/s" if stats["tokens_per_s"] else "-- tok/s"
+    return f"⏱️ First token {stats['ttft_s']:.2f}s · {rate} · total {stats['total_s']:.2f}s"
+
+
+def summarize(turns: list[StreamStats]) -> dict:
+    """Median and p95 of TTFT and total latency over the turns of a session."""
+    if not turns:
+        return {"turns": 0}
+    ttft = [t["ttft_s"] for t in turns]
+    total = [t["total_s"] for t in turns]
+    return {
+        "turns": len(turns),
+        "ttft_p50_s": round(percentile(ttft, 50), 3),
+        "ttft_p95_s": round(percentile(ttft, 95), 3),
+        "total_p50_s": round(percentile(total, 50), 3),
+        "total_p95_s": round(percentile(total, 95), 3),
+    }
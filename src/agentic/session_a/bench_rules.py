@@ -0,0 +1,126 @@
+"""
+bench_rules.py
+Per-message latency of the compiled rule matcher against the keyword loop, up to 100k rules.
+
+Rules are synthetic one- to three-word keywords over a made-up vocabulary
+(so most messages contain several of them), with random priorities and a
+mix of whole-word and substring rules. The loop is ReactiveAgent's original
+`keyword in text` scan, timed on fewer messages at the larger sizes. The
+hot reload of the largest rule file is timed while messages keep being matched.
+
+    python src/agentic/session_a/bench_rules.py
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+
+from agentic.common.stats import percentile
+from agentic.session_a.rule_engine import Rule, RuleEngine, RuleMatcher
+
+RULE_COUNTS = [100, 1_000, 10_000, 100_000]
+MESSAGES = 1_000
+LOOP_MESSAGES = 50  # the loop is slow at 100k rules
+WORDS_PER_MESSAGE = 20
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return list({"".join(rng.choices(letters, k=rng.randint(3, 8))) for _ in range(size)})
+
+
+def make_rules(count: int, vocabulary: list[str], rng: random.Random) -> list[Rule]:
+    keywords = set()
+    while len(keywords) < count:
+        keywords.add(" ".join(rng.choices(vocabulary, k=rng.choice([1, 2, 2, 3]))))
+    return [
+        Rule(keyword=keyword, response=f"response {i}", priority=rng.randint(0, 9), whole_word=rng.random() < 0.8)
+        for i, keyword in enumerate(sorted(keywords))
+    ]
+
+
+def keyword_loop(rules: dict[str, str], text: str):
+    """ReactiveAgent.act before the matcher: first rule (dict order) contained in the text."""
+    for keyword, response in rules.items():
+        if keyword in text:
+            return response
+    return None
+
+
+def percentile_us(times: list[float], q: int) -> float:
+    return round(percentile(times, q) * 1e6, 1)
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(20_000, rng)
+    messages = [" ".join(rng.choices(vocabulary, k=WORDS_PER_MESSAGE)) for _ in range(MESSAGES)]
+
+    results = []
+    for count in RULE_COUNTS:
+        rules = make_rules(count, vocabulary, rng)
+
+        # 1️⃣ Compile
+        start = time.perf_counter()
+        matcher = RuleMatcher(rules)
+        build_seconds = time.perf_counter() - start
+
+        # 2️⃣ One scan per message
+        times, matched = [], 0
+        for message in messages:
+            start = time.perf_counter()
+            matched += matcher.match(message) is not None
+            times.append(time.perf_counter() - start)
+
+        # 3️⃣ The keyword loop, for comparison
+        loop_rules = {rule["keyword"]: rule["response"] for rule in rules}
+        loop_times = []
+        for message in messages[:LOOP_MESSAGES]:
+            start = time.perf_counter()
+            keyword_loop(loop_rules, message)
+            loop_times.append(time.perf_counter() - start)
+
+        results.append({
+            "rules": count,
+            "build_s": round(build_seconds, 3),
+            "matched": round(matched / len(messages), 3),
+            "matcher_p50_us": percentile_us(times, 50),
+            "matcher_p95_us": percentile_us(times, 95),
+            "loop_p50_us": percentile_us(loop_times, 50),
+            "loop_p95_us": percentile_us(loop_times, 95),
+        })
+
+    # 4️⃣ Hot reload of the largest rule file: messages keep matching during the recompile
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rules.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(rule) + "\n" for rule in rules)
+        engine = RuleEngine(path, check_interval=0)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(Rule(keyword="brand new rule", response="reloaded", priority=99, whole_word=True)) + "\n")
+
+        start = time.perf_counter()
+        during_reload = []
+        while engine.reloads < 2:
+            message_start = time.perf_counter()
+            engine.match(messages[len(during_reload) % len(messages)])
+            during_reload.append(time.perf_counter() - message_start)
+        reload_seconds = time.perf_counter() - start
+        reloaded = engine.match("a brand new rule")["response"] == "reloaded"
+
+    print(json.dumps({
+        "messages": len(messages),
+        "words_per_message": WORDS_PER_MESSAGE,
+        "results": results,
+        "reload": {
+            "rules": len(rules) + 1,
+            "reload_s": round(reload_seconds, 3),
+            "messages_during_reload": len(during_reload),
+            "p50_us": percentile_us(during_reload, 50),
+            "p95_us": percentile_us(during_reload, 95),
+            "max_ms": round(max(during_reload) * 1000, 1),
+            "new_rule_matched": reloaded,
+        },
+    }, indent=2))
@@ -9,6 +9,7 @@ from langchain_openai import ChatOpenAI
 import os
 from dotenv import load_dotenv
 
+from agentic.common.streaming import format_stats, stream_text
 
 ################################################
 import time
@@ -34,11 +35,12 @@ prompt = PromptTemplate.from_template(
 # --- 3️⃣ Create a RunnableSequence (pipeline) ---
 chain = prompt | llm
 
-# --- 4️⃣ Invoke the chain with input ---
-response = chain.invoke({"topic": "Artificial Intelligence in Education"})
+# --- 4️⃣ Stream the chain output, printing tokens as they arrive ---
+request_start = time.perf_counter()
+response, stats = stream_text(chain.stream({"topic": "Artificial Intelligence in Education"}), request_start)
 
-# --- 5️⃣ Print the model output ---
-print(response.content)
+# --- 5️⃣ Print the latency metrics ---
+print(format_stats(stats))
 
 
 ################################################
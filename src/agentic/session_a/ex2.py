@@ -6,8 +6,12 @@ on predefined rules.
 
 # 
 
+import os
+
+from agentic.session_a.rule_engine import Rule, RuleEngine, RuleMatcher
+
 class ReactiveAgent:
-    def __init__(self):
+    def __init__(self, rules_path=None):
         # Define simple "if → then" rules
         self.rules = {
             "hello": "Hi there! How can I help?",
@@ -15,6 +19,15 @@ class ReactiveAgent:
             "weather": "I can’t see the sky, but it might be sunny!",
             "hungry": "You should eat something healthy!"
         }
+        # All keywords compiled into one matcher: the input is scanned once.
+        # With a rule file (JSON lines), edits to it are picked up while running.
+        if rules_path:
+            self.matcher = RuleEngine(rules_path)
+        else:
+            self.matcher = RuleMatcher([
+                Rule(keyword=keyword, response=response, priority=0, whole_word=False)
+                for keyword, response in self.rules.items()
+            ])
 
     def perceive(self, environment_input: str):
         """Perceive environment (user input)"""
@@ -22,18 +35,18 @@ class ReactiveAgent:
 
     def act(self):
         """React immediately based on current input"""
-        for keyword, response in self.rules.items():
-            if keyword in self.current_input:
-                return response
+        rule = self.matcher.match(self.current_input)
+        if rule:
+            return rule["response"]
         return "I'm not sure how to respond to that."
 
 # --- Usage ---
-agent = ReactiveAgent()
-
-while True:
-    msg = input("You: ")
-    if msg.lower() == "exit":
-        break
-    agent.perceive(msg)
-    print("Agent:", agent.act())
+if __name__ == "__main__":
+    agent = ReactiveAgent(os.getenv("RULES_PATH"))
 
+    while True:
+        msg = input("You: ")
+        if msg.lower() == "exit":
+            break
+        agent.perceive(msg)
+        print("Agent:", agent.act())
@@ -9,6 +9,10 @@ from dotenv import load_dotenv
 from openai import OpenAI
 from datetime import datetime
 
+from agentic.common.embeddings import LazyEmbeddings
+from agentic.session_a.intent_router import LLM_ROUTE, ROUTER_THRESHOLD, IntentRouter
+from agentic.common.streaming import format_stats, stream_text, summarize
+
 # ----------------------------------------------------
 # 1️⃣ Load environment variables
 # ----------------------------------------------------
@@ -32,10 +36,13 @@ class ReactiveLLMAgent:
     and reacts using either built-in logic or a local LLM.
     """
 
-    def __init__(self, llm_client, model):
+    def __init__(self, llm_client, model, stream=True, router=None):
         self.llm_client = llm_client
         self.model = model
+        self.stream = stream  # LLM replies as a generator of text pieces
+        self.router = router  # optional IntentRouter: paraphrases of the rules skip the LLM
         self.message = ""
+        self.last_route = None  # what handled the last message ("weather", "time" or "llm")
 
     def perceive(self, message: str):
         """Process environment input (convert to lowercase for easier matching)."""
@@ -44,11 +51,18 @@ class ReactiveLLMAgent:
     def act(self):
         """Immediate reaction (no memory or planning)."""
         if "weather" in self.message:
-            return self._get_weather()
+            self.last_route = "weather"
         elif "time" in self.message:
-            return self._get_time()
+            self.last_route = "time"
         else:
-            return self._ask_llm()
+            # "is it raining?", "what hour is it": close enough to a rule, no LLM needed
+            routed = self.router.route(self.message) if self.router else None
+            self.last_route = routed[0] if routed else LLM_ROUTE
+        if self.last_route == "weather":
+            return self._get_weather()
+        if self.last_route == "time":
+            return self._get_time()
+        return self._ask_llm()
 
     def _get_weather(self):
         """Fake weather API (example placeholder)."""
@@ -66,27 +80,52 @@ class ReactiveLLMAgent:
             messages=[
                 {"role": "system", "content": "You are a concise and helpful assistant."},
                 {"role": "user", "content": self.message}
-            ]
+            ],
+            stream=self.stream,
         )
+        if self.stream:
+            # Pieces of the reply as the server sends them
+            return (chunk.choices[0].delta.content or "" for chunk in response if chunk.choices)
         return response.choices[0].message.content
 
+def build_intent_router(embeddings, threshold=ROUTER_THRESHOLD):
+    """Exemplars of the agent's built-in reactions, and of requests for the LLM."""
+    router = IntentRouter(embeddings, threshold=threshold)
+    router.add("weather", ["is it raining", "is it hot outside", "how cold is it today", "do I need an umbrella"])
+    router.add("time", ["what hour is it", "tell me the current hour", "is it late already", "what's the clock say"])
+    router.add(LLM_ROUTE, ["write a poem about the sea", "explain how to cook pasta", "hello how are you",
+                           "what is the capital of France"])
+    return router
+
 # ----------------------------------------------------
 # 4️⃣ Run the agent interactively
 # ----------------------------------------------------
 if __name__ == "__main__":
-    agent = ReactiveLLMAgent(client, OPENAI_MODEL_NAME)
+    router = None
+    if os.getenv("INTENT_ROUTER", "1") == "1":
+        # The embedding model loads on the first message the rules miss
+        router = build_intent_router(
+            LazyEmbeddings(), float(os.getenv("INTENT_THRESHOLD", ROUTER_THRESHOLD))
+        )
+    agent = ReactiveLLMAgent(client, OPENAI_MODEL_NAME, router=router)
     print("🤖 Reactive LLM Agent ready (type 'exit' to quit)\n")
+    turns = []  # latency metrics of every turn
 
     while True:
         user_input = input("You: ")
         if user_input.lower() == "exit":
+            print(f"📊 Latency: {summarize(turns)}")
+            if router:
+                print(f"🧭 Intent router: {router.stats()}")
             print("👋 Goodbye!")
             break
 
-        start = time.time()
+        start = time.perf_counter()
         agent.perceive(user_input)
-        response = agent.act()
-        end = time.time()
-
-        print(f"Agent: {response}")
-        print(f"(⏱️ Response time: {end - start:.2f} seconds)\n")
+        print("Agent: ", end="", flush=True)
+        # Rule replies are a single piece, LLM replies are printed as they stream
+        response, stats = stream_text(agent.act(), start)
+        turns.append(stats)
+        if router and agent.last_route == LLM_ROUTE:
+            router.record_llm(stats["total_s"])
+        print(f"({format_stats(stats)})\n")
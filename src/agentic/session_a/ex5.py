@@ -15,9 +15,10 @@ from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
 from langchain.agents.react.agent import create_react_agent
 from langchain.agents import AgentExecutor
-from langchain.memory import ConversationBufferMemory
 from langchain.prompts import PromptTemplate
 
+from agentic.session_b.session_store import SessionStore
+
 # ----------------------------------------------------
 # 1️⃣ Load environment variables
 # ----------------------------------------------------
@@ -54,7 +55,17 @@ tools = [get_time, get_weather]
 # ----------------------------------------------------
 # 4️⃣ Add conversational memory
 # ----------------------------------------------------
-memory = ConversationBufferMemory(memory_key="chat_history")
+# Per-session memory on SQLite (survives restarts): recent turns within a
+# token budget, older turns folded into a running summary
+session_store = SessionStore(os.getenv("MEMORY_DB", "memory_db"))
+session_id = os.getenv("SESSION_ID", "default")
+memory = session_store.memory(
+    session_id,
+    llm,
+    memory_key="chat_history",
+    max_tokens=int(os.getenv("MEMORY_TOKEN_BUDGET", "1000")),
+    model=OPENAI_MODEL_NAME,
+)
 
 # ----------------------------------------------------
 # 5️⃣ Define a compatible ReAct prompt
@@ -103,7 +114,7 @@ executor = AgentExecutor(
 # 7️⃣ Run interactively
 # ----------------------------------------------------
 if __name__ == "__main__":
-    print("🧠 Goal-Driven Agent with Memory and Tools (type 'exit' to quit)\n")
+    print(f"🧠 Goal-Driven Agent with Memory and Tools, session '{session_id}' (type 'exit' to quit)\n")
     while True:
         user_input = input("You: ")
         if user_input.lower() == "exit":
@@ -9,12 +9,22 @@ Ex6. Agent that can decide to use tools
 
 import os
 import json
-import requests
+import inspect
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 from functools import wraps
+from urllib.parse import quote
 from dotenv import load_dotenv
 from datetime import datetime
 from openai import OpenAI
 
+from agentic.session_a.http_tools import ToolHTTPClient, request_deadline
+from agentic.session_a.intent_router import LLM_ROUTE, ROUTER_THRESHOLD, IntentRouter
+from agentic.session_a.tool_cache import ToolCache, default_key
+from agentic.common.embeddings import LazyEmbeddings
+
 
 # 1️⃣ Load environment
 load_dotenv()
@@ -22,6 +32,10 @@ OPENAI_ENDPOINT = os.getenv("OPENAI_ENDPOINT")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME")
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
+# API base URLs, overridable (e.g. to point the tools at a local stub server)
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "https://api.openweathermap.org/data/2.5/weather")
+JOKE_API_URL = os.getenv("JOKE_API_URL", "https://v2.jokeapi.dev/joke/Programming")
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "https://en.wikipedia.org/api/rest_v1/page/summary")
 
 # 2️⃣ Connect to local LLM (LiteLLM)
 client = OpenAI(base_url=OPENAI_ENDPOINT, api_key=OPENAI_API_KEY)
@@ -31,38 +45,105 @@ client = OpenAI(base_url=OPENAI_ENDPOINT, api_key=OPENAI_API_KEY)
 # 3️⃣ Global registry
 TOOLS = {}
 
-def tool(name=None, description=None):
+# Shared HTTP layer: pooled keep-alive connections, timeouts, retries, per-host stats
+http_client = ToolHTTPClient()
+
+# Shared result cache: in-memory LRU, on disk too when TOOL_CACHE_PATH is set
+tool_cache = ToolCache(disk_path=os.getenv("TOOL_CACHE_PATH"))
+
+def not_an_error(result):
+    """Tools report failures as "⚠️ ..." text: those are never cached."""
+    return not str(result).startswith("⚠️")
+
+# Seconds a tool call may run: by default the HTTP client's worst case
+# (every attempt timing out, plus the backoff sleeps), so a healthy call that
+# is retrying is not reported as timed out
+DEFAULT_TOOL_TIMEOUT = http_client.total_budget()
+# Extra wait for a result after its deadline: requests stop at the deadline themselves
+DEADLINE_GRACE = 0.5
+# Most tool calls run for one decision
+MAX_PLAN_CALLS = 8
+
+def tool(
+    name=None, description=None, ttl=None, stale_ttl=0, key=default_key, timeout=DEFAULT_TOOL_TIMEOUT,
+    examples=None, extract=None,
+):
     """
     Decorator to register a function as a tool with metadata.
+    A tool with an `http` parameter gets the shared `http_client` injected.
+    With a `ttl` (seconds) its results are cached per `key(arguments)`, and
+    served up to `stale_ttl` seconds longer while refreshed in the background.
+    Tools with side effects (or random output) leave `ttl` unset.
+    `timeout` bounds the tool call: its HTTP requests stop at that deadline.
+    `examples` (typical requests) and `extract` (text -> args, or None) let
+    the intent router call the tool without asking the LLM.
     """
     def decorator(func):
         tool_name = name or func.__name__
         doc = description or func.__doc__ or "No description"
-        TOOLS[tool_name] = {
-            "func": func,
-            "description": doc.strip()
-        }
+        signature = inspect.signature(func)
+        needs_http = "http" in signature.parameters
         @wraps(func)
         def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
+            if needs_http:
+                kwargs.setdefault("http", http_client)
+            if ttl is None:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k != "http"}
+            return tool_cache.call(
+                tool_name, lambda: func(*args, **kwargs), arguments,
+                ttl=ttl, stale_ttl=stale_ttl, key=key, should_cache=not_an_error,
+            )
+        TOOLS[tool_name] = {
+            "func": wrapper,
+            "description": doc.strip(),
+            "timeout": timeout,
+            "examples": examples or [],
+            "extract": extract,
+        }
         return wrapper
     return decorator
 
+# Cheap argument patterns for the intent router's fast path
+CITY_PATTERN = re.compile(r"\b(?:in|for|at)\s+([A-Za-z][A-Za-z .'-]*?)\s*(?:\b(?:today|now|tomorrow)\b|[?.!]|$)", re.IGNORECASE)
+TOPIC_PATTERN = re.compile(
+    r"^(?:who (?:is|was)|what (?:is|are|was)|tell me about|search wikipedia for|wikipedia)\s+(?:an?\s+|the\s+)?(.+?)[?.!]*$",
+    re.IGNORECASE,
+)
+
+def extract_city(text):
+    match = CITY_PATTERN.search(text)
+    return {"city": match.group(1).strip()} if match else {}  # no city: the tool's default
+
+def extract_topic(text):
+    match = TOPIC_PATTERN.search(text.strip())
+    return {"topic": match.group(1).strip()} if match else None
+
 # 4️⃣ Define REAL tools
-@tool(description="Get the current local time.")
+@tool(
+    description="Get the current local time.",
+    examples=["what time is it", "tell me the current time", "what's the time now", "current local time"],
+)
 def get_time():
     """Return the current time in local timezone."""
     return f"🕒 Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}."
 
-@tool(description="Get the current weather for a city using OpenWeather API.")
-def weather(city: str = "Athens"):
+@tool(
+    description="Get the current weather for a city using OpenWeather API.",
+    ttl=600, stale_ttl=3600,
+    key=lambda arguments: arguments["city"].strip().lower(),
+    examples=["what's the weather in Paris", "weather in Athens", "is it raining in London",
+              "how hot is it in Madrid today", "temperature in Berlin"],
+    extract=extract_city,
+)
+def weather(city: str = "Athens", http=None):
     """Fetch real weather data."""
     if not OPENWEATHER_API_KEY:
         return "⚠️ Missing OpenWeather API key."
     try:
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
-        r = requests.get(url)
-        data = r.json()
+        data = http.get_json(WEATHER_API_URL, params={"q": city, "appid": OPENWEATHER_API_KEY, "units": "metric"})
         if data.get("cod") != 200:
             return f"⚠️ Weather not found for {city}."
         desc = data["weather"][0]["description"]
@@ -71,36 +152,62 @@ def weather(city: str = "Athens"):
     except Exception as e:
         return f"⚠️ Error fetching weather: {e}"
 
-@tool(description="Get a random joke from the official JokeAPI.")
-def joke():
+@tool(
+    description="Get a random joke from the official JokeAPI.",
+    examples=["tell me a joke", "make me laugh", "say something funny", "tell me a programming joke"],
+)
+def joke(http=None):
     """Fetch a random programming joke."""
     try:
-        r = requests.get("https://v2.jokeapi.dev/joke/Programming?type=single")
-        data = r.json()
+        data = http.get_json(JOKE_API_URL, params={"type": "single"})
         return "😂 " + data.get("joke", "Couldn't get a joke.")
     except Exception as e:
         return f"⚠️ Error fetching joke: {e}"
 
-@tool(description="Search a short Wikipedia summary for a topic.")
-def wikipedia_search(topic: str):
+@tool(
+    description="Search a short Wikipedia summary for a topic.",
+    ttl=24 * 3600, stale_ttl=7 * 24 * 3600,
+    key=lambda arguments: arguments["topic"].strip().lower(),
+    examples=["who was Alan Turing", "tell me about the Roman Empire", "what is photosynthesis",
+              "search wikipedia for Python"],
+    extract=extract_topic,
+)
+def wikipedia_search(topic: str, http=None):
     """Fetch a short summary from Wikipedia."""
     try:
-        r = requests.get(f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic}")
-        data = r.json()
+        data = http.get_json(f"{WIKIPEDIA_API_URL}/{quote(topic.replace(' ', '_'))}")
         if "extract" in data:
             return f"📚 {data['title']}: {data['extract']}"
         return "⚠️ No summary found."
     except Exception as e:
         return f"⚠️ Error: {e}"
 
+# Requests that look like chat, not like a tool call: always the LLM
+GENERAL_EXAMPLES = [
+    "write a poem about the sea", "help me plan my week", "explain how to cook pasta",
+    "hello how are you", "can you help me write an email", "what do you think about that",
+]
+
+def build_intent_router(embeddings, threshold=ROUTER_THRESHOLD):
+    """Router over the registered tools that declare examples."""
+    router = IntentRouter(embeddings, threshold=threshold)
+    for name, meta in TOOLS.items():
+        if meta["examples"]:
+            router.add(name, meta["examples"], meta["extract"])
+    router.add(LLM_ROUTE, GENERAL_EXAMPLES)
+    return router
+
 # 5️⃣ Agent Class
 class ToolAgent:
-    def __init__(self, client, model):
+    def __init__(self, client, model, max_workers=8, router=None):
         self.client = client
         self.model = model
+        self.router = router  # optional IntentRouter fast path
+        # Runs the calls of a multi-tool plan side by side
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
 
     def decide_action(self, user_input):
-        """Ask LLM which tool to use."""
+        """Ask LLM which tool(s) to use."""
         tool_descriptions = "\n".join(
             [f"- {name}: {meta['description']}" for name, meta in TOOLS.items()]
         )
@@ -114,6 +221,10 @@ class ToolAgent:
         When user input matches a tool, respond **only** in JSON like:
         {{"tool": "weather", "args": {{"city": "Athens"}}}}
 
+        When it needs several tools (or one tool several times), respond
+        **only** with a JSON list of calls, they run at the same time:
+        [{{"tool": "weather", "args": {{"city": "Athens"}}}}, {{"tool": "weather", "args": {{"city": "Paris"}}}}, {{"tool": "joke", "args": {{}}}}]
+
         Otherwise, respond in plain text.
      
         """
@@ -128,33 +239,96 @@ class ToolAgent:
         )
         return response.choices[0].message.content.strip()
 
+    @staticmethod
+    def malformed(call):
+        """Why `call` is not a {"tool": name, "args": {...}} object, or None if it is."""
+        if not isinstance(call, dict):
+            return f"⚠️ Malformed tool call (not an object): {json.dumps(call, ensure_ascii=False)}"
+        if not isinstance(call.get("tool"), str):
+            return f"⚠️ Malformed tool call (no \"tool\" name): {json.dumps(call, ensure_ascii=False)}"
+        if not isinstance(call.get("args", {}), dict):
+            return f"⚠️ Malformed tool call (\"args\" is not an object): {json.dumps(call, ensure_ascii=False)}"
+        return None
+
+    def _call(self, call, deadline=None):
+        """Run one {"tool", "args"} call, errors as text; its requests end by `deadline` (time.monotonic())."""
+        tool_name = call["tool"]
+        if tool_name not in TOOLS:
+            return f"⚠️ Unknown tool: {tool_name}"
+        try:
+            with request_deadline(deadline):
+                return f"(Used {tool_name}) {TOOLS[tool_name]['func'](**call.get('args', {}))}"
+        except Exception as e:
+            return f"⚠️ Tool error: {e}"
+
+    def run_calls(self, calls):
+        """Run the calls side by side, each bounded by its tool's timeout; results in call order."""
+        start = time.monotonic()
+        jobs = []  # (call, timeout, future), or (error text, None, None) for a malformed call
+        for call in calls:
+            error = self.malformed(call)
+            if error:
+                jobs.append((error, None, None))
+                continue
+            timeout = TOOLS.get(call["tool"], {}).get("timeout", DEFAULT_TOOL_TIMEOUT)
+            jobs.append((call, timeout, self.pool.submit(self._call, call, start + timeout)))
+        results = []
+        for call, timeout, future in jobs:
+            if future is None:
+                results.append(call)
+                continue
+            try:
+                results.append(future.result(timeout=max(0, start + timeout + DEADLINE_GRACE - time.monotonic())))
+            except FutureTimeout:
+                future.cancel()  # still queued behind slow calls: never starts
+                results.append(f"⚠️ {call['tool']} timed out after {timeout:g}s")
+        return "\n".join(results)
+
     def execute(self, decision):
-        """Run tool or return text."""
+        """Run the tool call(s) of a decision, or return its text."""
         try:
             data = json.loads(decision)
-            tool_name = data.get("tool")
-            args = data.get("args", {})
-            if tool_name in TOOLS:
-                func = TOOLS[tool_name]["func"]
-                result = func(**args)
-                return f"(Used {tool_name}) {result}"
         except json.JSONDecodeError:
             # Plain text response
             return decision
-        except Exception as e:
-            return f"⚠️ Tool error: {e}"
+        if not isinstance(data, (dict, list)) or not data:
+            return decision  # a bare JSON string or number is text too
+        calls = data if isinstance(data, list) else [data]
+        # One call or a plan: the same deadlines either way; malformed calls are reported
+        return self.run_calls(calls[:MAX_PLAN_CALLS])
 
     def run(self, query):
+        # Fast path: an obvious single-tool request skips the LLM decision
+        routed = self.router.route(query) if self.router else None
+        if routed:
+            tool_name, args = routed
+            return self.run_calls([{"tool": tool_name, "args": args}])
+
+        start = time.perf_counter()
         decision = self.decide_action(query)
+        if self.router:
+            self.router.record_llm(time.perf_counter() - start)
         return self.execute(decision)
 
 # 6️⃣ Interactive Loop
 if __name__ == "__main__":
-    agent = ToolAgent(client, OPENAI_MODEL_NAME)
+    router = None
+    if os.getenv("INTENT_ROUTER", "1") == "1":
+        # The embedding model loads on the first question, not at startup
+        router = build_intent_router(
+            LazyEmbeddings(), float(os.getenv("INTENT_THRESHOLD", ROUTER_THRESHOLD))
+        )
+    agent = ToolAgent(client, OPENAI_MODEL_NAME, router=router)
     print("🤖 Smart Tool Agent ready. Type 'exit' to quit.\n")
 
     while True:
         user = input("You: ")
         if user.lower() in ["exit", "quit"]:
+            print(f"🌐 HTTP per host: {http_client.stats()}")
+            print(f"🗃️ Tool cache: {tool_cache.stats()}")
+            if router:
+                print(f"🧭 Intent router: {router.stats()}")
+            tool_cache.close()
+            http_client.close()
             break
         print("Agent:", agent.run(user), "\n")
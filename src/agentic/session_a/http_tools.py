@@ -0,0 +1,234 @@
+"""
+http_tools.py
+Shared HTTP layer for tools that call real APIs (weather, jokes, Wikipedia).
+
+A bare `requests.get` per call opens a new connection every time (DNS, TCP
+and TLS handshakes) and has no timeout, so a slow upstream hangs the agent.
+ToolHTTPClient gives every tool:
+- one pooled keep-alive session: connections are reused per host
+- connect / read timeouts on every request
+- bounded retries with jittered exponential backoff, only for idempotent GETs
+  and only on connection errors, timeouts, 429 and 5xx
+- per-host latency stats (`stats()`)
+- an optional deadline (`request_deadline`) that attempts, retries and
+  backoff sleeps never run past, so a caller's timeout really stops the work
+
+AsyncToolHTTPClient is the same on httpx.AsyncClient, for asyncio callers.
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from agentic.common.stats import percentile
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 10.0)
+# Responses worth retrying: rate limited or upstream trouble
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Latencies kept per host for the percentiles
+MAX_SAMPLES = 1000
+# Longest backoff sleep between two attempts
+BACKOFF_CAP = 4.0
+
+# time.monotonic() after which no request of the current call may run
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("tool_deadline", default=None)
+
+
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = BACKOFF_CAP) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+@contextmanager
+def request_deadline(deadline: float | None):
+    """Bound every request made inside the block by an absolute time.monotonic() deadline."""
+    outer = _deadline.get()
+    if deadline is not None and outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline if deadline is not None else outer)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _attempt_timeout(timeout, deadline: float | None):
+    """The (connect, read) timeout of one attempt, cut to the time left before the deadline."""
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return min(connect, remaining), min(read, remaining)
+
+
+def total_budget(timeout: tuple[float, float], retries: int, backoff: float) -> float:
+    """Worst-case seconds of one get(): every attempt timing out, plus the longest backoff sleeps."""
+    return (sum(timeout) * (retries + 1)
+            + sum(min(BACKOFF_CAP, backoff * 2 ** attempt) for attempt in range(retries)))
+
+
+class HostStats:
+    """Thread-safe per-host request counters and latencies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict] = {}
+
+    def record(self, url: str, seconds: float, ok: bool, retry: bool):
+        host = urlsplit(url).netloc
+        with self._lock:
+            entry = self._hosts.setdefault(
+                host, {"requests": 0, "errors": 0, "retries": 0, "latencies": deque(maxlen=MAX_SAMPLES)}
+            )
+            entry["requests"] += 1
+            entry["errors"] += not ok
+            entry["retries"] += retry
+            entry["latencies"].append(seconds)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            hosts = {host: {**entry, "latencies": list(entry["latencies"])} for host, entry in self._hosts.items()}
+        return {
+            host: {
+                "requests": entry["requests"],
+                "errors": entry["errors"],
+                "retries": entry["retries"],
+                "p50_ms": round(percentile(entry["latencies"], 50) * 1000, 1),
+                "p95_ms": round(percentile(entry["latencies"], 95) * 1000, 1),
+            }
+            for host, entry in hosts.items()
+        }
+
+
+class ToolHTTPClient:
+    """Pooled, keep-alive `requests` session with timeouts, retries and stats."""
+
+    def __init__(
+        self,
+        timeout: tuple[float, float] = DEFAULT_TIMEOUT,
+        retries: int = 2,
+        backoff: float = 0.25,
+        pool_maxsize: int = 10,
+        user_agent: str = "agentic-tools/1.0",
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.host_stats = HostStats()
+        self.session = requests.Session()
+        # Retries are done below (with stats), not by urllib3
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = user_agent
+
+    def total_budget(self) -> float:
+        return total_budget(self.timeout, self.retries, self.backoff)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET with retries; the last response (even 429/5xx) is returned, the last exception raised."""
+        timeout = kwargs.pop("timeout", self.timeout)
+        deadline = _deadline.get()
+        for attempt in range(self.retries + 1):
+            attempt_timeout = _attempt_timeout(timeout, deadline)
+            if attempt_timeout is None:
+                raise requests.Timeout(f"Deadline reached before requesting {url}")
+            start = time.perf_counter()
+            response, error = None, None
+            try:
+                response = self.session.get(url, timeout=attempt_timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            retryable = response is None or response.status_code in RETRY_STATUSES
+            self.host_stats.record(url, time.perf_counter() - start, ok=not retryable, retry=attempt > 0)
+            delay = backoff_delay(attempt, self.backoff)
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+            if not retryable or attempt == self.retries or out_of_time:
+                if response is None:
+                    raise error
+                return response
+            time.sleep(delay)
+
+    def get_json(self, url: str, **kwargs):
+        return self.get(url, **kwargs).json()
+
+    def stats(self) -> dict[str, dict]:
+        return self.host_stats.snapshot()
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncToolHTTPClient:
+    """The asyncio variant, on a pooled httpx.AsyncClient."""
+
+    def __init__(
+        self,
+        timeout: tuple[float, float] = DEFAULT_TIMEOUT,
+        retries: int = 2,
+        backoff: float = 0.25,
+        max_connections: int = 20,
+        user_agent: str = "agentic-tools/1.0",
+    ):
+        # Imported here: only asyncio callers need httpx
+        import httpx
+
+        self._httpx = httpx
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.host_stats = HostStats()
+        connect, read = timeout
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={"User-Agent": user_agent},
+        )
+
+    def total_budget(self) -> float:
+        return total_budget(self.timeout, self.retries, self.backoff)
+
+    async def get(self, url: str, **kwargs):
+        deadline = _deadline.get()
+        for attempt in range(self.retries + 1):
+            attempt_timeout = _attempt_timeout(self.timeout, deadline)
+            if attempt_timeout is None:
+                raise self._httpx.TimeoutException(f"Deadline reached before requesting {url}")
+            if deadline is not None:
+                connect, read = attempt_timeout
+                kwargs["timeout"] = self._httpx.Timeout(read, connect=connect)
+            start = time.perf_counter()
+            response, error = None, None
+            try:
+                response = await self.client.get(url, **kwargs)
+            except (self._httpx.TransportError, self._httpx.TimeoutException) as e:
+                error = e
+            retryable = response is None or response.status_code in RETRY_STATUSES
+            self.host_stats.record(url, time.perf_counter() - start, ok=not retryable, retry=attempt > 0)
+            delay = backoff_delay(attempt, self.backoff)
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+            if not retryable or attempt == self.retries or out_of_time:
+                if response is None:
+                    raise error
+                return response
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, **kwargs):
+        return (await self.get(url, **kwargs)).json()
+
+    def stats(self) -> dict[str, dict]:
+        return self.host_stats.snapshot()
+
+    async def aclose(self):
+        await self.client.aclose()
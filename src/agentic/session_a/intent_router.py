@@ -0,0 +1,122 @@
+"""
+intent_router.py
+Local fast path for obvious tool requests: embedding similarity, no LLM call.
+
+Every input used to cost a full LLM completion just to decide the route,
+even "what time is it". IntentRouter embeds the input with a small
+sentence-transformer and compares it with precomputed exemplar embeddings
+of each route:
+#1. Best route above `threshold` (and ahead of the runner-up by `margin`)
+    whose arguments the route's cheap `extract` pattern can fill: dispatch
+    directly
+#2. Anything else (low similarity, the "llm" route, compound requests such
+    as "weather in Athens and a joke", arguments not found): fall back to
+    the LLM as before
+
+`stats()` reports the share of requests served without the LLM and the
+latency saved: fast-path requests times the mean LLM decision time, minus
+the time spent routing every request. Loading the model and embedding the
+exemplars (`warm()`, once, on first use) is reported apart as `warmup_s`.
+"""
+
+import re
+import time
+from typing import Callable
+
+from agentic.common.embeddings import normalize
+
+# Route whose exemplars mean "let the LLM handle it"
+LLM_ROUTE = "llm"
+# Minimum cosine similarity to an exemplar for the fast path
+ROUTER_THRESHOLD = 0.7
+# Several requests in one input: leave the plan to the LLM
+COMPOUND_REQUEST = re.compile(r"\b(?:and|plus|also|then)\b|[,;&]", re.IGNORECASE)
+
+
+class IntentRouter:
+    """Nearest-exemplar router over named routes, with fast-path metrics."""
+
+    def __init__(self, embeddings, threshold: float = ROUTER_THRESHOLD, margin: float = 0.05):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.margin = margin
+        self.routes: dict[str, Callable[[str], dict | None] | None] = {}
+        self._exemplars: list[tuple[str, str]] = []  # (route, text)
+        self._matrix = None
+        self.enabled = True
+        self.requests = 0
+        self.fast_path = 0
+        self.route_seconds = 0.0
+        self.warmup_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def add(self, name: str, exemplars: list[str], extract: Callable[[str], dict | None] | None = None):
+        """Register a route; `extract(text)` returns its arguments, or None to fall back."""
+        self.routes[name] = extract
+        self._exemplars.extend((name, text) for text in exemplars)
+        self._matrix = None  # re-embedded on next use
+
+    def warm(self):
+        """Embed the exemplars (loading the model on first use), outside the routing time."""
+        if self._matrix is None and self._exemplars:
+            start = time.perf_counter()
+            try:
+                self._matrix = normalize(self.embeddings.embed_documents([t for _, t in self._exemplars]))
+            finally:
+                self.warmup_seconds += time.perf_counter() - start
+
+    def route(self, text: str) -> tuple[str, dict] | None:
+        """(route, arguments) for a fast-path dispatch, or None to ask the LLM."""
+        if not self.enabled or not self._exemplars:
+            return None
+        self.requests += 1
+        start, warmup = time.perf_counter(), self.warmup_seconds
+        try:
+            decision = self._decide(text)
+        except Exception as e:
+            # No local model (e.g. offline): keep working through the LLM only
+            print(f"⚠️ Intent router disabled: {e!r}")
+            self.enabled = False
+            decision = None
+        # The one-off model load is not routing time
+        self.route_seconds += time.perf_counter() - start - (self.warmup_seconds - warmup)
+        if decision is not None:
+            self.fast_path += 1
+        return decision
+
+    def _decide(self, text: str) -> tuple[str, dict] | None:
+        if COMPOUND_REQUEST.search(text):
+            return None
+        self.warm()
+        scores = self._matrix @ normalize(self.embeddings.embed_query(text))[0]
+
+        # Best exemplar score per route
+        best: dict[str, float] = {}
+        for (name, _), score in zip(self._exemplars, scores):
+            best[name] = max(best.get(name, -1.0), float(score))
+        ranked = sorted(best.items(), key=lambda item: -item[1])
+        name, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if name == LLM_ROUTE or score < self.threshold or score - runner_up < self.margin:
+            return None
+
+        extract = self.routes[name]
+        arguments = extract(text) if extract else {}
+        return None if arguments is None else (name, arguments)
+
+    def record_llm(self, seconds: float):
+        """Time of an LLM call the router could not avoid (to estimate what a fast path saves)."""
+        self.llm_calls += 1
+        self.llm_seconds += seconds
+
+    def stats(self) -> dict:
+        mean_llm = self.llm_seconds / self.llm_calls if self.llm_calls else None
+        return {
+            "requests": self.requests,
+            "without_llm": round(self.fast_path / self.requests, 3) if self.requests else 0.0,
+            "routing_ms_per_request": round(self.route_seconds * 1000 / self.requests, 2) if self.requests else None,
+            "warmup_s": round(self.warmup_seconds, 2),
+            "mean_llm_s": round(mean_llm, 3) if mean_llm is not None else None,
+            "saved_s": round(self.fast_path * mean_llm - self.route_seconds, 2) if mean_llm is not None else None,
+        }
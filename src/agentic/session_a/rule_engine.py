@@ -0,0 +1,186 @@
+"""
+rule_engine.py
+Compiled multi-pattern matcher for keyword -> response rules (Aho-Corasick).
+
+ReactiveAgent used to test `keyword in text` for every rule: O(rules x input
+length) per message, and the winner depended on dict order. RuleMatcher
+compiles all keywords into one Aho-Corasick automaton:
+#1. The input is scanned once, whatever the number of rules
+#2. Every keyword occurrence is seen; the winner is the highest `priority`,
+    ties going to the rule listed first
+#3. `whole_word` rules only match between word boundaries ("hi" is not
+    found in "this")
+
+RuleEngine adds a rule file (JSON lines) that is reloaded when it changes,
+without restarting the agent:
+
+    {"keyword": "hello", "response": "Hi there!", "priority": 0, "whole_word": true}
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import TypedDict
+
+# Shared by every node without transitions or rules (most of them: the leaves)
+NO_TRANSITIONS: dict[str, int] = {}
+NO_RULES: tuple[int, ...] = ()
+
+
+class Rule(TypedDict):
+    keyword: str
+    response: str
+    priority: int
+    whole_word: bool
+
+
+def load_rules(path: str) -> list[Rule]:
+    """Rules of a JSON-lines file, in file order (blank lines skipped)."""
+    rules = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if not entry.get("keyword"):
+                raise ValueError(f"{path}:{number}: rule without a keyword")
+            rules.append(Rule(
+                keyword=entry["keyword"],
+                response=entry["response"],
+                priority=int(entry.get("priority", 0)),
+                whole_word=bool(entry.get("whole_word", True)),
+            ))
+    return rules
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class RuleMatcher:
+    """Aho-Corasick automaton over the (lowercased) keywords of a rule list."""
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = list(rules)
+        # Rank of each rule: lower wins (higher priority, then earlier in the list)
+        order = sorted(range(len(self.rules)), key=lambda i: (-self.rules[i]["priority"], i))
+        self._rank = [0] * len(self.rules)
+        for rank, i in enumerate(order):
+            self._rank[i] = rank
+        self._lengths = [len(rule["keyword"]) for rule in self.rules]
+        self._whole_word = [rule["whole_word"] for rule in self.rules]
+
+        # 1️⃣ Trie of the keywords
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for i, rule in enumerate(self.rules):
+            node = 0
+            for char in rule["keyword"].lower():
+                next_node = goto[node].get(char)
+                if next_node is None:
+                    next_node = goto[node][char] = len(goto)
+                    goto.append({})
+                    out.append([])
+                node = next_node
+            out[node].append(i)
+
+        # 2️⃣ Failure links (longest proper suffix that is also in the trie), breadth first,
+        #    and output links (nearest suffix node that ends a keyword)
+        fail = [0] * len(goto)
+        link = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                link[child] = fail[child] if out[fail[child]] else link[fail[child]]
+                queue.append(child)
+
+        self._goto = [transitions or NO_TRANSITIONS for transitions in goto]
+        # Best rule first at each node, so a scan can stop at the first acceptable one
+        self._out = [tuple(sorted(rules, key=self._rank.__getitem__)) if rules else NO_RULES for rules in out]
+        self._fail = fail
+        self._link = link
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, text: str) -> Rule | None:
+        """Winning rule for `text` (one pass over it), or None."""
+        text = text.lower()
+        goto, fail, out, link = self._goto, self._fail, self._out, self._link
+        rank, lengths, whole_word = self._rank, self._lengths, self._whole_word
+        best = None
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            hit = node if out[node] else link[node]
+            while hit:
+                for i in out[hit]:
+                    if best is not None and rank[i] >= rank[best]:
+                        break
+                    if whole_word[i]:
+                        start = end - lengths[i]
+                        if (start > 0 and _is_word_char(text[start - 1])) or (end < len(text) and _is_word_char(text[end])):
+                            continue
+                    best = i
+                    break
+                hit = link[hit]
+        return None if best is None else self.rules[best]
+
+
+class RuleEngine:
+    """RuleMatcher over a rule file, recompiled in the background when the file changes."""
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval  # seconds between two stat() calls
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = time.monotonic()
+        self.matcher = RuleMatcher([])
+        self.reloads = 0
+        if self._file_signature() is None:
+            print(f"⚠️ Rule file not found: {path} (no rules until it exists)")
+        self.reload_if_changed()
+
+    def _file_signature(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> bool:
+        """Recompile if the file changed; a missing or broken file keeps the current rules."""
+        with self._lock:
+            signature = self._file_signature()
+            if signature == self._signature:
+                return False
+            # Reported once per version of the file, not on every check
+            self._signature = signature
+            try:
+                matcher = RuleMatcher(load_rules(self.path))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Rules not reloaded from {self.path}: {e}")
+                return False
+            # Matching threads keep the old automaton until this assignment
+            self.matcher = matcher
+            self.reloads += 1
+            return True
+
+    def match(self, text: str) -> Rule | None:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            # A big rule file takes seconds to compile: never on the message's time
+            if self._file_signature() != self._signature and not self._lock.locked():
+                threading.Thread(target=self.reload_if_changed, daemon=True).start()
+        return self.matcher.match(text)
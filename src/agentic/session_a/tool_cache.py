@@ -0,0 +1,156 @@
+"""
+tool_cache.py
+TTL result cache with stale-while-revalidate for agent tools.
+
+Asking twice for the weather in Athens, or for the same Wikipedia topic,
+called the external API twice. ToolCache sits behind the `@tool` registry:
+- each tool declares a `ttl` (seconds a result is fresh), a `stale_ttl`
+  (extra seconds a stale result may still be served) and a key function
+  of its arguments; tools without a ttl (side effects, random output) are
+  never cached
+- fresh hit: returned from an in-memory LRU (a dict lookup, microseconds)
+- stale hit: returned at once, and one background refresh is started
+- miss (or too stale): the tool runs and its result is stored
+- an optional on-disk tier (SQLite) keeps results across restarts; rows
+  past their ttl + stale_ttl are deleted when it is opened and every
+  PURGE_EVERY_WRITES writes
+- per-tool hit / stale / miss / refresh counters (`stats()`)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# Expired disk rows are also deleted every this many writes, not only on open
+PURGE_EVERY_WRITES = 256
+
+
+def default_key(arguments: dict) -> str:
+    return json.dumps(arguments, sort_keys=True, default=str)
+
+
+class ToolCache:
+    """In-memory LRU (plus optional SQLite tier) of tool results, with background refresh."""
+
+    def __init__(self, max_entries: int = 1024, disk_path: str | None = None, refresh_workers: int = 4):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()  # key -> (value, stored_at)
+        self._refreshing: set[str] = set()
+        self._pool = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="tool-refresh")
+        self._counters: dict[str, dict[str, int]] = {}
+        self._disk = None
+        self._writes = 0
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)  # used under self._lock
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in self._disk.execute("PRAGMA table_info(results)")}
+            if "expires_at" not in columns:
+                # Table of an older version: its rows have no known lifetime, the purge drops them
+                self._disk.execute("ALTER TABLE results ADD COLUMN expires_at REAL NOT NULL DEFAULT 0")
+            with self._lock:
+                self._purge()
+
+    def _count(self, tool_name: str, event: str):
+        counters = self._counters.setdefault(tool_name, {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0})
+        counters[event] += 1
+
+    # ------------------------------------------------------------------
+    # Storage tiers
+    # ------------------------------------------------------------------
+    def _get(self, key: str) -> tuple[Any, float] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._disk is not None:
+            row = self._disk.execute("SELECT value, stored_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row:
+                entry = (json.loads(row[0]), row[1])
+                self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: tuple[Any, float]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _put(self, key: str, value: Any, lifetime: float):
+        """Store a result; `lifetime` (ttl + stale_ttl) is when its disk row may be deleted."""
+        entry = (value, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self._disk is not None:
+                with self._disk:
+                    self._disk.execute(
+                        "INSERT OR REPLACE INTO results (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value), entry[1], entry[1] + lifetime),
+                    )
+                self._writes += 1
+                if self._writes % PURGE_EVERY_WRITES == 0:
+                    self._purge()
+
+    def _purge(self) -> int:
+        """Delete the disk rows too stale to be served. Returns how many."""
+        with self._disk:
+            return self._disk.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),)).rowcount
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+    def call(
+        self,
+        tool_name: str,
+        run: Callable[[], Any],
+        arguments: dict,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        key: Callable[[dict], str] = default_key,
+        should_cache: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Result of `run()` for these arguments, from the cache when fresh enough."""
+        cache_key = f"{tool_name}:{key(arguments)}"
+        with self._lock:
+            entry = self._get(cache_key)
+            age = time.time() - entry[1] if entry else None
+            if entry and age <= ttl:
+                self._count(tool_name, "hits")
+                return entry[0]
+            if entry and age <= ttl + stale_ttl:
+                self._count(tool_name, "stale_hits")
+                if cache_key not in self._refreshing:
+                    self._refreshing.add(cache_key)
+                    self._count(tool_name, "refreshes")
+                    self._pool.submit(self._refresh, cache_key, run, should_cache, ttl + stale_ttl)
+                return entry[0]
+            self._count(tool_name, "misses")
+
+        value = run()
+        if should_cache is None or should_cache(value):
+            self._put(cache_key, value, ttl + stale_ttl)
+        return value
+
+    def _refresh(self, cache_key: str, run: Callable[[], Any], should_cache, lifetime: float):
+        try:
+            value = run()
+            if should_cache is None or should_cache(value):
+                self._put(cache_key, value, lifetime)
+        finally:
+            with self._lock:
+                self._refreshing.discard(cache_key)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {tool_name: dict(counters) for tool_name, counters in self._counters.items()}
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        if self._disk is not None:
+            self._disk.close()
@@ -0,0 +1,175 @@
+"""
+batch_qa.py
+Overnight batch mode for the GDPR QA chain of ex1.py.
+
+#1. Read questions from a JSONL file: {"id": "...", "question": "..."}
+#2. Embed the upcoming questions in one model call per batch
+#3. Run the QA chain (retrieval + LLM) for up to `concurrency` questions at once
+#4. Append each answer with its source documents to the output JSONL as soon
+    as it completes (completion order, flushed line by line)
+
+Questions already answered in the output file are skipped, so an
+interrupted run resumes where it stopped; failed questions are retried.
+A last line cut off by the interruption is removed before appending.
+
+    python src/agentic/session_b/batch_qa.py questions.jsonl answers.jsonl --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# ----------------------------------------------------
+# 1️⃣ Input and resume state
+# ----------------------------------------------------
+def read_questions(path: str) -> list[dict]:
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if line.strip():
+                item = json.loads(line)
+                questions.append({"id": str(item.get("id") or f"q{number}"), "question": item["question"]})
+    return questions
+
+
+def answered_ids(path: str) -> set[str]:
+    """Ids with an answer in the output file; a line cut off by an interruption is ignored."""
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+def drop_partial_line(path: str, block_size: int = 1 << 16):
+    """Truncate the file after its last newline, so appends start on a fresh line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            f.truncate(position)
+
+
+# ----------------------------------------------------
+# 2️⃣ One question
+# ----------------------------------------------------
+def answer(qa_chain, item: dict) -> dict:
+    start = time.perf_counter()
+    try:
+        result = qa_chain.invoke({"query": item["question"]})
+    except Exception as e:
+        return {**item, "error": repr(e), "seconds": round(time.perf_counter() - start, 3)}
+    sources = [
+        {key: doc.metadata[key] for key in ("source", "page", "regulation", "article", "recital") if key in doc.metadata}
+        for doc in result.get("source_documents", [])
+    ]
+    return {
+        **item,
+        "answer": result["result"],
+        "sources": sources,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+# ----------------------------------------------------
+# 3️⃣ Batch run
+# ----------------------------------------------------
+def run_batch(
+    qa_chain,
+    embeddings,
+    questions: list[dict],
+    output_path: str,
+    concurrency: int = 8,
+    embed_batch_size: int = 64,
+) -> dict:
+    """
+    Answer the questions not yet in `output_path`, `concurrency` at a time.
+    `embeddings` is the CachedEmbeddings of the chain, primed batch by batch.
+    """
+    done = answered_ids(output_path)
+    drop_partial_line(output_path)
+    queue = deque(item for item in questions if item["id"] not in done)
+    total = len(queue)
+    answered = failed = 0
+    primed = 0  # queued questions whose vectors are already computed
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = set()
+        while queue or in_flight:
+            # Keep the pool busy; embed the next questions in one call when needed
+            while queue and len(in_flight) < 2 * concurrency:
+                if primed == 0:
+                    batch = [queue[i]["question"] for i in range(min(embed_batch_size, len(queue)))]
+                    embeddings.prime_queries(batch)
+                    primed = len(batch)
+                in_flight.add(pool.submit(answer, qa_chain, queue.popleft()))
+                primed -= 1
+
+            completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in completed:
+                record = future.result()
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                if "error" in record:
+                    failed += 1
+                else:
+                    answered += 1
+                print(f"{'❌' if 'error' in record else '✅'} [{answered + failed}/{total}] {record['id']} ({record['seconds']}s)")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "questions": total,
+        "skipped": len(questions) - total,
+        "answered": answered,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "questions_per_s": round(total / elapsed, 3) if elapsed else None,
+    }
+
+
+# ----------------------------------------------------
+# 4️⃣ Command line
+# ----------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions with the GDPR QA chain")
+    parser.add_argument("questions", help="JSONL input, one {\"id\", \"question\"} per line")
+    parser.add_argument("output", help="JSONL output, appended to and used to resume")
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM calls in flight")
+    parser.add_argument("--embed-batch", type=int, default=64, help="questions per embedding call")
+    args = parser.parse_args()
+
+    # Imported here: ex1 loads its settings and .env on import
+    from agentic.session_b.ex1 import build_qa_chain
+
+    qa_chain, _, embedding_vectors = build_qa_chain()
+    summary = run_batch(
+        qa_chain,
+        embedding_vectors,
+        read_questions(args.questions),
+        args.output,
+        concurrency=args.concurrency,
+        embed_batch_size=args.embed_batch,
+    )
+    print(f"📊 Batch: {summary}")
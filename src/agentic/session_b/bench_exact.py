@@ -0,0 +1,104 @@
+"""
+bench_exact.py
+Compare the NumPy exact search backend with the persisted Chroma (HNSW) store.
+
+Reports load time, single-query p50/p95 latency, batched latency per query
+and the recall@k of Chroma measured against the exact results.
+Each regulation's collection (law_2016_679, law_536_2014) is measured with its
+own questions; run ex1.py first so that chroma_db contains them.
+
+    python src/agentic/session_b/bench_exact.py
+"""
+
+import json
+import random
+import time
+
+import numpy as np
+from langchain_community.vectorstores import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from agentic.common.stats import percentile
+from agentic.session_b import chroma_access
+from agentic.session_b.exact_store import ExactVectorStore
+from agentic.session_b.router import collection_name
+
+# Each regulation's questions run against its own collection
+QUESTIONS = {
+    "2016/679": [
+        "What are the rights of a data subject?",
+        "What are the main principles of data processing under GDPR?",
+        "What are the conditions for lawful processing of personal data under GDPR?",
+        "When must a personal data breach be notified to the supervisory authority?",
+        "When is a data protection officer required?",
+        "What is the right to erasure?",
+    ],
+    "536/2014": [
+        "How is informed consent obtained in a clinical trial?",
+        "Which clinical trials may be conducted on minors?",
+        "How long must the clinical trial master file be archived?",
+        "What must the sponsor notify at the end of a clinical trial?",
+    ],
+}
+
+
+def bench_collection(regulation: str, embeddings, k: int = 4, sample_size: int = 200) -> dict | None:
+    """Chroma vs exact search on one regulation's collection, None if it was not ingested."""
+    # 1️⃣ Load both backends
+    start = time.perf_counter()
+    chroma = Chroma(collection_name=collection_name("law", regulation), embedding_function=embeddings, persist_directory="chroma_db")
+    if not chroma_access.count(chroma):
+        return None
+    chroma.similarity_search("warm up", k=1)
+    chroma_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact = ExactVectorStore.from_chroma(chroma)
+    exact_load = time.perf_counter() - start
+
+    # 2️⃣ Queries: fixed questions plus a random sample of stored chunks
+    rng = random.Random(0)
+    queries = QUESTIONS[regulation] + rng.sample(exact.texts, min(sample_size, len(exact.texts)))
+    vectors = embeddings.embed_documents(queries)
+
+    # 3️⃣ Single-query latency and recall of HNSW against exact ground truth
+    chroma_times, exact_times, recalls = [], [], []
+    for vector in vectors:
+        # Raw collection query: same work as similarity_search_by_vector, but returns ids
+        start = time.perf_counter()
+        approx = chroma_access.query(chroma, vector, k)
+        chroma_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        truth = exact.similarity_search_by_vector(vector, k=k)
+        exact_times.append(time.perf_counter() - start)
+
+        truth_ids = {doc.id for doc in truth}
+        recalls.append(len(truth_ids & set(approx["ids"])) / max(len(truth_ids), 1))
+
+    # 4️⃣ Batched exact search: one matrix multiply for all queries
+    start = time.perf_counter()
+    exact.search_vectors(vectors, k=k)
+    batch_time = time.perf_counter() - start
+
+    return {
+        "regulation": regulation,
+        "chunks": len(exact.ids),
+        "queries": len(queries),
+        "k": k,
+        "load_s": {"chroma": round(chroma_load, 3), "exact": round(exact_load, 3)},
+        "latency_ms": {
+            "chroma_p50": round(percentile(chroma_times, 50) * 1000, 3),
+            "chroma_p95": round(percentile(chroma_times, 95) * 1000, 3),
+            "exact_p50": round(percentile(exact_times, 50) * 1000, 3),
+            "exact_p95": round(percentile(exact_times, 95) * 1000, 3),
+            "exact_batched_per_query": round(batch_time * 1000 / len(queries), 4),
+        },
+        f"chroma_recall@{k}": round(float(np.mean(recalls)), 4),
+    }
+
+
+if __name__ == "__main__":
+    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    results = [bench_collection(regulation, embeddings) for regulation in QUESTIONS]
+    print(json.dumps([result for result in results if result is not None], indent=2))
@@ -0,0 +1,94 @@
+"""
+bench_hierarchical.py
+Latency and recall@k of coarse-to-fine (article -> chunk) search against flat exact search.
+
+Uses the vectors already stored in chroma_db (run ex1.py first). To see how
+both scale beyond one regulation, the collection is also replicated with
+slightly perturbed vectors (each copy is a distinct "document").
+Recall is measured against flat exact search, the ground truth.
+
+    python src/agentic/session_b/bench_hierarchical.py
+"""
+
+import json
+import random
+import time
+
+import numpy as np
+from langchain_community.vectorstores import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from agentic.common.stats import percentile
+from agentic.session_b.bench_exact import QUESTIONS
+from agentic.session_b.exact_store import ExactVectorStore
+from agentic.session_b.hierarchical import HierarchicalVectorStore
+from agentic.session_b.router import collection_name
+
+TOP_UNITS = [3, 5, 10, 20]
+REPLICAS = [1, 20]
+
+
+def replicate(reference: ExactVectorStore, copies: int, noise: float = 0.02, seed: int = 0) -> tuple[np.ndarray, list[str], list[dict]]:
+    """`copies` perturbed copies of the collection, each with its own source."""
+    rng = np.random.default_rng(seed)
+    vectors, texts, metadatas = [], [], []
+    for copy in range(copies):
+        jitter = 0 if copy == 0 else rng.normal(0, noise, reference.matrix.shape).astype(np.float32)
+        vectors.append(reference.matrix + jitter)
+        texts.extend(reference.texts)
+        metadatas.extend({**meta, "source": f"{meta.get('source')}#{copy}"} for meta in reference.metadatas)
+    return np.vstack(vectors), texts, metadatas
+
+
+if __name__ == "__main__":
+    k = 4
+    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    chroma = Chroma(collection_name=collection_name("law", "2016/679"), embedding_function=embeddings, persist_directory="chroma_db")
+    reference = ExactVectorStore.from_chroma(chroma)
+
+    random.seed(0)
+    queries = QUESTIONS["2016/679"] + random.sample(reference.texts, min(200, len(reference.texts)))
+    query_vectors = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+
+    results = []
+    for copies in REPLICAS:
+        vectors, texts, metadatas = replicate(reference, copies)
+        flat = ExactVectorStore(embeddings)
+        flat.add_vectors(vectors, texts, metadatas)
+
+        # 1️⃣ Flat ground truth and single-query latency
+        truth, flat_times = [], []
+        for vector in query_vectors:
+            start = time.perf_counter()
+            truth.append({row for row, _ in flat.search_vectors(vector, k)[0]})
+            flat_times.append(time.perf_counter() - start)
+
+        for top_units in TOP_UNITS:
+            # 2️⃣ Incremental build, one ingestion batch per copy
+            start = time.perf_counter()
+            hierarchical = HierarchicalVectorStore(embeddings, top_units)
+            size = len(reference.ids)
+            for offset in range(0, len(texts), size):
+                hierarchical.add_vectors(vectors[offset:offset + size], texts[offset:offset + size], metadatas[offset:offset + size])
+            build_seconds = time.perf_counter() - start
+
+            # 3️⃣ Coarse-to-fine latency and recall against flat search
+            times, recalls = [], []
+            for vector, expected in zip(query_vectors, truth):
+                start = time.perf_counter()
+                found = {row for row, _ in hierarchical.search_vectors(vector, k)[0]}
+                times.append(time.perf_counter() - start)
+                recalls.append(len(found & expected) / max(len(expected), 1))
+
+            results.append({
+                "chunks": len(texts),
+                "units": len(hierarchical.unit_rows),
+                "top_units": top_units,
+                "build_s": round(build_seconds, 3),
+                "flat_p50_ms": round(percentile(flat_times, 50) * 1000, 4),
+                "hierarchical_p50_ms": round(percentile(times, 50) * 1000, 4),
+                "hierarchical_p95_ms": round(percentile(times, 95) * 1000, 4),
+                f"recall@{k}": round(float(np.mean(recalls)), 4),
+            })
+
+    print(json.dumps({"k": k, "queries": len(queries), "results": results}, indent=2))
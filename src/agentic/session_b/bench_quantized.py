@@ -0,0 +1,51 @@
+"""
+bench_quantized.py
+Memory saved and recall@k of each quantized storage mode against full precision.
+
+Uses the vectors already stored in chroma_db (run ex1.py first) and, as
+queries, a fixed set of questions plus a sample of stored chunks.
+
+    python src/agentic/session_b/bench_quantized.py
+"""
+
+import json
+import random
+import time
+
+import numpy as np
+from langchain_community.vectorstores import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from agentic.session_b.bench_exact import QUESTIONS
+from agentic.session_b.exact_store import ExactVectorStore
+from agentic.session_b.quantized_store import QuantizedVectorStore
+from agentic.session_b.router import collection_name
+
+STORAGE_MODES = ["int8", "int8-pca192", "int8-pca128", "int8-pca64", "binary", "binary-pca256"]
+
+
+if __name__ == "__main__":
+    k = 4
+    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    chroma = Chroma(collection_name=collection_name("law", "2016/679"), embedding_function=embeddings, persist_directory="chroma_db")
+    reference = ExactVectorStore.from_chroma(chroma)
+
+    random.seed(0)
+    queries = QUESTIONS["2016/679"] + random.sample(reference.texts, min(200, len(reference.texts)))
+    query_vectors = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+
+    results = []
+    for storage in STORAGE_MODES:
+        store = QuantizedVectorStore.from_exact(reference, storage)
+        start = time.perf_counter()
+        store.search_vectors(query_vectors, k)
+        elapsed = time.perf_counter() - start
+        recall = store.recall_at_k(reference, query_vectors, k)
+        results.append({
+            **store.memory_report(),
+            f"recall@{k}": round(recall, 4),
+            "ms_per_query": round(elapsed * 1000 / len(queries), 4),
+        })
+        store.close()
+
+    print(json.dumps({"k": k, "queries": len(queries), "results": results}, indent=2))
@@ -0,0 +1,327 @@
+"""
+benchmark.py
+End-to-end retrieval benchmark over the bundled regulation PDFs (no LLM).
+
+Ingests docs/*.pdf into a fresh, temporary Chroma collection with the given
+chunking and embedding model, then asks the fixed questions in
+benchmark_questions.json and checks whether the retrieved chunks come from
+the expected article. Reports, as JSON:
+- ingestion throughput (pages/s, chunks/s) and index size on disk
+- query latency p50/p95 (query embedding + retrieval)
+- recall@k (share of expected articles found in the top k) and MRR
+
+`--retriever qa_chain` evaluates the retriever ex1.py answers with instead
+(regulation routing, "Article N" lookup, cross-references, context packing)
+on the persisted chroma_db, configured by ex1's environment variables
+(CHUNKER, VECTOR_STORAGE, SEARCH_TOP_UNITS, CONTEXT_TOKEN_BUDGET). It also
+reports the recall over the whole packed context the LLM would see.
+
+    python src/agentic/session_b/benchmark.py --retriever hybrid --k 4 --output bench.json
+    python src/agentic/session_b/benchmark.py --chunker structure --chunk-size 1000
+    python src/agentic/session_b/benchmark.py --dedup
+    python src/agentic/session_b/benchmark.py --retriever qa_chain
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from glob import glob
+
+import numpy as np
+from pypdf import PdfReader
+from langchain_community.vectorstores import Chroma
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from agentic.common.stats import percentile
+from agentic.session_b.exact_store import open_vector_store
+from agentic.session_b.ingest import sync_documents
+from agentic.session_b.keyword_index import KeywordRetriever, build_keyword_index, hybrid_retriever, keyword_index_path
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), "benchmark_questions.json")
+ARTICLE_HEADING = re.compile(r"^[ \t]*Article (\d+)[ \t]*$", re.MULTILINE)
+
+
+# ----------------------------------------------------
+# 1️⃣ Ground truth: which article does a chunk belong to
+# ----------------------------------------------------
+class ArticleLocator:
+    """
+    Maps (page, chunk text) of one PDF to the article(s) it falls in, from the
+    "Article N" heading lines. Headings must be numbered consecutively, which
+    skips the correlation tables in the annexes.
+    """
+
+    def __init__(self, pdf_path: str):
+        self.pages = [page.extract_text() for page in PdfReader(pdf_path).pages]
+        self.headings = []  # per page: [(offset, article)]
+        self.carried = []  # per page: article in force at the top of the page
+        current = None
+        for text in self.pages:
+            self.carried.append(current)
+            found = []
+            for match in ARTICLE_HEADING.finditer(text):
+                number = int(match.group(1))
+                if (current is None and number == 1) or (current is not None and number == current + 1):
+                    found.append((match.start(), number))
+                    current = number
+            self.headings.append(found)
+
+    def articles(self, page: int, chunk: str) -> set[int]:
+        text = self.pages[page]
+        start = max(text.find(chunk), 0)
+        end = start + len(chunk)
+        result = set()
+        article = self.carried[page]
+        for offset, number in self.headings[page]:
+            if offset <= start:
+                article = number
+            elif offset < end:
+                result.add(number)
+        if article is not None:
+            result.add(article)
+        return result
+
+
+def chunk_articles(doc, locators: dict) -> set[int]:
+    """Articles of a retrieved chunk: its own metadata if tagged, else located in the PDF."""
+    if doc.metadata.get("article"):
+        return {int(doc.metadata["article"])}
+    if "recital" in doc.metadata or "annex" in doc.metadata:
+        return set()  # structural chunk outside the articles
+    locator = locators.get(os.path.basename(doc.metadata.get("source", "")))
+    if locator is None:
+        return set()
+    return locator.articles(int(doc.metadata.get("page", 0)), doc.page_content)
+
+
+def score_answer(docs: list, item: dict, locators: dict) -> tuple[set[int], int | None]:
+    """Expected articles found in `docs` (chunks of the expected PDF only) and the rank of the first hit."""
+    expected = set(item["articles"])
+    found, first_rank = set(), None
+    for rank, doc in enumerate(docs, start=1):
+        if os.path.basename(doc.metadata.get("source", "")) != item["source"]:
+            continue
+        hits = chunk_articles(doc, locators) & expected
+        if hits and first_rank is None:
+            first_rank = rank
+        found |= hits
+    return found, first_rank
+
+
+# ----------------------------------------------------
+# 2️⃣ Benchmark run
+# ----------------------------------------------------
+def directory_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def run_benchmark(
+    pdf_paths: list[str],
+    questions: list[dict],
+    chunk_size: int = 300,
+    chunk_overlap: int = 20,
+    model: str = "sentence-transformers/all-MiniLM-L6-v2",
+    retriever: str = "hybrid",
+    storage: str = "float32",
+    k: int = 4,
+    chunker: str = "recursive",
+    dedup: bool = False,
+    top_units: int = 0,
+) -> dict:
+    workdir = tempfile.mkdtemp(prefix="rag-bench-")
+    persist_directory = os.path.join(workdir, "chroma_db")
+    try:
+        embeddings = HuggingFaceEmbeddings(model_name=model)
+
+        # Ingestion throughput
+        start = time.perf_counter()
+        vector_store = Chroma(collection_name="benchmark", embedding_function=embeddings, persist_directory=persist_directory)
+        report = sync_documents(vector_store, pdf_paths, chunk_size, chunk_overlap, chunker=chunker, dedup=dedup)
+        bm25_path = keyword_index_path(persist_directory)
+        build_keyword_index(vector_store, bm25_path)
+        ingest_seconds = time.perf_counter() - start
+
+        search_store = open_vector_store(
+            vector_store,
+            storage=storage,
+            rescore_path=os.path.join(workdir, "f32.npy"),
+            top_units=top_units,
+        )
+        retrievers = {
+            "dense": lambda: search_store.as_retriever(search_kwargs={"k": k}),
+            "bm25": lambda: KeywordRetriever(index_path=bm25_path, k=k),
+            "hybrid": lambda: hybrid_retriever(search_store, bm25_path, k=k),
+        }
+        active = retrievers[retriever]()
+        active.invoke("warm up")
+
+        # Retrieval latency and quality
+        locators = {os.path.basename(path): ArticleLocator(path) for path in pdf_paths}
+        latencies, recalls, reciprocal_ranks, details = [], [], [], []
+        for item in questions:
+            start = time.perf_counter()
+            docs = active.invoke(item["question"])[:k]
+            latencies.append(time.perf_counter() - start)
+
+            found, first_rank = score_answer(docs, item, locators)
+            recalls.append(len(found) / len(item["articles"]))
+            reciprocal_ranks.append(1 / first_rank if first_rank else 0.0)
+            details.append({"id": item["id"], "found": sorted(found), "first_rank": first_rank})
+
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                "chunker": chunker,
+                "dedup": dedup,
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "model": model,
+                "retriever": retriever,
+                "storage": storage,
+                "top_units": top_units,
+                "k": k,
+                "documents": [os.path.basename(path) for path in pdf_paths],
+            },
+            "ingestion": {
+                "pages": report["pages"],
+                "chunks": report["added"],
+                "seconds": round(ingest_seconds, 3),
+                "pages_per_s": round(report["pages"] / ingest_seconds, 2),
+                "chunks_per_s": round(report["added"] / ingest_seconds, 2),
+                "duplicates": report["duplicates"],
+                "stripped_lines": report["stripped_lines"],
+            },
+            "index_bytes": {
+                "chroma": directory_size(persist_directory),
+                "bm25": directory_size(bm25_path),
+            },
+            "query_ms": {
+                "p50": round(percentile(latencies, 50) * 1000, 3),
+                "p95": round(percentile(latencies, 95) * 1000, 3),
+            },
+            "quality": {
+                "questions": len(questions),
+                f"recall@{k}": round(float(np.mean(recalls)), 4),
+                "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+            },
+            "per_question": details,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_pipeline_benchmark(questions: list[dict], k: int = 4) -> dict:
+    """
+    The packed retriever of ex1's QA chain on the persisted chroma_db (no LLM).
+    recall@k and MRR count the first k chunks, context_recall every packed chunk.
+    """
+    # Imported here: ex1 reads its configuration from the environment on import
+    from agentic.session_b import ex1
+
+    start = time.perf_counter()
+    active, _ = ex1.build_retriever()
+    startup_seconds = time.perf_counter() - start
+    active.invoke("warm up")
+
+    locators = {os.path.basename(path): ArticleLocator(path) for path in ex1.pdf_paths}
+    latencies, recalls, context_recalls, reciprocal_ranks, packed_tokens, details = [], [], [], [], [], []
+    for item in questions:
+        start = time.perf_counter()
+        docs = active.invoke(item["question"])
+        latencies.append(time.perf_counter() - start)
+        packed_tokens.append(active.last_report["packed_tokens"])
+
+        found, first_rank = score_answer(docs[:k], item, locators)
+        in_context, _ = score_answer(docs, item, locators)
+        recalls.append(len(found) / len(item["articles"]))
+        context_recalls.append(len(in_context) / len(item["articles"]))
+        reciprocal_ranks.append(1 / first_rank if first_rank else 0.0)
+        details.append({"id": item["id"], "found": sorted(found), "in_context": sorted(in_context), "first_rank": first_rank, "chunks": len(docs)})
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "retriever": "qa_chain",
+            "chunker": ex1.chunker,
+            "dedup": ex1.deduplicate,
+            "model": ex1.embedding_model_name,
+            "storage": ex1.vector_storage,
+            "top_units": ex1.search_top_units,
+            "context_token_budget": ex1.context_token_budget,
+            "k": k,
+            "documents": [os.path.basename(path) for path in ex1.pdf_paths],
+        },
+        "startup_s": round(startup_seconds, 3),
+        "query_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+        },
+        "context": {
+            "packed_tokens_mean": round(float(np.mean(packed_tokens)), 1),
+            "chunks_mean": round(float(np.mean([detail["chunks"] for detail in details])), 2),
+        },
+        "quality": {
+            "questions": len(questions),
+            f"recall@{k}": round(float(np.mean(recalls)), 4),
+            "context_recall": round(float(np.mean(context_recalls)), 4),
+            "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+        },
+        "per_question": details,
+    }
+
+
+# ----------------------------------------------------
+# 3️⃣ Command line
+# ----------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrieval benchmark over docs/*.pdf")
+    parser.add_argument("--docs", default="docs")
+    parser.add_argument("--questions", default=QUESTIONS_PATH)
+    parser.add_argument("--chunker", choices=["recursive", "structure"], default="recursive")
+    parser.add_argument("--dedup", action="store_true", help="strip page furniture and skip near-duplicate chunks")
+    parser.add_argument("--chunk-size", type=int, default=300)
+    parser.add_argument("--chunk-overlap", type=int, default=20)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument(
+        "--retriever",
+        choices=["dense", "bm25", "hybrid", "qa_chain"],
+        default="hybrid",
+        help="qa_chain: ex1's full retriever on chroma_db, configured by its environment variables",
+    )
+    parser.add_argument("--storage", default="float32")
+    parser.add_argument("--top-units", type=int, default=0, help="coarse-to-fine search in the best N articles (0: flat)")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    with open(args.questions, encoding="utf-8") as f:
+        questions = json.load(f)
+
+    if args.retriever == "qa_chain":
+        result = run_pipeline_benchmark(questions, k=args.k)
+    else:
+        result = run_benchmark(
+            sorted(glob(os.path.join(args.docs, "*.pdf"))),
+            questions,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            model=args.model,
+            retriever=args.retriever,
+            storage=args.storage,
+            k=args.k,
+            chunker=args.chunker,
+            dedup=args.dedup,
+            top_units=args.top_units,
+        )
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
@@ -0,0 +1,31 @@
+"""
+chroma_access.py
+The collection operations LangChain's Chroma wrapper does not expose.
+
+- count: chunks in the collection, without reading them back
+- update_metadata: new metadata for stored chunks, without re-embedding
+  (Chroma.update_documents always embeds the text again)
+- query: raw top-k of the HNSW index with the chunk ids (the wrapper's
+  search results carry none)
+
+They use the wrapped chromadb collection (`Chroma._collection`); this is
+the only module of the package that touches it.
+"""
+
+from typing import Sequence
+
+
+def count(vector_store) -> int:
+    """Number of chunks stored in the collection."""
+    return vector_store._collection.count()
+
+
+def update_metadata(vector_store, ids: list[str], metadatas: list[dict]):
+    """Replace the metadata of stored chunks; the model is not called."""
+    vector_store._collection.update(ids=ids, metadatas=metadatas)
+
+
+def query(vector_store, vector: Sequence[float], k: int) -> dict[str, list]:
+    """{"ids", "documents", "metadatas"} of the k nearest chunks to `vector`, same work as a similarity search."""
+    result = vector_store._collection.query(query_embeddings=[list(vector)], n_results=k, include=["documents", "metadatas"])
+    return {field: result[field][0] for field in ("ids", "documents", "metadatas")}
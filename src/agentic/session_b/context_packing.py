@@ -0,0 +1,203 @@
+"""
+context_packing.py
+Token-budgeted context assembly for the RetrievalQA "stuff" prompt.
+
+The retrieved chunks are stuffed verbatim into the prompt, so prompt tokens
+grow with k and repeat the same text: the 20-character chunk overlaps,
+several paragraphs of the same article with the same header, recitals that
+are near copies of each other. PackedContextRetriever wraps any retriever and,
+in rank order:
+#1. Merges chunks of the same article / recital (structural chunks) and
+    adjacent or overlapping chunks of the same page (recursive chunks)
+#2. Drops near-duplicates (word 3-gram Jaccard similarity)
+#3. Packs the best-ranked text into `max_tokens`, counted with tiktoken,
+    truncating the last piece that does not fit
+
+`last_report` holds the token counts of the latest request.
+"""
+
+import re
+from typing import TypedDict
+
+import tiktoken
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+# Shortest suffix/prefix match taken as a chunk overlap, and longest one tried
+MIN_OVERLAP_CHARS = 8
+MAX_OVERLAP_CHARS = 200
+# Page chunks at most this many characters apart are adjacent (whitespace)
+MAX_GAP_CHARS = 2
+WORD = re.compile(r"\w+")
+
+
+class PackingReport(TypedDict):
+    retrieved_documents: int
+    packed_documents: int
+    retrieved_tokens: int
+    packed_tokens: int
+    saved_tokens: int
+
+
+def get_encoding(model: str | None = None):
+    """tiktoken encoding of the chat model, cl100k_base for unknown (e.g. Azure deployment) names."""
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def join_overlapping(first: str, second: str) -> str | None:
+    """`first` + `second` without their shared overlap, or None if `second` does not continue `first`."""
+    longest = min(len(first), len(second), MAX_OVERLAP_CHARS)
+    for size in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return None
+
+
+def shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    words = WORD.findall(text.lower())
+    return {tuple(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _unit_key(doc: Document):
+    """Structural chunks of the same article or recital belong together."""
+    meta = doc.metadata
+    for kind in ("article", "recital", "annex"):
+        if kind in meta:
+            return meta.get("source"), meta.get("regulation"), kind, meta[kind]
+    return None
+
+
+class _Group:
+    """Retrieved chunks merged into one context passage, ranked by its best chunk."""
+
+    def __init__(self, doc: Document):
+        self.docs = [doc]
+        self.text = doc.page_content
+        self.start = doc.metadata.get("start")
+        self.end = None if self.start is None else self.start + len(self.text)
+
+    def add_adjacent(self, doc: Document) -> bool:
+        """Join a recursive chunk of the same page that touches or overlaps this passage."""
+        first = self.docs[0].metadata
+        if doc.metadata.get("source") != first.get("source") or doc.metadata.get("page") != first.get("page"):
+            return False
+        text = doc.page_content
+        start = doc.metadata.get("start")
+        if start is not None and self.start is not None:
+            end = start + len(text)
+            if start > self.end + MAX_GAP_CHARS or end < self.start - MAX_GAP_CHARS:
+                return False
+            if start >= self.start:
+                joined = self.text + ("\n" if start > self.end else "") + text[max(self.end - start, 0):]
+            else:
+                joined = text + ("\n" if self.start > end else "") + self.text[max(end - self.start, 0):]
+            self.start, self.end = min(self.start, start), max(self.end, end)
+        else:
+            # Stores ingested without offsets: rely on the chunk overlap
+            joined = join_overlapping(self.text, text) or join_overlapping(text, self.text)
+            if joined is None:
+                return False
+        self.docs.append(doc)
+        self.text = joined
+        return True
+
+    def add_structural(self, doc: Document):
+        self.docs.append(doc)
+        self.docs.sort(key=lambda d: (d.metadata.get("paragraph_start") or 0, d.metadata.get("page", 0)))
+        header = self.docs[0].page_content.split("\n", 1)[0]
+        bodies = []
+        for d in self.docs:
+            first_line, _, body = d.page_content.partition("\n")
+            bodies.append(body if first_line == header and body else d.page_content)
+        self.text = header + "\n" + "\n".join(bodies)
+
+    def document(self) -> Document:
+        metadata = dict(self.docs[0].metadata)
+        if len(self.docs) > 1:
+            metadata["merged_chunks"] = len(self.docs)
+        if self.start is not None:
+            metadata["start"] = self.start
+        return Document(page_content=self.text, metadata=metadata)
+
+
+def pack_documents(docs: list[Document], max_tokens: int, encoding, min_similarity: float = 0.8) -> tuple[list[Document], PackingReport]:
+    """Merge, deduplicate and pack ranked documents into a token budget."""
+    groups: list[_Group] = []
+    by_unit = {}
+
+    # 1️⃣ Merge: same article / recital, or chunks that continue each other
+    for doc in docs:
+        key = _unit_key(doc)
+        if key is not None:
+            if key in by_unit:
+                by_unit[key].add_structural(doc)
+            else:
+                by_unit[key] = _Group(doc)
+                groups.append(by_unit[key])
+            continue
+        if not any(_unit_key(group.docs[0]) is None and group.add_adjacent(doc) for group in groups):
+            groups.append(_Group(doc))
+
+    # 2️⃣ Drop near-duplicates of a better-ranked passage
+    kept, kept_shingles = [], []
+    for group in groups:
+        grams = shingles(group.text)
+        if any(jaccard(grams, other) >= min_similarity for other in kept_shingles):
+            continue
+        kept.append(group)
+        kept_shingles.append(grams)
+
+    # 3️⃣ Pack in rank order into the token budget
+    packed, used = [], 0
+    for group in kept:
+        tokens = encoding.encode(group.text)
+        remaining = max_tokens - used
+        if remaining <= 0:
+            break
+        document = group.document()
+        if len(tokens) > remaining:
+            document.page_content = encoding.decode(tokens[:remaining])
+            document.metadata["truncated"] = True
+            tokens = tokens[:remaining]
+        packed.append(document)
+        used += len(tokens)
+
+    retrieved = sum(len(encoding.encode(doc.page_content)) for doc in docs)
+    return packed, {
+        "retrieved_documents": len(docs),
+        "packed_documents": len(packed),
+        "retrieved_tokens": retrieved,
+        "packed_tokens": used,
+        "saved_tokens": retrieved - used,
+    }
+
+
+class PackedContextRetriever(BaseRetriever):
+    """Wraps a retriever, returns its documents merged, deduplicated and packed into `max_tokens`."""
+
+    retriever: BaseRetriever
+    max_tokens: int = 1500
+    model: str | None = None
+    min_similarity: float = 0.8
+    _encoding: object = PrivateAttr(default=None)
+    _last_report: PackingReport | None = PrivateAttr(default=None)
+
+    @property
+    def last_report(self) -> PackingReport | None:
+        return self._last_report
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        if self._encoding is None:
+            self._encoding = get_encoding(self.model)
+        docs = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        packed, self._last_report = pack_documents(docs, self.max_tokens, self._encoding, self.min_similarity)
+        return packed
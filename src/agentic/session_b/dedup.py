@@ -0,0 +1,123 @@
+"""
+dedup.py
+Near-duplicate chunk elimination and page furniture stripping before embedding.
+
+The CELEX PDFs repeat a lot of text that costs an embedding and an index
+entry every time: the Official Journal footer or the consolidated-version
+header on every page, recitals restated in the articles, repeated
+definitions. Two stages remove it:
+
+#1. Page furniture: lines that recur (digits normalised, so page numbers do
+    not matter) on at least half of the pages of a file are stripped before
+    splitting. Short lines are never furniture: "Article 5" normalises to
+    the same "Article #" on most pages.
+#2. Near-duplicates: each chunk gets a MinHash signature of its word 3-grams;
+    locality-sensitive hashing (bands of the signature) finds candidate
+    matches among the chunks already kept, and a chunk whose estimated
+    Jaccard similarity to one of them reaches `threshold` is not embedded.
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+DIGITS = re.compile(r"\d+")
+WORD = re.compile(r"\w+")
+# Universal hashing modulo a Mersenne prime: with 31-bit multipliers and
+# 32-bit shingle hashes, a * x + b stays within uint64
+MERSENNE_PRIME = (1 << 61) - 1
+# Shorter lines are headings ("Article #", "CHAPTER II"), not running headers
+MIN_FURNITURE_CHARS = 16
+
+
+# ----------------------------------------------------
+# 1️⃣ Page furniture
+# ----------------------------------------------------
+def line_signature(line: str) -> str:
+    """'4.5.2016 L 119/6 Official Journal ...' and its page 7 copy share one signature."""
+    return DIGITS.sub("#", " ".join(line.split()))
+
+
+def furniture_lines(page_texts: list[str], min_share: float = 0.5, min_pages: int = 3) -> set[str]:
+    """Signatures of the lines found on at least `min_share` of the pages."""
+    if len(page_texts) < min_pages:
+        return set()
+    counts = {}
+    for text in page_texts:
+        for signature in {line_signature(line) for line in text.splitlines()}:
+            if len(signature) < MIN_FURNITURE_CHARS:
+                continue
+            counts[signature] = counts.get(signature, 0) + 1
+    limit = max(min_pages, min_share * len(page_texts))
+    return {signature for signature, count in counts.items() if count >= limit}
+
+
+def remove_furniture(text: str, furniture: set[str]) -> tuple[str, int]:
+    """Page text without its furniture lines, and how many lines were removed."""
+    kept = [line for line in text.splitlines() if line_signature(line) not in furniture]
+    return "\n".join(kept), text.count("\n") + 1 - len(kept)
+
+
+# ----------------------------------------------------
+# 2️⃣ MinHash / LSH near-duplicate filter
+# ----------------------------------------------------
+class NearDuplicateFilter:
+    """
+    Incremental MinHash + LSH index over the chunks kept so far.
+    `bands * rows` hash functions; with 8 x 8 the LSH candidate threshold is
+    about 0.77, candidates are confirmed against `threshold`.
+    """
+
+    def __init__(self, threshold: float = 0.85, bands: int = 8, rows: int = 8, seed: int = 0):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        size = bands * rows
+        self._a = rng.integers(1, MERSENNE_PRIME, size=size, dtype=np.uint64) >> np.uint64(30)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=size, dtype=np.uint64)
+        self._buckets = [{} for _ in range(bands)]  # band -> {band bytes: [chunk numbers]}
+        self._signatures = []
+        self._metadatas = []
+
+    def signature(self, text: str) -> np.ndarray:
+        words = WORD.findall(text.lower())
+        grams = {" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))}
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+        # (a * x + b) mod p for every hash function and shingle, minimum per function
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(MERSENNE_PRIME)
+        return permuted.min(axis=1)
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find(self, signature: np.ndarray) -> dict | None:
+        """Metadata of a kept chunk similar to `signature`, or None."""
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        for number in sorted(candidates):
+            if np.mean(self._signatures[number] == signature) >= self.threshold:
+                return self._metadatas[number]
+        return None
+
+    def add(self, signature: np.ndarray, metadata: dict | None = None):
+        number = len(self._signatures)
+        self._signatures.append(signature)
+        self._metadatas.append(metadata or {})
+        for band, key in self._bands(signature):
+            self._buckets[band].setdefault(key, []).append(number)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+def saved_index_bytes(duplicates: int, duplicate_text_bytes: int, dim: int) -> int:
+    """Vector store bytes not written for the dropped chunks (float32 vectors plus texts)."""
+    return duplicates * dim * 4 + duplicate_text_bytes
@@ -0,0 +1,256 @@
+"""
+embedding_cache.py
+Persistent, memory-mapped embedding cache keyed by chunk hash.
+
+Vectors live in one contiguous float32 matrix file (`<name>.f32`) opened
+with numpy.memmap, and an index maps each text hash to its row. The index
+(`<name>.index.jsonl`) is a log: each batch of misses only appends its
+[hash, row] lines, and the file is rewritten compactly once it holds more
+than twice the live entries.
+CachedEmbeddings wraps any LangChain `Embeddings` (e.g. HuggingFaceEmbeddings):
+hits are read straight from the mapped file and only the misses of a call
+are sent to the model, in a single batch. The cache is capped at
+`max_rows`; the least recently used rows are overwritten first.
+
+One instance may be shared by threads (batch_qa.py answers questions on a
+pool): the LRU state is guarded by a lock, model calls run outside it.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from agentic.session_b.loader import hash_text
+
+# The matrix file grows in steps of at least this many rows
+MIN_GROWTH_ROWS = 1024
+# Primed query vectors kept in memory, least recently used dropped first
+MAX_PRIMED_QUERIES = 1024
+# The index log is compacted once it has this many lines more than twice the live entries
+MIN_COMPACT_LINES = 1024
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Drop-in `Embeddings` with an on-disk, mmap-backed vector cache.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_dir: str, namespace: str, max_rows: int = 200_000):
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        base = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", namespace))
+        self._matrix_path = base + ".f32"
+        self._index_path = base + ".index.jsonl"
+        self._log_lines = None  # [hash, row] lines in the index file, None: rewrite it
+
+        self._rows = OrderedDict()  # hash -> row, least recently used first
+        self._free = []  # unused rows below _next_row
+        self._next_row = 0
+        self._dim = None
+        self._matrix = None
+        self._queries = OrderedDict()  # primed query vectors
+        # Guards _rows, _free, _next_row, the matrix, _queries and the counters
+        self._lock = threading.Lock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self):
+        if not os.path.exists(self._index_path) or not os.path.exists(self._matrix_path):
+            return
+        with open(self._index_path, encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("namespace") != self.namespace:
+                return  # different model, start from an empty cache
+            self._dim = header["dim"]
+            # Replay the log: a row given to a new hash was evicted from its old one
+            owners = {}  # row -> hash
+            lines = 0
+            complete = True
+            for line in f:
+                complete = line.endswith("\n")
+                try:
+                    key, row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # last line cut off by an interruption
+                lines += 1
+                if key in self._rows and owners.get(self._rows[key]) == key:
+                    del owners[self._rows[key]]
+                previous = owners.get(row)
+                if previous is not None:
+                    del self._rows[previous]
+                self._rows.pop(key, None)
+                self._rows[key] = row
+                owners[row] = key
+        # After a cut-off line the next write rewrites the file instead of appending to it
+        self._log_lines = lines if complete else None
+        capacity = os.path.getsize(self._matrix_path) // (4 * self._dim)
+        if capacity:
+            self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+        # Rows beyond a truncated file or above a lowered cap are dropped
+        limit = min(capacity, self.max_rows)
+        for key in [k for k, row in self._rows.items() if row >= limit]:
+            del self._rows[key]
+        used = set(self._rows.values())
+        self._next_row = max(used) + 1 if used else 0
+        self._free = [row for row in range(self._next_row) if row not in used]
+
+    def _write_index(self):
+        """Rewrite the index compactly, in LRU order."""
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"namespace": self.namespace, "dim": self._dim}) + "\n")
+            f.writelines(json.dumps([key, row]) + "\n" for key, row in self._rows.items())
+        os.replace(tmp_path, self._index_path)
+        self._log_lines = len(self._rows)
+
+    def _append_index(self, entries: list[tuple[str, int]]):
+        """Persist new [hash, row] entries: O(entries), with an occasional compaction."""
+        if self._matrix is not None:
+            self._matrix.flush()  # vectors first: the index never points to unwritten rows
+        if self._log_lines is None or self._log_lines + len(entries) > 2 * len(self._rows) + MIN_COMPACT_LINES:
+            self._write_index()
+            return
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps([key, row]) + "\n" for key, row in entries)
+        self._log_lines += len(entries)
+
+    def flush(self):
+        """Write the matrix pages and a compact index (with the current LRU order) to disk."""
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            if self._dim is not None:
+                self._write_index()
+
+    def _capacity(self) -> int:
+        return 0 if self._matrix is None else self._matrix.shape[0]
+
+    def _grow(self, needed: int):
+        """Extend the matrix file so it holds at least `needed` rows (up to max_rows)."""
+        new_capacity = min(self.max_rows, max(needed, 2 * self._capacity(), MIN_GROWTH_ROWS))
+        if new_capacity <= self._capacity():
+            return
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(self._matrix_path, "ab") as f:
+            f.truncate(new_capacity * self._dim * 4)
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(new_capacity, self._dim))
+
+    def _allocate_row(self) -> int:
+        """Next free row, or the row of the least recently used entry."""
+        if self._free:
+            return self._free.pop()
+        if self._next_row < self.max_rows:
+            if self._next_row >= self._capacity():
+                self._grow(self._next_row + 1)
+            self._next_row += 1
+            return self._next_row - 1
+        _, row = self._rows.popitem(last=False)
+        return row
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def lookup(self, text: str):
+        """Cached vector for `text` as a zero-copy view into the mapped file, or None."""
+        key = hash_text(text)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            self._rows.move_to_end(key)
+            return self._matrix[row]
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hit_rate, 4),
+                "rows": len(self._rows),
+                "max_rows": self.max_rows,
+            }
+
+    # ------------------------------------------------------------------
+    # Embeddings interface
+    # ------------------------------------------------------------------
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [hash_text(text) for text in texts]
+        results = [None] * len(texts)
+
+        # 1️⃣ Hits: copy out before any eviction can reuse their rows
+        missing = OrderedDict()  # hash -> (text, positions)
+        with self._lock:
+            for position, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is not None:
+                    self._rows.move_to_end(key)
+                    results[position] = self._matrix[row].tolist()
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, (texts[position], []))[1].append(position)
+                    self.misses += 1
+
+        # 2️⃣ Misses: one batched model call (outside the lock), then store in the mapped matrix
+        if missing:
+            vectors = np.asarray(
+                self.embeddings.embed_documents([text for text, _ in missing.values()]),
+                dtype=np.float32,
+            )
+            with self._lock:
+                if self._dim is None:
+                    self._dim = vectors.shape[1]
+                stored = []
+                for (key, (_, positions)), vector in zip(missing.items(), vectors):
+                    if key not in self._rows:  # another thread may have stored it meanwhile
+                        row = self._allocate_row()
+                        self._matrix[row] = vector
+                        self._rows[key] = row
+                        stored.append((key, row))
+                    for position in positions:
+                        results[position] = vector.tolist()
+                self._append_index(stored)
+
+        return results
+
+    def embed_query(self, text: str) -> list[float]:
+        # Queries are not chunks: pass through so they do not evict cached chunks
+        with self._lock:
+            vector = self._queries.get(text)
+        return vector if vector is not None else self.embeddings.embed_query(text)
+
+    def prime_queries(self, texts: list[str]):
+        """
+        Embed upcoming queries in one batched model call, so that embed_query
+        of each text (by any retriever sharing these embeddings) returns its
+        vector. Only for models that encode queries and documents alike (the
+        sentence-transformers models used here).
+        """
+        with self._lock:
+            missing = [text for text in dict.fromkeys(texts) if text not in self._queries]
+        vectors = self.embeddings.embed_documents(missing) if missing else []
+        with self._lock:
+            self._queries.update(zip(missing, vectors))
+            for text in texts:
+                if text in self._queries:  # evicted meanwhile by another caller: embedded on use
+                    self._queries.move_to_end(text)
+            while len(self._queries) > MAX_PRIMED_QUERIES:
+                self._queries.popitem(last=False)
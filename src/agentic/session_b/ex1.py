@@ -10,37 +10,45 @@ GDPR Document Question-Answering System
 
 
 
-from langchain_community.document_loaders import PyPDFLoader  # or TextLoader if you have .txt
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-
-from langchain_community.vectorstores import Chroma
+from glob import glob
 
 import os
+import time
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 
 from langchain.chains import RetrievalQA
 
+from agentic.session_b import chroma_access
+from agentic.session_b.context_packing import PackedContextRetriever
+from agentic.session_b.dedup import saved_index_bytes
+from agentic.session_b.embedding_cache import CachedEmbeddings
+from agentic.session_b.exact_store import open_vector_store
+from agentic.session_b.keyword_index import build_keyword_index, hybrid_retriever, keyword_index_path
+from agentic.session_b.loader import hash_files
+from agentic.session_b.router import RegulationRouter, RoutedRetriever, collection_name, group_by_regulation
+from agentic.session_b.structure import ArticleAwareRetriever, ArticleLookup
+from agentic.common.embeddings import LazyEmbeddings, load_embedding_model
+from agentic.session_b.warm_start import known_regulations, open_or_ingest
+from agentic.session_b.xref_graph import CrossReferenceGraph, CrossReferenceRetriever
 
 
-load_dotenv()
 
-# Load GDPR PDF or text
-loader = PyPDFLoader("docs/CELEX_32016R0679_EN_TXT.pdf")  # or TextLoader("gdpr.txt")
-documents = loader.load()
+load_dotenv()
 
-# Chunk into 500-character segments with overlap
-splitter = RecursiveCharacterTextSplitter(
-    chunk_size=300,
-    chunk_overlap=20
-)
-chunks = splitter.split_documents(documents)
-# ✅ Extract just the text for embedding
-texts = [chunk.page_content for chunk in chunks]
+# All regulation PDFs in docs/ (GDPR and the clinical trials regulation)
+# are parsed in parallel during ingestion, see step 4
+pdf_paths = sorted(glob("docs/*.pdf"))
 
-# for chunk in chunks:
-#     print(chunk)
+# "structure": one chunk per recital / article paragraph (up to 1000 characters)
+# "recursive": 300-character segments with overlap
+chunker = os.getenv("CHUNKER", "structure")
+chunk_size = 1000 if chunker == "structure" else 300
+chunk_overlap = 20
+# Strip running headers/footers and skip near-duplicate chunks before embedding.
+# CHUNKER=recursive only: the structural chunker already drops the page
+# furniture and keeps every article paragraph, which the article lookup needs
+deduplicate = os.getenv("DEDUP", "1") == "1" and chunker == "recursive"
 
 #2 Create Embeddings
 ###   Choose a Local Embedding Model
@@ -48,50 +56,182 @@ texts = [chunk.page_content for chunk in chunks]
 
 # 3️⃣ Create embeddings (Hugging Face)
 embedding_model_name = "sentence-transformers/all-MiniLM-L6-v2"
-embedding_vectors = HuggingFaceEmbeddings(
-    model_name=embedding_model_name)
-
-# Compute embeddings
+embedding_dim = 384
+embedding_cache_dir = "embedding_cache"
+# float32 (default), int8, int8-pca128, binary, binary-pca128: trades recall for RAM
+vector_storage = os.getenv("VECTOR_STORAGE", "float32")
+# Coarse-to-fine search: > 0 searches chunks only inside the best N articles (hierarchical.py),
+# float32 storage only
+search_top_units = int(os.getenv("SEARCH_TOP_UNITS", "0"))
+# Token budget for the retrieved context stuffed into the prompt
+context_token_budget = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
 
 #3. Create a Vector Store
- 
 
-# 4️⃣ Store chunks in Chroma vector DB
-persist_directory = "chroma_db"
-vector_store = Chroma.from_texts(
-    texts=texts,  # ✅ must be list of strings
-    embedding=embedding_vectors,
-    collection_name="law_gdpr",
-    persist_directory=persist_directory
-)
+
+def build_retriever():
+    """
+    Ingest (or warm start), build the indexes and the retriever of the QA chain.
+    Returns the packing retriever and the cached embeddings.
+    """
+    if search_top_units and vector_storage != "float32":
+        raise ValueError(f"SEARCH_TOP_UNITS needs VECTOR_STORAGE=float32, not '{vector_storage}'")
+
+    # Vectors are cached on disk by chunk hash, only misses reach the model,
+    # and the model itself is loaded only when something must be embedded
+    embedding_vectors = CachedEmbeddings(
+        LazyEmbeddings(lambda: load_embedding_model(embedding_model_name)),
+        cache_dir=embedding_cache_dir,
+        namespace=embedding_model_name,
+    )
+
+    # 4️⃣ Store chunks in Chroma vector DB, one collection per regulation
+    # Warm start: reopen a collection as is when model, chunking and PDFs are unchanged.
+    # Otherwise incremental: only new or changed chunks are embedded, stale ones deleted
+    persist_directory = "chroma_db"
+    router_path = persist_directory + ".router.json"
+    router = RegulationRouter.load(router_path)
+    xref_path = persist_directory + ".xref.json"
+    xref_graph = CrossReferenceGraph.load(xref_path)
+    # Optional mirror of the article graph in Neo4j (see session_a/ex10.py)
+    neo4j_driver = None
+    if os.getenv("NEO4J_URI"):
+        from neo4j import GraphDatabase
+        neo4j_driver = GraphDatabase.driver(os.getenv("NEO4J_URI"), auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD")))
+    vector_stores, retrievers = {}, {}
+
+    def save_derived_indexes(regulation: str, name: str, vector_store):
+        """Save the BM25 index, router centroid and cross-references of one collection."""
+        build_keyword_index(vector_store, keyword_index_path(persist_directory, name))
+        router.update(regulation, vector_store)
+        router.save(router_path)
+        xref_graph.update(regulation, vector_store)
+        xref_graph.save(xref_path)
+        if neo4j_driver is not None:
+            xref_graph.mirror_to_neo4j(neo4j_driver, regulation)
+
+    # Regulations of already ingested files come from the manifests: no PDF is opened.
+    # Every PDF is hashed once, for the grouping and the warm-start manifests
+    file_hashes = hash_files(pdf_paths)
+    for regulation, paths in group_by_regulation(pdf_paths, known_regulations(persist_directory), file_hashes).items():
+        name = collection_name("law", regulation)
+        # The derived indexes are saved before the warm-start manifest is written
+        vector_store, report = open_or_ingest(
+            persist_directory,
+            name,
+            embedding_vectors,
+            embedding_model_name,
+            paths,
+            chunker=chunker,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            dedup=deduplicate,
+            regulation=regulation,
+            on_ingested=lambda store, _, regulation=regulation, name=name: save_derived_indexes(regulation, name, store),
+            file_hashes=file_hashes,
+        )
+        bm25_path = keyword_index_path(persist_directory, name)
+        if report is None:
+            print(f"♻️ Warm start: reusing {name} ({chroma_access.count(vector_store)} chunks)")
+            # Derived files deleted by hand since the last ingestion
+            if not os.path.exists(bm25_path) or regulation not in router.centroids or regulation not in xref_graph.edges:
+                save_derived_indexes(regulation, name, vector_store)
+        else:
+            print(f"📥 Ingestion {name}: {report}")
+            print(f"🗄️ Embedding cache: {embedding_vectors.stats()}")
+            if deduplicate:
+                saved = saved_index_bytes(report["duplicates"], report["duplicate_bytes"], embedding_dim)
+                print(
+                    f"🧹 Dedup: {report['duplicates']} embeddings saved (~{saved / 1024:.1f} KB of index), "
+                    f"{report['stripped_lines']} header/footer lines stripped"
+                )
+
+        # Exact NumPy search for a corpus this small, Chroma's HNSW index for large ones
+        search_store = open_vector_store(
+            vector_store,
+            storage=vector_storage,
+            rescore_path=f"{persist_directory}.{name}.f32.npy",
+            top_units=search_top_units,
+            # The article index is reused on a warm start, rebuilt after an ingestion
+            units_path=f"{persist_directory}.{name}.units.npz",
+            rebuild_units=report is not None,
+        )
+        if hasattr(search_store, "memory_report"):
+            print(f"🧮 Vector storage {name}: {search_store.memory_report()}")
+
+        vector_stores[regulation] = vector_store
+        # Dense + exact-term retrieval fused by reciprocal rank fusion
+        retrievers[regulation] = hybrid_retriever(search_store, bm25_path)
+
+    for regulation in set(router.centroids) - set(vector_stores):
+        del router.centroids[regulation]  # regulation removed from docs/
+    for regulation in set(xref_graph.edges) - set(vector_stores):
+        del xref_graph.edges[regulation]
+    router.save(router_path)
+    xref_graph.save(xref_path)
+    print(f"🔗 Cross-references: {len(xref_graph)} article -> article edges")
+    if neo4j_driver is not None:
+        neo4j_driver.close()
+
+    # "Article N" questions are a dictionary lookup on the chunk tags, others
+    # search only the collection(s) of the regulation the question is about.
+    # Articles referenced by the hits are appended (one hop, no extra search),
+    # then everything is merged, deduplicated and packed into the token budget
+    lookup = ArticleLookup.from_stores(vector_stores.values(), default_regulation="2016/679")
+    packed_retriever = PackedContextRetriever(
+        retriever=CrossReferenceRetriever(
+            graph=xref_graph,
+            lookup=lookup,
+            retriever=ArticleAwareRetriever(
+                lookup=lookup,
+                retriever=RoutedRetriever(router=router, retrievers=retrievers, embeddings=embedding_vectors),
+            ),
+        ),
+        max_tokens=context_token_budget,
+        model=os.getenv("OPENAI_MODEL_NAME"),
+    )
+    return packed_retriever, embedding_vectors
 
 
 #4. Build a Question-Answering Chain
+def build_qa_chain():
+    """
+    The RetrievalQA chain over `build_retriever()`.
+    Returns the chain, its packing retriever and the cached embeddings.
+    """
+    packed_retriever, embedding_vectors = build_retriever()
+
+    llm = ChatOpenAI(
+        model=os.getenv("OPENAI_MODEL_NAME"),
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_ENDPOINT"),
+        temperature=0
+    )
 
- 
+    qa_chain = RetrievalQA.from_chain_type(
+        llm=llm,
+        retriever=packed_retriever,
+        return_source_documents=True
+    )
+    return qa_chain, packed_retriever, embedding_vectors
 
-llm = ChatOpenAI(
-    model=os.getenv("OPENAI_MODEL_NAME"),
-    api_key=os.getenv("OPENAI_API_KEY"),
-    base_url=os.getenv("OPENAI_ENDPOINT"),
-    temperature=0
-)
 
-qa_chain = RetrievalQA.from_chain_type(
-    llm=llm,
-    retriever=vector_store.as_retriever(),
-    return_source_documents=True
-)
+# The loader uses a process pool, so the script body must not run on import
+if __name__ == "__main__":
+    start = time.perf_counter()
+    qa_chain, packed_retriever, embedding_vectors = build_qa_chain()
 
-# Ask a GDPR question
-query = "What are the rights of a data subject?"
+    # Ask a GDPR question
+    query = "What are the rights of a data subject?"
 
 
-query = "What are the main principles of data processing under GDPR?"
-query = "What are the conditions for lawful processing of personal data under GDPR?"
-result = qa_chain.invoke({"query": query})
+    query = "What are the main principles of data processing under GDPR?"
+    query = "What are the conditions for lawful processing of personal data under GDPR?"
+    result = qa_chain.invoke({"query": query})
 
-print(result["result"])
+    print(result["result"])
+    print(f"✂️ Context packing: {packed_retriever.last_report}")
+    print(f"⏱️ Time to first answer: {time.perf_counter() - start:.2f}s")
 
 
 #5. (Optional) Use LangGraph for Multi-Step Workflows
@@ -99,12 +239,10 @@ print(result["result"])
 # Compliance routing
 # Multiple legal modules
 # Decision-making logic
-# ...then you can use LangGraph to define a stateful graph with LLMs and retrievers. 
+# ...then you can use LangGraph to define a stateful graph with LLMs and retrievers.
 
 
 #6. Deploy (Optional)
 # Expose as an Azure Function (API endpoint)
 # Frontend via React or PowerApps
 # Use Azure Cognitive Search if you need enterprise-grade search and security
-
- 
\ No newline at end of file
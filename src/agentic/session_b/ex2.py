@@ -15,8 +15,10 @@ Goal: Demonstrate a Goal-Driven Reflective Agent
 that learns from user feedback using an LLM and memory.
 
 Features:
-- Persistent memory using ConversationBufferMemory
-- Feedback-based self-improvement
+- Token-budgeted memory: recent turns plus a running summary (memory.py),
+  persisted per session in SQLite (session_store.py)
+- Feedback-based self-improvement, reflections run in the background (reflection.py)
+- Only the past lessons relevant to the question are recalled (lessons.py)
 - OpenAI (or Azure OpenAI) model backend
 """
 """
@@ -60,12 +62,18 @@ Key Concepts:
 
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain.memory import ConversationBufferMemory
-from langchain.schema.runnable import RunnableLambda
+from langchain.schema.runnable import RunnableLambda, RunnablePassthrough
+from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 import os
 import time
 
+from agentic.common.streaming import format_stats, stream_text, summarize
+from agentic.session_b.lessons import LessonStore
+from agentic.session_b.session_store import SessionStore
+from agentic.session_b.reflection import BackgroundReflector
+from agentic.common.embeddings import LazyEmbeddings
+
 # ----------------------------------------------------
 # 1️⃣ Setup
 # ----------------------------------------------------
@@ -78,8 +86,24 @@ llm = ChatOpenAI(
     temperature=0.6,
 )
 
-# Persistent conversational memory (in RAM)
-memory = ConversationBufferMemory(return_messages=True)
+# Conversational memory of this session (SQLite, survives restarts): the recent
+# turns within a token budget, older turns folded into a running summary
+session_store = SessionStore(os.getenv("MEMORY_DB", "memory_db"))
+session_id = os.getenv("SESSION_ID", "default")
+memory = session_store.memory(
+    session_id,
+    llm,
+    max_tokens=int(os.getenv("MEMORY_TOKEN_BUDGET", "1000")),
+    model=os.getenv("OPENAI_MODEL_NAME"),
+)
+
+# Lessons from reflections: own vector index, persisted to lessons.jsonl/.f32;
+# only the few relevant to a question reach the prompt
+lesson_store = LessonStore(
+    LazyEmbeddings(),
+    path=os.getenv("LESSONS_PATH", "lessons"),
+    k=int(os.getenv("LESSONS_K", "3")),
+)
 
 # ----------------------------------------------------
 # 2️⃣ Define prompts
@@ -88,6 +112,9 @@ qa_prompt = ChatPromptTemplate.from_template("""
 You are a GDPR expert assistant.
 Use the conversation so far to give a concise, accurate answer.
 
+Lessons from past feedback:
+{lessons}
+
 Chat History:
 {history}
 
@@ -108,12 +135,18 @@ Please reflect briefly on why and how to improve next time.
 # ----------------------------------------------------
 
 # Prepare input: combine current question + chat history
-prepare_input = RunnableLambda(
-    lambda x: {
+def load_history(x):
+    # Reflections that finished meanwhile are merged; one still running is
+    # not waited for, its lesson reaches a later question
+    reflector.apply_ready(wait=False)
+    lessons = lesson_store.relevant(x["user_input"])
+    return {
         "history": memory.load_memory_variables({}).get("history", ""),
+        "lessons": "\n".join(f"- {lesson}" for lesson in lessons) or "(none)",
         "question": x["user_input"],
     }
-)
+
+prepare_input = RunnableLambda(load_history)
 
 # QA reasoning: prompt → llm
 qa_chain = qa_prompt | llm
@@ -124,29 +157,32 @@ def save_to_memory(data):
         {"user": data["question"]},
         {"ai": data["response"]}
     )
-    return data  # Pass downstream unchanged
-
-save_step = RunnableLambda(save_to_memory)
+    return data
 
 # Reflection pipeline
 reflect_chain = reflect_prompt | llm
 
-# ----------------------------------------------------
-# 4️⃣ Compose the main LCEL agent
-# ----------------------------------------------------
-agent = (
-    prepare_input
-    | RunnableLambda(lambda x: {
-        "response": qa_chain.invoke(x).content,
-        "question": x["question"]
-      })
-    | save_step
+# Reflections run on a background worker, the user can ask the next
+# question at once. The worker also embeds the lesson (the first embedding
+# loads the model), so applying it on the main thread is only an append
+reflect_and_embed = RunnablePassthrough.assign(
+    reflection=reflect_chain | StrOutputParser()
+).assign(
+    vector=RunnableLambda(lambda x: lesson_store.embed(x["question"], x["reflection"]))
 )
 
+def save_reflection(inputs, result):
+    print(f"\n🪞 Reflection: {result['reflection']}")
+    lesson_store.add_vector(inputs["question"], result["reflection"], result["vector"])
+
+reflector = BackgroundReflector(reflect_and_embed, save_reflection)
+
 # ----------------------------------------------------
-# 5️⃣ Interactive reflection loop
+# 4️⃣ Interactive reflection loop
 # ----------------------------------------------------
-print("🧠 Reflective Agent (LCEL) ready! Ask GDPR-related questions. Type 'exit' to quit.\n")
+print(f"🧠 Reflective Agent (LCEL) ready! Session '{session_id}'. Ask GDPR-related questions. Type 'exit' to quit.\n")
+
+turns = []  # latency metrics of every turn
 
 while True:
     user_query = input("You: ").strip()
@@ -154,12 +190,14 @@ while True:
         print("Goodbye!")
         break
 
-    start = time.time()
-    result = agent.invoke({"user_input": user_query})
-    response = result["response"]
-
-    print(f"\nAgent: {response}")
-    print(f"(Response time: {time.time() - start:.2f}s)")
+    # prepare_input → qa_chain → save_to_memory, with the answer streamed to the screen as it is generated
+    start = time.perf_counter()
+    inputs = prepare_input.invoke({"user_input": user_query})
+    print("\nAgent: ", end="", flush=True)
+    response, stats = stream_text(qa_chain.stream(inputs), start)
+    save_to_memory({"question": inputs["question"], "response": response})
+    turns.append(stats)
+    print(f"({format_stats(stats)})")
 
     feedback = input("Feedback (good/bad/exit): ").strip().lower()
 
@@ -170,12 +208,14 @@ while True:
         )
 
     elif feedback == "bad":
-        reflection = reflect_chain.invoke({"answer": response})
-        print(f"\n🪞 Reflection: {reflection.content}")
-        memory.save_context(
-            {"user": "Reflection"},
-            {"ai": reflection.content}
-        )
+        reflector.submit({"question": user_query, "answer": response})
+        print("🪞 Reflecting in the background...")
 
     elif feedback == "exit":
         break
+
+print(f"📊 Latency: {summarize(turns)}")
+
+# Wait for (and save) reflections still running
+reflector.close()
+session_store.close()
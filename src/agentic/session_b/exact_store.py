@@ -0,0 +1,185 @@
+"""
+exact_store.py
+Brute-force exact top-k vector search with NumPy, as an alternative to Chroma.
+
+Our regulation corpora are a few thousand chunks, where an HNSW index adds
+load time and approximate results for no benefit. ExactVectorStore keeps all
+embeddings in one L2-normalised float32 matrix: a query (or a batch of
+queries) is one matrix multiply followed by `argpartition`. It implements the
+LangChain `VectorStore` interface, so `as_retriever()` works unchanged.
+`open_vector_store` picks the exact or the HNSW (Chroma) path by corpus size,
+and optionally a quantized storage mode (see quantized_store.py).
+"""
+
+import uuid
+from typing import Any, Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from agentic.common.embeddings import normalize
+from agentic.session_b import chroma_access
+
+# Above this many chunks the persisted HNSW index (Chroma) is used instead
+EXACT_SEARCH_MAX_CHUNKS = 50_000
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Row-wise top-k of a (queries x chunks) score matrix, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+class ExactVectorStore(VectorStore):
+    """In-memory vector store with exact cosine similarity search."""
+
+    def __init__(self, embedding: Embeddings):
+        self._embedding = embedding
+        self.ids: list[str] = []
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def add_vectors(self, vectors, texts: list[str], metadatas: list[dict] | None = None, ids: list[str] | None = None) -> list[str]:
+        """Add precomputed embeddings (e.g. read back from Chroma) without calling the model."""
+        vectors = normalize(vectors)
+        self.matrix = vectors if self.matrix.size == 0 else np.vstack([self.matrix, vectors])
+        return self._append_records(texts, metadatas, ids)
+
+    def _append_records(self, texts: list[str], metadatas: list[dict] | None, ids: list[str] | None) -> list[str]:
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        self.ids.extend(ids)
+        self.texts.extend(texts)
+        self.metadatas.extend(metadatas or [{} for _ in texts])
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: list[dict] | None = None, ids: list[str] | None = None, **kwargs: Any) -> list[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        return self.add_vectors(self._embedding.embed_documents(texts), texts, metadatas, ids)
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool:
+        drop = set(ids or [])
+        keep = [i for i, chunk_id in enumerate(self.ids) if chunk_id not in drop]
+        self._keep_rows(keep)
+        self.ids = [self.ids[i] for i in keep]
+        self.texts = [self.texts[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        return True
+
+    def _keep_rows(self, keep: list[int]):
+        self.matrix = self.matrix[keep]
+
+    @classmethod
+    def from_texts(cls, texts: list[str], embedding: Embeddings, metadatas: list[dict] | None = None, ids: list[str] | None = None, **kwargs: Any) -> "ExactVectorStore":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    @classmethod
+    def from_chroma(cls, chroma_store) -> "ExactVectorStore":
+        """Load every stored vector of a Chroma collection, no re-embedding."""
+        store = cls(chroma_store.embeddings)
+        stored = chroma_store.get(include=["embeddings", "documents", "metadatas"])
+        if len(stored["ids"]):
+            store.add_vectors(stored["embeddings"], stored["documents"], [m or {} for m in stored["metadatas"]], stored["ids"])
+        return store
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def _select(self, filter: dict | None) -> np.ndarray | None:
+        """Row numbers whose metadata matches every key of `filter`, or None for all rows."""
+        if not filter:
+            return None
+        return np.array(
+            [i for i, meta in enumerate(self.metadatas) if all(meta.get(key) == value for key, value in filter.items())],
+            dtype=np.int64,
+        )
+
+    def search_vectors(self, queries, k: int = 4, filter: dict | None = None) -> list[list[tuple[int, float]]]:
+        """(row, cosine score) top-k for each query vector, with a single matrix multiply."""
+        queries = normalize(queries)
+        if self.matrix.size == 0:
+            return [[] for _ in queries]
+        rows = self._select(filter)
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        indices, scores = top_k(queries @ matrix.T, k)
+        if rows is not None:
+            indices = rows[indices]
+        return [list(zip(map(int, idx), map(float, sc))) for idx, sc in zip(indices, scores)]
+
+    def _to_documents(self, hits: list[tuple[int, float]]) -> list[tuple[Document, float]]:
+        return [
+            (Document(id=self.ids[i], page_content=self.texts[i], metadata=self.metadatas[i]), score)
+            for i, score in hits
+        ]
+
+    def similarity_search_with_score_by_vector(self, embedding: list[float], k: int = 4, filter: dict | None = None, **kwargs: Any) -> list[tuple[Document, float]]:
+        return self._to_documents(self.search_vectors(embedding, k, filter)[0])
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4, filter: dict | None = None, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: dict | None = None, **kwargs: Any) -> list[tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, filter)
+
+    def similarity_search(self, query: str, k: int = 4, filter: dict | None = None, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def similarity_search_batch(self, queries: list[str], k: int = 4, filter: dict | None = None) -> list[list[Document]]:
+        """Answer many queries with one encode call and one matrix multiply."""
+        if not queries:
+            return []
+        hits = self.search_vectors(self._embedding.embed_documents(queries), k, filter)
+        return [[doc for doc, _ in self._to_documents(h)] for h in hits]
+
+    def _select_relevance_score_fn(self):
+        # Scores are already cosine similarities in [-1, 1]
+        return lambda score: (score + 1) / 2
+
+
+def open_vector_store(
+    chroma_store,
+    exact_max_chunks: int = EXACT_SEARCH_MAX_CHUNKS,
+    storage: str = "float32",
+    rescore_path: str | None = None,
+    top_units: int = 0,
+    units_path: str | None = None,
+    rebuild_units: bool = False,
+) -> VectorStore:
+    """
+    Exact in-memory search for small corpora, the persisted HNSW index otherwise.
+    `storage` other than "float32" keeps quantized codes, see quantized_store.py.
+    `top_units` > 0 searches coarse-to-fine (float32 only), see hierarchical.py;
+    its unit index is kept in `units_path`, rebuilt when `rebuild_units`.
+    """
+    if top_units and storage != "float32":
+        raise ValueError(f"Coarse-to-fine search (top_units={top_units}) needs float32 storage, not '{storage}'")
+    if chroma_access.count(chroma_store) > exact_max_chunks:
+        return chroma_store
+    if top_units:
+        # Imported here because hierarchical builds on this module
+        from agentic.session_b.hierarchical import HierarchicalVectorStore
+        return HierarchicalVectorStore.from_chroma(chroma_store, top_units, units_path, rebuild_units)
+    if storage == "float32":
+        return ExactVectorStore.from_chroma(chroma_store)
+    # Imported here because quantized_store builds on this module
+    from agentic.session_b.quantized_store import QuantizedVectorStore
+    return QuantizedVectorStore.from_chroma(chroma_store, storage, rescore_path=rescore_path)
@@ -0,0 +1,167 @@
+"""
+hierarchical.py
+Coarse-to-fine (two-level) exact search: article vectors first, then chunks.
+
+Flat top-k scores every chunk of the collection. HierarchicalVectorStore also
+keeps one vector per unit: the article, recital or annex of a structural
+chunk, or the page of a recursive chunk. A unit vector is the normalised
+mean of its chunk vectors, so it costs no extra embedding call and is
+updated incrementally as chunks are added. A query:
+#1. Scores the unit vectors and keeps the best `top_units` units
+#2. Scores only the chunks of those units and returns the top k
+
+The unit index (chunk ids and summed vectors per unit) is saved next to the
+collection by `from_chroma(units_path=...)` and read back on the next start,
+unless the collection changed or the file no longer matches its chunks.
+
+`bench_hierarchical.py` compares latency and recall with flat search.
+"""
+
+import json
+import os
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from agentic.common.embeddings import normalize
+from agentic.session_b.exact_store import ExactVectorStore, top_k
+
+
+def unit_key(metadata: dict) -> tuple:
+    """Coarse unit of a chunk: its article / recital / annex, else its page."""
+    for kind in ("article", "recital", "annex"):
+        if kind in metadata:
+            return metadata.get("source"), kind, metadata[kind]
+    return metadata.get("source"), "page", metadata.get("page")
+
+
+class HierarchicalVectorStore(ExactVectorStore):
+    """ExactVectorStore that narrows each search to the chunks of the best units."""
+
+    def __init__(self, embedding: Embeddings, top_units: int = 10):
+        super().__init__(embedding)
+        self.top_units = top_units
+        self._reset_units()
+
+    def _reset_units(self):
+        self.unit_index: dict[tuple, int] = {}
+        self.unit_rows: list[list[int]] = []  # chunk rows of each unit
+        self.unit_sums = np.empty((0, 0), dtype=np.float32)
+        self.unit_matrix = np.empty((0, 0), dtype=np.float32)  # normalised means
+
+    # ------------------------------------------------------------------
+    # Incremental unit index
+    # ------------------------------------------------------------------
+    def _index_rows(self, rows: range):
+        """Assign new chunk rows to their units and refresh only the touched unit vectors."""
+        if not len(rows):
+            return
+        dim = self.matrix.shape[1]
+        units = []
+        for row in rows:
+            key = unit_key(self.metadatas[row])
+            if key not in self.unit_index:
+                self.unit_index[key] = len(self.unit_rows)
+                self.unit_rows.append([])
+            unit = self.unit_index[key]
+            self.unit_rows[unit].append(row)
+            units.append(unit)
+
+        grown = len(self.unit_rows) - len(self.unit_sums)
+        if grown:
+            self.unit_sums = np.vstack([self.unit_sums.reshape(-1, dim), np.zeros((grown, dim), dtype=np.float32)])
+            self.unit_matrix = np.vstack([self.unit_matrix.reshape(-1, dim), np.zeros((grown, dim), dtype=np.float32)])
+        np.add.at(self.unit_sums, units, self.matrix[rows.start:rows.stop])
+        touched = np.unique(units)
+        self.unit_matrix[touched] = normalize(self.unit_sums[touched])
+
+    def add_vectors(self, vectors, texts: list[str], metadatas: list[dict] | None = None, ids: list[str] | None = None) -> list[str]:
+        start = len(self.ids)
+        ids = super().add_vectors(vectors, texts, metadatas, ids)
+        self._index_rows(range(start, len(self.ids)))
+        return ids
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool:
+        super().delete(ids, **kwargs)
+        # Row numbers shift on delete: rebuild the (cheap) unit index
+        self._reset_units()
+        self._index_rows(range(len(self.ids)))
+        return True
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save_units(self, path: str):
+        """Write the unit index: the chunk ids of every unit and their summed vectors."""
+        layout = [[list(key), [self.ids[row] for row in rows]] for key, rows in zip(self.unit_index, self.unit_rows)]
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, sums=self.unit_sums, layout=np.array(json.dumps(layout)))
+        os.replace(tmp_path, path)
+
+    def load_units(self, path: str) -> bool:
+        """Read a saved unit index. False if it is missing or does not cover exactly our chunks."""
+        try:
+            with np.load(path) as saved:
+                sums = saved["sums"].astype(np.float32)
+                layout = json.loads(str(saved["layout"]))
+        except (OSError, ValueError, KeyError):
+            return False
+        row_of = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+        unit_rows = [[row_of.get(chunk_id) for chunk_id in ids] for _, ids in layout]
+        rows = [row for unit in unit_rows for row in unit]
+        if len(rows) != len(self.ids) or None in rows or len(sums) != len(layout) or sums.shape[1:] != self.matrix.shape[1:]:
+            return False
+
+        self.unit_index = {tuple(key): unit for unit, (key, _) in enumerate(layout)}
+        self.unit_rows = unit_rows
+        self.unit_sums = sums
+        self.unit_matrix = normalize(sums) if len(sums) else sums
+        return True
+
+    @classmethod
+    def from_chroma(
+        cls,
+        chroma_store,
+        top_units: int = 10,
+        units_path: str | None = None,
+        rebuild_units: bool = False,
+    ) -> "HierarchicalVectorStore":
+        """
+        Load every stored vector of a Chroma collection. With `units_path` the
+        unit index is read from that file, or rebuilt and saved there when
+        `rebuild_units` (the collection changed) or the file does not match.
+        """
+        store = cls(chroma_store.embeddings, top_units)
+        stored = chroma_store.get(include=["embeddings", "documents", "metadatas"])
+        if len(stored["ids"]):
+            # Chunk rows only: the unit index is loaded or built below
+            ExactVectorStore.add_vectors(store, stored["embeddings"], stored["documents"], [m or {} for m in stored["metadatas"]], stored["ids"])
+        if units_path and not rebuild_units and store.load_units(units_path):
+            return store
+        store._index_rows(range(len(store.ids)))
+        if units_path:
+            store.save_units(units_path)
+        return store
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def search_vectors(self, queries, k: int = 4, filter: dict | None = None) -> list[list[tuple[int, float]]]:
+        queries = normalize(queries)
+        if filter or len(self.unit_rows) <= self.top_units:
+            return super().search_vectors(queries, k, filter)
+
+        # 1️⃣ Coarse: best units for every query in one matrix multiply
+        best_units, _ = top_k(queries @ self.unit_matrix.T, self.top_units)
+
+        # 2️⃣ Fine: exact scores of the chunks inside those units only
+        results = []
+        for query, units in zip(queries, best_units):
+            rows = np.fromiter((row for unit in units for row in self.unit_rows[unit]), dtype=np.int64)
+            if len(rows) < k:
+                results.extend(super().search_vectors(query, k))
+                continue
+            indices, scores = top_k((self.matrix[rows] @ query)[None, :], k)
+            results.append(list(zip(map(int, rows[indices[0]]), map(float, scores[0]))))
+        return results
@@ -0,0 +1,247 @@
+"""
+ingest.py
+Incremental, content-hashed ingestion for the regulation vector store.
+
+Every chunk is stored under an id derived from the SHA-256 of its text and
+of the page it came from, and carries the hash of that page and of its file. On a re-run we:
+#1. Skip files whose hash is already stored (no PDF parsing at all)
+#2. Skip pages whose hash is already stored (no embedding)
+#3. Embed and upsert only the chunks whose id is not in the collection
+#4. Delete the chunks that no longer exist in the source documents
+
+Pages come from the parallel loader in loader.py and new chunks are
+embedded batch by batch while later pages are still being parsed.
+
+Two chunkers are available: "recursive" (fixed character windows per page)
+and "structure" (one chunk per recital / article paragraph, see
+structure.py). Chunks also record the chunking they were made with, so
+switching chunker or chunk size re-chunks every file.
+
+With dedup=True, page furniture is stripped before splitting and chunks that
+nearly duplicate a chunk already kept are not embedded (see dedup.py). It
+is meant for the recursive chunker: structural chunks are cleaned by
+structure.py, and only a repeat within the same article or recital is dropped.
+"""
+
+import os
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, TypedDict
+
+from agentic.session_b import chroma_access
+from agentic.session_b.dedup import NearDuplicateFilter
+from agentic.session_b.loader import hash_file, hash_text, iter_pdf_pages
+from agentic.session_b.structure import iter_structured_chunks
+
+CHUNKERS = ("recursive", "structure")
+
+# New chunks are embedded and upserted in batches of this size
+UPSERT_BATCH_SIZE = 256
+
+
+class SyncReport(TypedDict):
+    pages: int
+    added: int
+    deleted: int
+    unchanged: int
+    skipped_files: int
+    duplicates: int  # near-duplicate chunks not embedded
+    duplicate_bytes: int  # their text size
+    stripped_lines: int  # page furniture lines removed
+
+
+def chunk_ids(scope: str, texts: Iterable[str], seen: dict) -> list[str]:
+    """
+    Content-addressed ids for the chunks of one scope: a page ("source\x00page_hash")
+    or, for chunks spanning pages, a whole file.
+    Identical chunks in the same scope get a running suffix so they stay distinct.
+    Page-scoped ids never collide with the ids of another, reused page.
+    """
+    ids = []
+    for text in texts:
+        digest = hash_text(f"{scope}\x00{text}")
+        count = seen.get(digest, 0)
+        seen[digest] = count + 1
+        ids.append(digest if count == 0 else f"{digest}-{count}")
+    return ids
+
+
+def _stored_state(vector_store, chunking: str):
+    """
+    Read ids and hashes of everything already in the collection (no vectors).
+    Only chunks made with the same `chunking` can be reused.
+    """
+    stored = vector_store.get(include=["metadatas"])
+    reusable = set()
+    file_hashes = {}  # source -> every file hash its chunks carry
+    page_ids = {}
+    for chunk_id, meta in zip(stored["ids"], stored["metadatas"]):
+        meta = meta or {}
+        source = meta.get("source")
+        if source is None or meta.get("chunking") != chunking:
+            continue  # legacy chunk or other chunking, will be treated as stale
+        reusable.add(chunk_id)
+        file_hashes.setdefault(source, set()).add(meta.get("file_hash"))
+        page_ids.setdefault((source, meta.get("page_hash")), []).append(chunk_id)
+    return set(stored["ids"]), reusable, file_hashes, page_ids
+
+
+def _unit(metadata: dict) -> tuple:
+    return metadata.get("article"), metadata.get("recital")
+
+
+def sync_documents(
+    vector_store,
+    paths: list[str],
+    chunk_size: int = 300,
+    chunk_overlap: int = 20,
+    max_workers: int | None = None,
+    chunker: str = "recursive",
+    dedup: bool = False,
+    file_hashes: dict[str, str] | None = None,
+) -> SyncReport:
+    """
+    Bring the vector store in line with the given PDF files.
+    Only new or changed chunks are embedded; stale chunks are deleted.
+    With chunker="structure", `chunk_size` is the maximum characters per chunk.
+    `file_hashes` (normalised path -> SHA-256, see loader.hash_files) spares hashing the files again.
+    """
+    if chunker not in CHUNKERS:
+        raise ValueError(f"Unknown chunker '{chunker}', expected one of {CHUNKERS}")
+    chunking = f"{chunker}:{chunk_size}:{chunk_overlap}" + (":dedup" if dedup else "")
+    existing, reusable, stored_hashes, page_ids = _stored_state(vector_store, chunking)
+    keep = set()
+    added = 0
+    duplicates = {"chunks": 0, "bytes": 0}
+    near_duplicates = NearDuplicateFilter() if dedup else None
+    batch = {"ids": [], "texts": [], "metadatas": []}
+    moved = {"ids": [], "metadatas": []}
+
+    def flush():
+        nonlocal added
+        if batch["ids"]:
+            vector_store.add_texts(texts=batch["texts"], metadatas=batch["metadatas"], ids=batch["ids"])
+            added += len(batch["ids"])
+            for values in batch.values():
+                values.clear()
+
+    def add_chunks(scope: str, texts: list[str], metadatas: list[dict]):
+        """Keep the chunks already stored, queue the others for embedding."""
+        for chunk_id, text, metadata in zip(chunk_ids(scope, texts, seen.setdefault(scope, {})), texts, metadatas):
+            if near_duplicates is not None:
+                signature = near_duplicates.signature(text)
+                match = near_duplicates.find(signature)
+                # Never drop the only chunk of an article or recital, the lookup needs it
+                if match is not None and _unit(metadata) in ((None, None), _unit(match)):
+                    duplicates["chunks"] += 1
+                    duplicates["bytes"] += len(text.encode("utf-8"))
+                    continue
+                near_duplicates.add(signature, metadata)
+            keep.add(chunk_id)
+            if chunk_id in reusable:
+                moved["ids"].append(chunk_id)
+                moved["metadatas"].append(metadata)
+                continue
+            batch["ids"].append(chunk_id)
+            batch["texts"].append(text)
+            batch["metadatas"].append(metadata)
+            if len(batch["ids"]) >= UPSERT_BATCH_SIZE:
+                flush()
+
+    # 1️⃣ Unchanged files: keep all their chunks, do not even open the PDF
+    known = file_hashes or {}
+    current_hashes = {
+        os.path.normpath(path): known.get(os.path.normpath(path)) or hash_file(path) for path in paths
+    }
+    changed = []
+    for path in paths:
+        source = os.path.normpath(path)
+        # A sync interrupted after some pages leaves chunks of both versions: not unchanged
+        if stored_hashes.get(source) == {current_hashes[source]}:
+            keep.update(i for (src, _), ids in page_ids.items() if src == source for i in ids)
+        else:
+            changed.append(path)
+
+    # Chunks of unchanged files are the first candidates duplicates are matched to
+    if near_duplicates is not None and changed and keep:
+        stored = vector_store.get(ids=list(keep), include=["documents", "metadatas"])
+        for text, metadata in zip(stored["documents"], stored["metadatas"]):
+            near_duplicates.add(near_duplicates.signature(text), metadata or {})
+
+    seen = {}
+    reused_pages = set()
+    pages = 0
+    stripped_lines = 0
+    # The structural chunker reads the page text: workers skip the recursive splitter
+    loaded = iter_pdf_pages(
+        changed,
+        chunk_size,
+        chunk_overlap,
+        max_workers,
+        strip_furniture=dedup and chunker == "recursive",
+        split=chunker == "recursive",
+    )
+
+    if chunker == "structure":
+        # Articles run across pages: chunk each changed file as a whole
+        def page_texts(file_pages):
+            nonlocal pages
+            for page in file_pages:
+                pages += 1
+                yield page["page"], page["text"]
+
+        for source, file_pages in groupby(loaded, key=itemgetter("source")):
+            texts, metadatas = [], []
+            for text, metadata in iter_structured_chunks(page_texts(file_pages), source, chunk_size):
+                texts.append(text)
+                metadatas.append({**metadata, "file_hash": current_hashes[source], "chunking": chunking})
+            add_chunks(source, texts, metadatas)
+        loaded = ()
+
+    for page in loaded:
+        pages += 1
+        stripped_lines += page["stripped_lines"]
+        source = page["source"]
+        metadata = {
+            "source": source,
+            "page": page["page"],
+            "page_hash": page["page_hash"],
+            "file_hash": current_hashes[source],
+            "chunking": chunking,
+        }
+
+        # 2️⃣ Unchanged page in a changed file: keep the vectors, refresh metadata
+        page_key = (source, page["page_hash"])
+        stored_ids = page_ids.get(page_key)
+        if stored_ids:
+            # Identical pages share their stored ids: reuse them once
+            if page_key in reused_pages:
+                continue
+            reused_pages.add(page_key)
+            keep.update(stored_ids)
+            moved["ids"].extend(stored_ids)
+            moved["metadatas"].extend(dict(metadata) for _ in stored_ids)
+            continue
+
+        # 3️⃣ New or changed page: embed only unseen chunks, streaming in batches
+        add_chunks(f"{source}\x00{page['page_hash']}", page["chunks"], [{**metadata, "start": start} for start in page["starts"]])
+    flush()
+
+    # 4️⃣ Apply the rest of the diff
+    stale = list(existing - keep)
+    if stale:
+        vector_store.delete(ids=stale)
+    if moved["ids"]:
+        # Metadata-only update, does not call the embedding model
+        chroma_access.update_metadata(vector_store, moved["ids"], moved["metadatas"])
+
+    return {
+        "pages": pages,
+        "added": added,
+        "deleted": len(stale),
+        "unchanged": len(keep) - added,
+        "skipped_files": len(paths) - len(changed),
+        "duplicates": duplicates["chunks"],
+        "duplicate_bytes": duplicates["bytes"],
+        "stripped_lines": stripped_lines,
+    }
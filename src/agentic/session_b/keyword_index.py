@@ -0,0 +1,178 @@
+"""
+keyword_index.py
+BM25 keyword retrieval over the law chunks, fused with Chroma by RRF.
+
+Legal questions often hinge on exact terms ("Article 6(1)(f)", "controller",
+"pseudonymisation") that dense retrieval misses. The inverted index is built
+once at ingestion time from the chunks stored in Chroma. Its postings are kept
+in CSR form: one offsets array per vocabulary plus two flat `array`s holding
+the chunk numbers and term frequencies of every posting list back to back.
+It is pickled next to `chroma_db` and loaded lazily on the first query.
+"""
+
+import math
+import os
+import pickle
+import re
+from array import array
+
+import numpy as np
+from langchain.retrievers import EnsembleRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+# "6(1)(f)" is kept as one token (plus "6(1)" and "6"), words are lower-cased
+TOKEN_PATTERN = re.compile(r"\d+(?:\([0-9a-z]+\))*|[a-z]+")
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "what", "which", "with", "under", "does",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased words (naive plural stripping) and article references with their prefixes."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token[0].isdigit():
+            # 6(1)(f) -> 6(1)(f), 6(1), 6
+            while True:
+                tokens.append(token)
+                cut = token.rfind("(")
+                if cut == -1:
+                    break
+                token = token[:cut]
+        elif token not in STOP_WORDS:
+            if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+            tokens.append(token)
+    return tokens
+
+
+class InvertedIndex:
+    """
+    Compact BM25 index. Posting list of term t is
+    docs[offsets[t]:offsets[t + 1]] with frequencies tfs[offsets[t]:offsets[t + 1]].
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = []
+        self.texts = []
+        self.metadatas = []
+        self.terms = {}  # term -> term number
+        self.offsets = array("I", [0])
+        self.docs = array("I")
+        self.tfs = array("H")
+        self.doc_lengths = array("I")
+
+    @classmethod
+    def build(cls, ids: list[str], texts: list[str], metadatas: list[dict]) -> "InvertedIndex":
+        index = cls()
+        index.ids, index.texts, index.metadatas = list(ids), list(texts), list(metadatas)
+
+        postings = {}
+        for number, text in enumerate(texts):
+            tokens = tokenize(text)
+            index.doc_lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, []).append((number, min(count, 0xFFFF)))
+
+        for term_number, (term, entries) in enumerate(sorted(postings.items())):
+            index.terms[term] = term_number
+            for number, count in entries:
+                index.docs.append(number)
+                index.tfs.append(count)
+            index.offsets.append(len(index.docs))
+        return index
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "InvertedIndex":
+        index = cls()
+        with open(path, "rb") as f:
+            index.__dict__.update(pickle.load(f))
+        return index
+
+    def search(self, query: str, k: int = 4) -> list[tuple[int, float]]:
+        """Top-k (chunk number, BM25 score) pairs for the query."""
+        n_docs = len(self.doc_lengths)
+        if n_docs == 0:
+            return []
+        # Zero-copy numpy views over the array-backed postings
+        docs = np.frombuffer(self.docs, dtype=np.uint32)
+        tfs = np.frombuffer(self.tfs, dtype=np.uint16)
+        lengths = np.frombuffer(self.doc_lengths, dtype=np.uint32)
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1))
+
+        scores = np.zeros(n_docs, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_number = self.terms.get(term)
+            if term_number is None:
+                continue
+            start, end = self.offsets[term_number], self.offsets[term_number + 1]
+            postings, tf = docs[start:end], tfs[start:end]
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            scores[postings] += idf * tf * (self.k1 + 1) / (tf + norm[postings])
+
+        k = min(k, n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+
+def keyword_index_path(persist_directory: str, collection_name: str | None = None) -> str:
+    """
+    The keyword index lives next to the Chroma directory, e.g. chroma_db.bm25.pkl,
+    or chroma_db.<collection>.bm25.pkl when the directory holds several collections.
+    """
+    base = os.path.normpath(persist_directory)
+    return f"{base}.{collection_name}.bm25.pkl" if collection_name else base + ".bm25.pkl"
+
+
+def build_keyword_index(vector_store, path: str) -> InvertedIndex:
+    """Build the index from every chunk stored in the collection (no embedding) and save it."""
+    stored = vector_store.get(include=["documents", "metadatas"])
+    index = InvertedIndex.build(stored["ids"], stored["documents"], [m or {} for m in stored["metadatas"]])
+    index.save(path)
+    return index
+
+
+class KeywordRetriever(BaseRetriever):
+    """LangChain retriever over a persisted InvertedIndex, loaded on first use."""
+
+    index_path: str
+    k: int = 4
+    _index: InvertedIndex | None = PrivateAttr(default=None)
+
+    @property
+    def index(self) -> InvertedIndex:
+        if self._index is None:
+            self._index = InvertedIndex.load(self.index_path)
+        return self._index
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        index = self.index
+        return [
+            Document(id=index.ids[i], page_content=index.texts[i], metadata=index.metadatas[i])
+            for i, _ in index.search(query, self.k)
+        ]
+
+
+def hybrid_retriever(vector_store, index_path: str, k: int = 4, weights=(0.5, 0.5)) -> EnsembleRetriever:
+    """Dense (Chroma) + keyword (BM25) retrieval fused by reciprocal rank fusion."""
+    return EnsembleRetriever(
+        retrievers=[
+            vector_store.as_retriever(search_kwargs={"k": k}),
+            KeywordRetriever(index_path=index_path, k=k),
+        ],
+        weights=list(weights),
+    )
@@ -0,0 +1,103 @@
+"""
+lessons.py
+Reflections ("lessons") in their own small vector index, retrieved by relevance.
+
+Saving every reflection into the conversation memory replays all of them in
+every prompt. LessonStore keeps them apart:
+#1. Each lesson is embedded together with the question that triggered it
+    and added to an in-memory ExactVectorStore
+#2. It is appended to `<path>.jsonl` (texts) and `<path>.f32` (raw float32
+    vectors): one small append per lesson, and a restart reloads the index
+    without calling the embedding model
+#3. For a new question only the `k` most similar lessons (above `min_score`)
+    go into the prompt, so the prompt stays the same size however many
+    lessons accumulate
+"""
+
+import json
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from agentic.session_b.exact_store import ExactVectorStore
+
+
+class LessonStore:
+    """Persistent, append-only vector index of lessons learned from feedback."""
+
+    def __init__(self, embeddings: Embeddings, path: str = "lessons", k: int = 3, min_score: float = 0.3):
+        self.embeddings = embeddings
+        self.k = k
+        self.min_score = min_score
+        self._records_path = path + ".jsonl"
+        self._vectors_path = path + ".f32"
+        self.store = ExactVectorStore(embeddings)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self._records_path) and not os.path.exists(self._vectors_path):
+            return
+        records, partial = [], False
+        if os.path.exists(self._records_path):
+            with open(self._records_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        partial = True  # last line of an interrupted append
+                        break
+        vectors = np.fromfile(self._vectors_path, dtype=np.float32) if os.path.exists(self._vectors_path) else np.empty(0, np.float32)
+        dim = records[0]["dim"] if records else 0
+        count = min(len(records), len(vectors) // dim) if dim else 0
+
+        # An interrupted append may leave one file a record ahead of the other:
+        # cut both back to the complete pairs, or the next append would pair
+        # every later lesson with the vector of the one before
+        if partial or count < len(records) or count * dim < len(vectors):
+            self._truncate(records[:count], count * dim)
+        if count:
+            self.store.add_vectors(
+                vectors[: count * dim].reshape(count, dim),
+                [r["lesson"] for r in records[:count]],
+                [{"question": r["question"]} for r in records[:count]],
+            )
+
+    @staticmethod
+    def _record_line(record: dict) -> str:
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    def _truncate(self, records: list[dict], floats: int):
+        tmp_path = self._records_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(self._record_line(r) for r in records)
+        os.replace(tmp_path, self._records_path)
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(floats * 4)
+
+    def __len__(self) -> int:
+        return len(self.store.ids)
+
+    def embed(self, question: str, lesson: str) -> np.ndarray:
+        """The vector a lesson is indexed under (a model call: may run on a worker thread)."""
+        return np.asarray(self.embeddings.embed_documents([f"{question}\n{lesson}"])[0], dtype=np.float32)
+
+    def add(self, question: str, lesson: str):
+        """Index a lesson under the question it was learned from, and append it to disk."""
+        self.add_vector(question, lesson, self.embed(question, lesson))
+
+    def add_vector(self, question: str, lesson: str, vector: np.ndarray):
+        """add() with the vector already computed by embed(): no model call."""
+        vector = np.asarray(vector, dtype=np.float32)
+        self.store.add_vectors(vector, [lesson], [{"question": question}])
+        with open(self._vectors_path, "ab") as f:
+            vector.tofile(f)
+        with open(self._records_path, "a", encoding="utf-8") as f:
+            f.write(self._record_line({"question": question, "lesson": lesson, "dim": len(vector)}))
+
+    def relevant(self, question: str, k: int | None = None) -> list[str]:
+        """The lessons most similar to `question`, best first (no model call while empty)."""
+        if not len(self):
+            return []
+        hits = self.store.search_vectors(self.embeddings.embed_query(question), k or self.k)[0]
+        return [self.store.texts[row] for row, score in hits if score >= self.min_score]
@@ -0,0 +1,165 @@
+"""
+loader.py
+Parallel, streaming PDF parsing and chunking for the docs/ corpus.
+
+Pages are extracted and split in a process pool, a few pages per task,
+and handed back in document order as a generator. Only a bounded window
+of tasks is in flight, so peak memory does not grow with the corpus and
+the first chunks reach the embedding model while later pages are parsed.
+
+With strip_furniture=True, the lines repeated on most pages of a file
+(running headers and footers, see dedup.py) are removed before splitting;
+pages are then handed out once their whole file has been extracted.
+With split=False the workers only extract the text (for the structural
+chunker, which chunks whole files itself).
+"""
+
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterator, TypedDict
+
+from pypdf import PdfReader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from agentic.session_b.dedup import furniture_lines, remove_furniture
+
+PAGES_PER_TASK = 8
+
+
+class PageChunks(TypedDict):
+    source: str
+    page: int
+    page_hash: str
+    text: str
+    chunks: list[str]
+    starts: list[int]  # character offset of each chunk in the page text
+    stripped_lines: int  # page furniture lines removed before splitting
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 hex digest of a piece of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 hex digest of a file's bytes, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_files(paths: list[str]) -> dict[str, str]:
+    """Normalised path -> SHA-256 of every file, to hash each PDF once per start."""
+    return {os.path.normpath(path): hash_file(path) for path in paths}
+
+
+# Per-process splitters, built once in each worker
+_splitters = {}
+
+
+def _get_splitter(chunk_size: int, chunk_overlap: int):
+    key = (chunk_size, chunk_overlap)
+    if key not in _splitters:
+        _splitters[key] = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return _splitters[key]
+
+
+def _extract_pages(path: str, start: int, stop: int, chunk_size: int, chunk_overlap: int, split: bool = True) -> list[PageChunks]:
+    """Worker task: extract and split pages [start, stop) of one PDF."""
+    reader = PdfReader(path)
+    splitter = _get_splitter(chunk_size, chunk_overlap) if split else None
+    source = os.path.normpath(path)
+    pages = []
+    for number in range(start, stop):
+        text = reader.pages[number].extract_text()
+        chunks = splitter.split_text(text) if split else []
+        pages.append({
+            "source": source,
+            "page": number,
+            "page_hash": hash_text(text),
+            "text": text,
+            "chunks": chunks,
+            "starts": _chunk_starts(text, chunks),
+            "stripped_lines": 0,
+        })
+    return pages
+
+
+def _split_without_furniture(file_pages: list[PageChunks], chunk_size: int, chunk_overlap: int) -> list[PageChunks]:
+    """Split the pages of one file after removing the lines repeated on most of its pages."""
+    splitter = _get_splitter(chunk_size, chunk_overlap)
+    furniture = furniture_lines([page["text"] for page in file_pages])
+    for page in file_pages:
+        text, page["stripped_lines"] = remove_furniture(page["text"], furniture)
+        page["chunks"] = splitter.split_text(text)
+        page["starts"] = _chunk_starts(text, page["chunks"])
+    return file_pages
+
+
+def _chunk_starts(text: str, chunks: list[str]) -> list[int]:
+    """Offsets of consecutive (possibly overlapping) chunks in the text they were split from."""
+    starts = []
+    cursor = 0
+    for chunk in chunks:
+        position = text.find(chunk, cursor)
+        if position < 0:
+            position = max(text.find(chunk), 0)
+        starts.append(position)
+        cursor = position + 1
+    return starts
+
+
+def iter_pdf_pages(
+    paths: list[str],
+    chunk_size: int = 300,
+    chunk_overlap: int = 20,
+    max_workers: int | None = None,
+    strip_furniture: bool = False,
+    split: bool = True,
+) -> Iterator[PageChunks]:
+    """
+    Yield the split pages of every PDF in `paths`, file by file and in page order.
+    At most 2 * max_workers tasks are pending at any time.
+    With split=False pages carry their text only (no chunks, no furniture stripping).
+    """
+    if not split:
+        yield from _iter_pages(paths, chunk_size, chunk_overlap, max_workers, split=False)
+        return
+    if strip_furniture:
+        # Furniture is found per file, so split once all its pages are extracted
+        unsplit = _iter_pages(paths, chunk_size, chunk_overlap, max_workers, split=False)
+        for _, file_pages in groupby(unsplit, key=itemgetter("source")):
+            yield from _split_without_furniture(list(file_pages), chunk_size, chunk_overlap)
+        return
+    yield from _iter_pages(paths, chunk_size, chunk_overlap, max_workers)
+
+
+def _iter_pages(
+    paths: list[str],
+    chunk_size: int,
+    chunk_overlap: int,
+    max_workers: int | None,
+    split: bool = True,
+) -> Iterator[PageChunks]:
+    max_workers = max_workers or os.cpu_count() or 1
+    tasks = (
+        (path, start, min(start + PAGES_PER_TASK, page_count))
+        for path in paths
+        for page_count in [len(PdfReader(path).pages)]
+        for start in range(0, page_count, PAGES_PER_TASK)
+    )
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for path, start, stop in tasks:
+            pending.append(pool.submit(_extract_pages, path, start, stop, chunk_size, chunk_overlap, split))
+            if len(pending) >= 2 * max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,120 @@
+"""
+memory.py
+Token-budgeted conversation memory with an incrementally updated summary.
+
+ConversationBufferMemory re-sends the whole history on every turn, so the
+prompt (and the latency) grows with every question. TokenBudgetMemory keeps:
+- the most recent messages, within `max_tokens`
+- one running summary of everything older
+
+When a new exchange pushes the window over budget, the oldest messages are
+folded into the summary with ONE LLM call that sees only the previous
+summary and those messages, and the window shrinks to `retain_share` of the
+budget, so the next fold is several turns away. Below the budget no LLM
+call is made. It is a regular LangChain memory: `load_memory_variables`
+works in an LCEL `prepare_input` step and it plugs into `AgentExecutor(memory=...)`.
+"""
+
+from typing import Any
+
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import PrivateAttr
+
+from agentic.session_b.context_packing import get_encoding
+
+# Per-message overhead of the chat format, as counted by OpenAI
+MESSAGE_OVERHEAD_TOKENS = 4
+
+summary_prompt = ChatPromptTemplate.from_template("""
+Progressively summarize the conversation, adding onto the previous summary.
+Keep facts, decisions and user preferences; drop small talk. Be concise.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{new_lines}
+
+New summary:""")
+
+
+class TokenBudgetMemory(BaseChatMemory):
+    """Recent messages within a token budget, plus a running summary of older ones."""
+
+    llm: BaseLanguageModel
+    max_tokens: int = 1000
+    # Share of the budget kept after a fold (hysteresis: fold rarely, in batches)
+    retain_share: float = 0.5
+    memory_key: str = "history"
+    human_prefix: str = "Human"
+    ai_prefix: str = "AI"
+    summary: str = ""
+    model: str | None = None
+    _encoding: Any = PrivateAttr(default=None)
+
+    @property
+    def memory_variables(self) -> list[str]:
+        return [self.memory_key]
+
+    @property
+    def encoding(self):
+        if self._encoding is None:
+            self._encoding = get_encoding(self.model)
+        return self._encoding
+
+    def count_tokens(self, messages: list[BaseMessage]) -> int:
+        return sum(len(self.encoding.encode(str(m.content))) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+    def buffer_messages(self) -> list[BaseMessage]:
+        summary = [SystemMessage(content=f"Summary of the earlier conversation: {self.summary}")] if self.summary else []
+        return summary + self.chat_memory.messages
+
+    def load_memory_variables(self, inputs: dict[str, Any]) -> dict[str, Any]:
+        messages = self.buffer_messages()
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {self.memory_key: get_buffer_string(messages, human_prefix=self.human_prefix, ai_prefix=self.ai_prefix)}
+
+    def save_context(self, inputs: dict[str, Any], outputs: dict[str, str]) -> None:
+        super().save_context(inputs, outputs)
+        self.fold()
+
+    def fold(self) -> bool:
+        """Summarise the oldest messages if the window is over budget. True if it folded."""
+        messages = self.chat_memory.messages
+        sizes = [self.count_tokens([m]) for m in messages]
+        if sum(sizes) <= self.max_tokens:
+            return False
+
+        # Keep the newest messages within retain_share of the budget (at least the last one)
+        kept, total = len(messages), 0
+        while kept > 1 and total + sizes[kept - 1] <= self.max_tokens * self.retain_share:
+            kept -= 1
+            total += sizes[kept]
+        kept = min(kept, len(messages) - 1)
+        # Fold whole turns: the window starts with a human message when it can
+        while kept < len(messages) - 1 and messages[kept].type != "human":
+            kept += 1
+
+        new_lines = get_buffer_string(messages[:kept], human_prefix=self.human_prefix, ai_prefix=self.ai_prefix)
+        try:
+            summary = self.llm.invoke(summary_prompt.format_messages(summary=self.summary or "(none)", new_lines=new_lines)).content
+        except Exception as e:
+            # The answer was already shown: keep the turns unfolded, the next save retries
+            print(f"⚠️ Memory not summarised: {e!r}")
+            return False
+        self.summary = summary
+        if hasattr(self.chat_memory, "fold"):
+            # Persistent history (session_store.py): keeps its log, moves its window
+            self.chat_memory.fold(self.summary, len(messages) - kept)
+        else:
+            self.chat_memory.clear()
+            self.chat_memory.add_messages(messages[kept:])
+        return True
+
+    def clear(self) -> None:
+        super().clear()
+        self.summary = ""
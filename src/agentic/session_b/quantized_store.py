@@ -0,0 +1,226 @@
+"""
+quantized_store.py
+Quantized and dimension-reduced embedding storage for the exact search backend.
+
+The 384-dim float32 MiniLM vectors take 1.5 KB per chunk. QuantizedVectorStore
+trades accuracy for RAM with a single storage setting:
+
+    "int8"          scalar quantization, one scale per dimension (4x smaller)
+    "int8-pca128"   PCA truncation to 128 dims, then int8 (12x smaller per vector)
+    "binary"        sign bits (32x smaller), Hamming distance pre-filter, then
+                    full-precision rescoring of a shortlist read from an
+                    on-disk memmap, so the float32 vectors are not kept in RAM
+    "binary-pca128" the same on PCA-projected vectors
+
+`memory_report()` gives the bytes saved, `recall_at_k()` the recall against
+the full-precision ExactVectorStore.
+
+Without a `rescore_path` the binary modes map a temporary file, deleted by
+`close()` (or when the store is garbage collected / the process exits).
+"""
+
+import os
+import re
+import tempfile
+import weakref
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from agentic.common.embeddings import normalize
+from agentic.session_b.exact_store import ExactVectorStore, top_k
+
+# Set bits per byte value, for Hamming distances on packed codes
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+STORAGE_PATTERN = re.compile(r"^(int8|binary)(?:-pca(\d+))?$")
+# Rows scored per block, bounds the float32 temporaries during int8 search
+SEARCH_BLOCK_ROWS = 8192
+
+
+def parse_storage(storage: str) -> tuple[str, int | None]:
+    """'int8-pca128' -> ('int8', 128)."""
+    match = STORAGE_PATTERN.match(storage)
+    if not match:
+        raise ValueError(f"Unknown vector storage '{storage}', expected float32, int8[-pcaN] or binary[-pcaN]")
+    return match.group(1), int(match.group(2)) if match.group(2) else None
+
+
+def _remove_files(*paths: str):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class QuantizedVectorStore(ExactVectorStore):
+    """ExactVectorStore that keeps int8 or binary codes instead of the float32 matrix."""
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        storage: str = "int8",
+        rescore_path: str | None = None,
+        rescore_factor: int = 8,
+    ):
+        super().__init__(embedding)
+        self.storage = storage
+        self.mode, self.pca_dim = parse_storage(storage)
+        self.rescore_factor = rescore_factor
+        self.rescore_path = rescore_path or os.path.join(tempfile.gettempdir(), f"rescore-{os.getpid()}-{id(self)}.npy")
+        # A temporary rescore file is ours to delete, a persisted one is kept
+        self._cleanup = None if rescore_path else weakref.finalize(
+            self, _remove_files, self.rescore_path, self.rescore_path + ".tmp.npy"
+        )
+        self.dim = 0
+        self.mean = None  # PCA centre
+        self.components = None  # (dim, pca_dim) projection
+        self.scale = None  # int8 step per dimension
+        self.codes = None  # (n, dims) int8 or (n, dims / 8) packed bits
+        self.full = None  # binary mode: memmap of the float32 vectors
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        if self.components is None:
+            return vectors
+        return normalize((vectors - self.mean) @ self.components)
+
+    def _fit(self, vectors: np.ndarray):
+        """Fit PCA and the int8 scales on the first batch of vectors."""
+        self.dim = vectors.shape[1]
+        if self.pca_dim and self.pca_dim < self.dim:
+            self.mean = vectors.mean(axis=0)
+            _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+            self.components = np.ascontiguousarray(vt[: self.pca_dim].T, dtype=np.float32)
+        if self.mode == "int8":
+            projected = self._project(vectors)
+            self.scale = np.maximum(np.abs(projected).max(axis=0), 1e-6) / 127
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        projected = self._project(vectors)
+        if self.mode == "int8":
+            return np.clip(np.rint(projected / self.scale), -127, 127).astype(np.int8)
+        return np.packbits(projected > 0, axis=1)
+
+    def _write_full(self, vectors: np.ndarray):
+        """Binary mode: keep the float32 vectors on disk only, mapped for rescoring."""
+        # Write a new file and swap it in, never truncate a file that is mapped
+        self.full = None
+        tmp_path = self.rescore_path + ".tmp.npy"
+        np.save(tmp_path, vectors)
+        os.replace(tmp_path, self.rescore_path)
+        self.full = np.load(self.rescore_path, mmap_mode="r")
+
+    def add_vectors(self, vectors, texts: list[str], metadatas: list[dict] | None = None, ids: list[str] | None = None) -> list[str]:
+        vectors = normalize(vectors)
+        if self.codes is None:
+            self._fit(vectors)
+            self.codes = self._encode(vectors)
+        else:
+            self.codes = np.vstack([self.codes, self._encode(vectors)])
+        if self.mode == "binary":
+            self._write_full(vectors if self.full is None else np.vstack([self.full, vectors]))
+        # The float32 matrix of the parent class stays empty
+        return self._append_records(texts, metadatas, ids)
+
+    def _keep_rows(self, keep: list[int]):
+        if self.codes is not None:
+            self.codes = self.codes[keep]
+        if self.full is not None:
+            self._write_full(np.asarray(self.full[keep]))
+
+    def close(self):
+        """Unmap the rescore vectors and delete them if they live in a temporary file."""
+        self.full = None
+        if self._cleanup is not None:
+            self._cleanup()
+
+    @classmethod
+    def from_exact(cls, store: ExactVectorStore, storage: str, **kwargs: Any) -> "QuantizedVectorStore":
+        quantized = cls(store.embeddings, storage, **kwargs)
+        if store.ids:
+            quantized.add_vectors(store.matrix, store.texts, store.metadatas, store.ids)
+        return quantized
+
+    @classmethod
+    def from_chroma(cls, chroma_store, storage: str = "int8", **kwargs: Any) -> "QuantizedVectorStore":
+        quantized = cls(chroma_store.embeddings, storage, **kwargs)
+        stored = chroma_store.get(include=["embeddings", "documents", "metadatas"])
+        if len(stored["ids"]):
+            quantized.add_vectors(stored["embeddings"], stored["documents"], [m or {} for m in stored["metadatas"]], stored["ids"])
+        return quantized
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def _search_int8(self, queries: np.ndarray, codes: np.ndarray, k: int):
+        weighted = self._project(queries) * self.scale
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), SEARCH_BLOCK_ROWS):
+            block = codes[start:start + SEARCH_BLOCK_ROWS]
+            scores[:, start:start + len(block)] = weighted @ block.T.astype(np.float32)
+        return top_k(scores, k)
+
+    def _search_binary(self, queries: np.ndarray, rows: np.ndarray, k: int):
+        query_bits = np.packbits(self._project(queries) > 0, axis=1)
+        codes = self.codes[rows]
+        shortlist_size = min(len(rows), max(k, k * self.rescore_factor))
+        indices = np.empty((len(queries), min(k, len(rows))), dtype=np.int64)
+        scores = np.empty(indices.shape, dtype=np.float32)
+        for q, (query, bits) in enumerate(zip(queries, query_bits)):
+            distances = POPCOUNT[np.bitwise_xor(codes, bits)].sum(axis=1, dtype=np.int32)
+            shortlist = np.argpartition(distances, shortlist_size - 1)[:shortlist_size]
+            # Full-precision rescoring touches only the shortlisted rows of the memmap
+            exact = np.asarray(self.full[rows[shortlist]]) @ query
+            best, best_scores = top_k(exact[None, :], k)
+            indices[q], scores[q] = shortlist[best[0]], best_scores[0]
+        return indices, scores
+
+    def search_vectors(self, queries, k: int = 4, filter: dict | None = None) -> list[list[tuple[int, float]]]:
+        queries = normalize(queries)
+        if not self.ids:
+            return [[] for _ in queries]
+        rows = self._select(filter)
+        if rows is None:
+            rows = np.arange(len(self.ids))
+        if len(rows) == 0:
+            return [[] for _ in queries]
+        if self.mode == "int8":
+            indices, scores = self._search_int8(queries, self.codes[rows], k)
+        else:
+            indices, scores = self._search_binary(queries, rows, k)
+        indices = rows[indices]
+        return [list(zip(map(int, idx), map(float, sc))) for idx, sc in zip(indices, scores)]
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def memory_report(self) -> dict:
+        """Resident bytes of the vectors compared with a float32 matrix."""
+        n = len(self.ids)
+        full_precision = n * self.dim * 4
+        resident = sum(
+            array.nbytes for array in (self.codes, self.scale, self.mean, self.components) if array is not None
+        )
+        return {
+            "storage": self.storage,
+            "chunks": n,
+            "float32_bytes": full_precision,
+            "resident_bytes": resident,
+            "saved_bytes": full_precision - resident,
+            "compression": round(full_precision / resident, 2) if resident else None,
+        }
+
+    def recall_at_k(self, reference: ExactVectorStore, query_vectors, k: int = 4) -> float:
+        """Mean fraction of the reference (full-precision) top-k found by this store."""
+        truth = reference.search_vectors(query_vectors, k)
+        found = self.search_vectors(query_vectors, k)
+        recalls = []
+        for expected, got in zip(truth, found):
+            expected_ids = {reference.ids[i] for i, _ in expected}
+            got_ids = {self.ids[i] for i, _ in got}
+            recalls.append(len(expected_ids & got_ids) / max(len(expected_ids), 1))
+        return float(np.mean(recalls)) if recalls else 0.0
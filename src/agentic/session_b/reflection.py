@@ -0,0 +1,57 @@
+"""
+reflection.py
+Run reflections on a background worker so the next question does not wait for them.
+
+A "bad" feedback used to call `reflect_chain.invoke` inline: the user waited
+for a full extra LLM call before being able to type. BackgroundReflector:
+#1. Submits the reflection to a single worker thread and returns at once
+#2. Applies finished reflections (e.g. saves them into memory) on the
+    caller's thread, in submission order, via `on_reflection`
+#3. `apply_ready(wait=True)` before the history is read again: a pending
+    reflection is always applied before the next question uses the memory.
+    The reflection normally finishes while the user types, so this rarely waits
+
+Only the caller's thread touches the memory, so it needs no lock.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class BackgroundReflector:
+    """One-worker reflection queue whose results are applied in order by the caller."""
+
+    def __init__(self, reflect_chain, on_reflection: Callable[[dict, Any], None]):
+        self.reflect_chain = reflect_chain
+        self.on_reflection = on_reflection  # (inputs, chain output; a message's content) -> None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reflection")
+        self._pending: deque[tuple[dict, Future]] = deque()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, inputs: dict) -> Future:
+        """Reflect on `inputs` (the reflect_chain variables, e.g. question and answer)."""
+        future = self._pool.submit(self.reflect_chain.invoke, inputs)
+        self._pending.append((inputs, future))
+        return future
+
+    def apply_ready(self, wait: bool = False) -> int:
+        """Apply finished reflections in submission order (all of them with `wait`). Returns how many."""
+        applied = 0
+        while self._pending and (wait or self._pending[0][1].done()):
+            inputs, future = self._pending.popleft()
+            try:
+                reflection = future.result()
+            except Exception as e:
+                print(f"⚠️ Reflection failed: {e!r}")
+                continue
+            self.on_reflection(inputs, getattr(reflection, "content", reflection))
+            applied += 1
+        return applied
+
+    def close(self):
+        self.apply_ready(wait=True)
+        self._pool.shutdown()
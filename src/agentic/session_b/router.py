@@ -0,0 +1,154 @@
+"""
+router.py
+One collection per regulation, and a router that sends each query only to
+the collection(s) it is about.
+
+Each regulation in docs/ (GDPR 2016/679, Clinical Trials 536/2014, ...) is
+ingested into its own Chroma collection. At ingestion the router stores the
+centroid of every collection (mean of its normalised chunk vectors) in
+`chroma_db.router.json`. For a query it:
+#1. Routes directly when the query names a regulation ("GDPR", "2016/679")
+#2. Otherwise compares the query vector with the centroids: the best
+    collection alone if it leads the runner-up by at least `margin`,
+    every collection when the decision is not that clear
+
+Routing is a handful of dot products, so the cost per query stays flat as
+regulations are added; only the chosen collections are searched.
+"""
+
+import json
+import os
+
+import numpy as np
+from pypdf import PdfReader
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from agentic.common.embeddings import normalize
+from agentic.session_b.loader import hash_file
+from agentic.session_b.structure import REGULATION_ALIASES, regulation_id
+
+# Minimum similarity lead of the best centroid to route to it alone
+ROUTER_MARGIN = 0.05
+
+
+def collection_name(base: str, regulation: str) -> str:
+    """'law', '2016/679' -> 'law_2016_679' (valid Chroma collection name)."""
+    return f"{base}_{regulation.replace('/', '_')}"
+
+
+def group_by_regulation(
+    paths: list[str],
+    known: dict[str, str] | None = None,
+    file_hashes: dict[str, str] | None = None,
+) -> dict[str, list[str]]:
+    """
+    PDF paths per regulation number. `known` (file hash -> regulation, from the
+    warm-start manifests) spares opening the PDF; other files are identified
+    by the title on their first page. `file_hashes` (loader.hash_files) spares
+    hashing them again.
+    """
+    groups = {}
+    hashes = file_hashes or {}
+    for path in paths:
+        regulation = None
+        if known:
+            regulation = known.get(hashes.get(os.path.normpath(path)) or hash_file(path))
+        if regulation is None:
+            regulation = regulation_id(PdfReader(path).pages[0].extract_text())
+        groups.setdefault(regulation or os.path.splitext(os.path.basename(path))[0], []).append(path)
+    return groups
+
+
+class RegulationRouter:
+    """Centroid (and named-regulation) router over per-regulation collections."""
+
+    def __init__(self, margin: float = ROUTER_MARGIN):
+        self.margin = margin
+        self.centroids: dict[str, np.ndarray] = {}
+
+    # ------------------------------------------------------------------
+    # Build and persist
+    # ------------------------------------------------------------------
+    def update(self, regulation: str, vector_store):
+        """(Re)compute the centroid of one regulation's collection from its stored vectors."""
+        stored = vector_store.get(include=["embeddings"])
+        if len(stored["ids"]):
+            vectors = normalize(stored["embeddings"])
+            self.centroids[regulation] = normalize(vectors.mean(axis=0, keepdims=True))[0]
+        else:
+            self.centroids.pop(regulation, None)
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"margin": self.margin, "centroids": {r: c.tolist() for r, c in self.centroids.items()}}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RegulationRouter":
+        router = cls()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            router.margin = data.get("margin", ROUTER_MARGIN)
+            router.centroids = {r: np.asarray(c, dtype=np.float32) for r, c in data["centroids"].items()}
+        return router
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+    def route(self, query: str, query_vector) -> list[str]:
+        """Regulations to search for this query, best first."""
+        regulations = list(self.centroids)
+        lowered = query.lower()
+        named = [r for r in regulations if r in query or any(a in lowered for a, reg in REGULATION_ALIASES.items() if reg == r)]
+        if named:
+            return named
+        if len(regulations) <= 1:
+            return regulations
+
+        matrix = np.stack([self.centroids[r] for r in regulations])
+        scores = matrix @ normalize(query_vector)[0]
+        order = np.argsort(-scores)
+        if scores[order[0]] - scores[order[1]] >= self.margin:
+            return [regulations[order[0]]]
+        return [regulations[i] for i in order]
+
+
+class RoutedRetriever(BaseRetriever):
+    """
+    Runs only the retrievers of the routed regulations and interleaves their
+    results by rank. `embeddings` is the CachedEmbeddings shared by the
+    collections: the query is embedded once, for routing and for search.
+    By default (k=None) as many documents are returned as the deepest
+    retriever gave, e.g. the full fused hybrid list of a single regulation.
+    """
+
+    router: RegulationRouter
+    retrievers: dict[str, BaseRetriever]
+    embeddings: object
+    k: int | None = None
+    _last_route: list[str] = PrivateAttr(default_factory=list)
+
+    @property
+    def last_route(self) -> list[str]:
+        return self._last_route
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        self.embeddings.prime_queries([query])
+        routed = [r for r in self.router.route(query, self.embeddings.embed_query(query)) if r in self.retrievers]
+        # Local route: the retriever is shared by the batch mode's worker threads
+        route = routed or list(self.retrievers)
+        ranked = [
+            self.retrievers[regulation].invoke(query, config={"callbacks": run_manager.get_child()})
+            for regulation in route
+        ]
+        self._last_route = route  # diagnostics of the latest request
+        depth = max((len(docs) for docs in ranked), default=0)
+        merged = []
+        for position in range(depth):
+            merged.extend(docs[position] for docs in ranked if position < len(docs))
+        return merged[: self.k or depth]
@@ -0,0 +1,161 @@
+"""
+session_store.py
+Persistent per-session conversation memory on SQLite (WAL), sharded by session id.
+
+One global in-RAM memory can neither serve several users nor survive a
+restart. SessionStore keeps every session's messages on disk:
+- `shards` SQLite files (memory_db/shard-N.sqlite); a session always lives in
+  the shard of its id hash, so writers of different shards never wait on each
+  other, and WAL mode lets readers run alongside the writer of a shard
+- one connection per thread and shard (sqlite3 connections are not shared
+  across threads), constant SQL strings so sqlite3 reuses the prepared
+  statements, and one transaction per batch of messages
+- the full log stays on disk; each session stores its running summary and
+  where its recent window starts. A history loads only that window (an
+  index range scan), so opening a session is O(window), not O(history)
+
+`SessionStore.memory(session_id, llm)` returns a TokenBudgetMemory backed by
+the session's history: a fold saves the summary and moves the window start.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from agentic.session_b.memory import TokenBudgetMemory
+
+# Upper bound on the messages loaded for one window
+MAX_WINDOW_MESSAGES = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_by_session ON messages (session_id, seq);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL DEFAULT '',
+    window_start INTEGER NOT NULL DEFAULT 0
+);
+"""
+SELECT_SESSION = "SELECT summary, window_start FROM sessions WHERE session_id = ?"
+SELECT_WINDOW = "SELECT seq, message FROM messages WHERE session_id = ? AND seq > ? ORDER BY seq DESC LIMIT ?"
+INSERT_MESSAGE = "INSERT INTO messages (session_id, message) VALUES (?, ?)"
+UPSERT_SESSION = (
+    "INSERT INTO sessions (session_id, summary, window_start) VALUES (?, ?, ?) "
+    "ON CONFLICT (session_id) DO UPDATE SET summary = excluded.summary, window_start = excluded.window_start"
+)
+DELETE_MESSAGES = "DELETE FROM messages WHERE session_id = ?"
+DELETE_SESSION = "DELETE FROM sessions WHERE session_id = ?"
+
+
+class SessionStore:
+    """Sharded SQLite files holding the message logs of many sessions."""
+
+    def __init__(self, directory: str = "memory_db", shards: int = 8, window: int = MAX_WINDOW_MESSAGES):
+        self.directory = directory
+        self.shards = shards
+        self.window = window
+        self._local = threading.local()
+        os.makedirs(directory, exist_ok=True)
+
+    def shard(self, session_id: str) -> int:
+        digest = hashlib.blake2b(session_id.encode("utf-8"), digest_size=4).digest()
+        return int.from_bytes(digest, "big") % self.shards
+
+    def connection(self, session_id: str) -> sqlite3.Connection:
+        """This thread's connection to the shard of `session_id`."""
+        connections = self._local.__dict__.setdefault("connections", {})
+        shard = self.shard(session_id)
+        if shard not in connections:
+            connection = sqlite3.connect(os.path.join(self.directory, f"shard-{shard}.sqlite"), timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, safe with WAL
+            connection.executescript(SCHEMA)
+            connections[shard] = connection
+        return connections[shard]
+
+    def history(self, session_id: str) -> "SQLiteChatMessageHistory":
+        return SQLiteChatMessageHistory(self, session_id)
+
+    def memory(self, session_id: str, llm, **kwargs) -> TokenBudgetMemory:
+        """Token-budgeted memory of one session, resumed with its saved summary."""
+        history = self.history(session_id)
+        return TokenBudgetMemory(llm=llm, chat_memory=history, summary=history.summary, **kwargs)
+
+    def close(self):
+        """Close this thread's connections."""
+        for connection in self._local.__dict__.pop("connections", {}).values():
+            connection.close()
+
+
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    """The recent window of one session, loaded on first use and kept in sync on writes."""
+
+    def __init__(self, store: SessionStore, session_id: str):
+        self.store = store
+        self.session_id = session_id
+        self._summary = ""
+        self._window_start = 0
+        self._seqs: list[int] | None = None
+        self._messages: list[BaseMessage] = []
+
+    def _load(self):
+        if self._seqs is not None:
+            return
+        connection = self.store.connection(self.session_id)
+        row = connection.execute(SELECT_SESSION, (self.session_id,)).fetchone()
+        if row:
+            self._summary, self._window_start = row
+        rows = connection.execute(SELECT_WINDOW, (self.session_id, self._window_start, self.store.window)).fetchall()
+        rows.reverse()
+        self._seqs = [seq for seq, _ in rows]
+        self._messages = messages_from_dict([json.loads(message) for _, message in rows])
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        self._load()
+        return list(self._messages)
+
+    @property
+    def summary(self) -> str:
+        self._load()
+        return self._summary
+
+    def add_messages(self, messages: list[BaseMessage]) -> None:
+        self._load()
+        connection = self.store.connection(self.session_id)
+        with connection:  # one transaction for the whole batch
+            for message in messages:
+                cursor = connection.execute(INSERT_MESSAGE, (self.session_id, json.dumps(message_to_dict(message))))
+                self._seqs.append(cursor.lastrowid)
+        self._messages.extend(messages)
+        if len(self._seqs) > self.store.window:
+            del self._seqs[: -self.store.window], self._messages[: -self.store.window]
+
+    def fold(self, summary: str, keep: int):
+        """Save the new summary and start the window at the last `keep` messages (the log is kept)."""
+        self._load()
+        kept = len(self._seqs) - keep
+        if kept > 0:
+            self._window_start = self._seqs[kept - 1]
+            del self._seqs[:kept], self._messages[:kept]
+        self._summary = summary
+        connection = self.store.connection(self.session_id)
+        with connection:
+            connection.execute(UPSERT_SESSION, (self.session_id, summary, self._window_start))
+
+    def clear(self) -> None:
+        connection = self.store.connection(self.session_id)
+        with connection:
+            connection.execute(DELETE_MESSAGES, (self.session_id,))
+            connection.execute(DELETE_SESSION, (self.session_id,))
+        self._summary, self._window_start = "", 0
+        self._seqs, self._messages = [], []
@@ -0,0 +1,308 @@
+"""
+structure.py
+Article-aware structural chunking of the CELEX regulation texts.
+
+CELEX documents are organised into Recitals, Chapters, Articles and numbered
+paragraphs. Instead of cutting them into fixed character windows, the
+structural chunker emits one chunk per recital and per article paragraph
+(small neighbouring paragraphs are merged, long ones split) and tags each
+chunk with its regulation, chapter, article, paragraph range or recital.
+
+ArticleLookup is the precomputed ID -> chunks map built from those tags:
+queries that name an article ("What does Article 17 say?") are answered by
+a dictionary lookup, without embedding the query or searching vectors.
+"""
+
+import re
+from itertools import chain
+from typing import Iterable, Iterator
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+ARTICLE_HEADING = re.compile(r"^Article (\d+)$")
+CHAPTER_HEADING = re.compile(r"^CHAPTER ([IVXLC]+)$")
+SECTION_HEADING = re.compile(r"^Section \d+$")
+ANNEX_HEADING = re.compile(r"^ANNEX ?([IVXLC]*)$")
+PARAGRAPH_START = re.compile(r"^(\d+)\.\s+")
+RECITAL_START = re.compile(r"^\((\d+)\)\s+")
+END_OF_PREAMBLE = "HAVE ADOPTED THIS REGULATION"
+REGULATION_ID = re.compile(r"REGULATION \(EU\) (?:No )?(\d+/\d+)")
+
+# Page furniture and consolidation markers of the EUR-Lex PDFs
+OJ_FOOTER = re.compile(r"^\d{1,2}\.\d{1,2}\.\d{4} L \d+/\d+ Official Journal of the European Union")
+CONSOLIDATED_HEADER = re.compile(r"^\d{5}[A-Z]\d{4} — [A-Z]{2} — ")
+AMENDMENT_MARKER = re.compile(r"[►▼◄][A-Z]\d*\s*")
+FOOTNOTE = re.compile(r"^\(\d+\)\s+OJ\b")
+
+# Names used in questions for the regulations in docs/
+REGULATION_ALIASES = {
+    "gdpr": "2016/679",
+    "general data protection regulation": "2016/679",
+    "clinical trial": "536/2014",
+}
+
+
+def regulation_id(first_page: str) -> str | None:
+    """'2016/679' or '536/2014' from the title on the first page."""
+    match = REGULATION_ID.search(" ".join(first_page.split()))
+    return match.group(1) if match else None
+
+
+def clean_lines(text: str) -> list[str]:
+    """Page lines without running headers, OJ footers, footnotes and amendment markers."""
+    lines = []
+    for line in text.splitlines():
+        line = AMENDMENT_MARKER.sub("", line).strip()
+        if OJ_FOOTER.match(line):
+            break  # only footnotes follow the Official Journal footer
+        if not line or CONSOLIDATED_HEADER.match(line) or FOOTNOTE.match(line):
+            continue
+        lines.append(line)
+    return lines
+
+
+class _Unit:
+    """A recital, an annex, or one paragraph (or the unnumbered body) of an article."""
+
+    def __init__(self, page: int, **tags):
+        self.page = page
+        self.tags = tags
+        self.lines = []
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.lines)
+
+
+def _parse_units(pages: Iterable[tuple[int, str]]) -> Iterator[_Unit]:
+    """Walk the page lines and yield recitals, article paragraphs and annexes in order."""
+    in_preamble = True
+    in_annex = False
+    recital = article = None
+    chapter = title = None
+    unit = None
+    expect_title = skip_title = False
+
+    for page_number, text in pages:
+        for line in clean_lines(text):
+            if END_OF_PREAMBLE in line:
+                in_preamble = False
+                if unit:
+                    yield unit
+                unit = None
+                continue
+
+            heading = ARTICLE_HEADING.match(line)
+            if heading and not in_annex and int(heading.group(1)) == (article or 0) + 1:
+                in_preamble = False
+                if unit:
+                    yield unit
+                article, title, expect_title = int(heading.group(1)), None, True
+                unit = _Unit(page_number, chapter=chapter, article=article)
+                continue
+
+            annex = ANNEX_HEADING.match(line)
+            if annex and article is not None:
+                in_annex = True
+                if unit:
+                    yield unit
+                unit = _Unit(page_number, annex=annex.group(1) or "I")
+                continue
+
+            chapter_heading = CHAPTER_HEADING.match(line)
+            if chapter_heading and not in_preamble and not in_annex:
+                chapter, skip_title = chapter_heading.group(1), True
+                continue
+            if SECTION_HEADING.match(line) and not in_preamble and not in_annex:
+                skip_title = True
+                continue
+            if skip_title:
+                skip_title = False  # chapter or section title
+                continue
+
+            if expect_title:
+                title, expect_title = line, False
+                unit.tags["title"] = title
+                continue
+
+            if in_annex:
+                unit.lines.append(line)
+                continue
+
+            if in_preamble:
+                start = RECITAL_START.match(line)
+                if start and int(start.group(1)) == (recital or 0) + 1:
+                    if unit:
+                        yield unit
+                    recital = int(start.group(1))
+                    unit = _Unit(page_number, recital=recital)
+                    line = line[start.end():]
+                if unit:
+                    unit.lines.append(line)
+                continue
+
+            if article is None:
+                continue  # enacting formula before Article 1
+
+            start = PARAGRAPH_START.match(line)
+            if start and int(start.group(1)) == unit.tags.get("paragraph", 0) + 1:
+                if unit.lines:
+                    yield unit
+                    unit = _Unit(page_number, chapter=chapter, article=article, title=title)
+                unit.tags["paragraph"] = int(start.group(1))
+            unit.lines.append(line)
+
+    if unit:
+        yield unit
+
+
+def _header(tags: dict) -> str:
+    if "recital" in tags:
+        return f"Recital ({tags['recital']})"
+    if "annex" in tags:
+        return f"Annex {tags['annex']}"
+    header = f"Article {tags['article']}"
+    return f"{header} — {tags['title']}" if tags.get("title") else header
+
+
+def iter_structured_chunks(
+    pages: Iterable[tuple[int, str]],
+    source: str,
+    max_chars: int = 1000,
+) -> Iterator[tuple[str, dict]]:
+    """
+    (text, metadata) chunks for one regulation, from its (page number, page text) pairs.
+    Paragraphs of the same article are merged while they fit in `max_chars`;
+    longer units are split, and every piece keeps its "Article N — Title" header.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=max_chars, chunk_overlap=0)
+    pages = iter(pages)
+    first = next(pages, None)
+    if first is None:
+        return
+    regulation = regulation_id(first[1])
+
+    def chunk(header: str, body: str, page: int, tags: dict, first_paragraph, last_paragraph):
+        metadata = {"source": source, "page": page}
+        if regulation:
+            metadata["regulation"] = regulation
+        for key in ("chapter", "article", "recital", "annex"):
+            if tags.get(key) is not None:
+                metadata[key] = tags[key]
+        if first_paragraph is not None:
+            metadata["paragraph_start"] = first_paragraph
+            metadata["paragraph_end"] = last_paragraph
+        for piece in splitter.split_text(body):
+            yield f"{header}\n{piece}", dict(metadata)
+
+    pending = None  # [header, body, page, tags, first paragraph, last paragraph]
+    for unit in _parse_units(chain([first], pages)):
+        body = unit.text
+        if not body:
+            continue
+        paragraph = unit.tags.get("paragraph")
+        same_article = (
+            pending is not None
+            and "article" in unit.tags
+            and pending[3].get("article") == unit.tags["article"]
+        )
+        if same_article and len(pending[1]) + len(body) + 1 <= max_chars:
+            pending[1] += "\n" + body
+            pending[5] = paragraph if paragraph is not None else pending[5]
+            continue
+        if pending:
+            yield from chunk(*pending)
+        pending = [_header(unit.tags), body, unit.page, unit.tags, paragraph, paragraph]
+    if pending:
+        yield from chunk(*pending)
+
+
+# ----------------------------------------------------
+# Direct article lookup
+# ----------------------------------------------------
+ARTICLE_QUERY = re.compile(r"\barticle\s+(\d+)(?:\s*\((\d+)\))?", re.IGNORECASE)
+RECITAL_QUERY = re.compile(r"\brecital\s+\(?(\d+)\)?", re.IGNORECASE)
+
+
+class ArticleLookup:
+    """
+    Precomputed (regulation, "article" | "recital", number) -> chunks map.
+    """
+
+    def __init__(self, default_regulation: str | None = None):
+        self.default_regulation = default_regulation
+        self.units: dict[tuple[str, str, int], list[Document]] = {}
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document], default_regulation: str | None = None) -> "ArticleLookup":
+        lookup = cls(default_regulation)
+        for doc in documents:
+            regulation = doc.metadata.get("regulation")
+            for kind in ("article", "recital"):
+                if kind in doc.metadata:
+                    lookup.units.setdefault((regulation, kind, int(doc.metadata[kind])), []).append(doc)
+        for docs in lookup.units.values():
+            docs.sort(key=lambda d: (d.metadata.get("paragraph_start") or 0, d.metadata.get("page", 0)))
+        return lookup
+
+    @classmethod
+    def from_store(cls, vector_store, default_regulation: str | None = None) -> "ArticleLookup":
+        """Build from the chunks stored in a Chroma collection (texts and metadata only)."""
+        return cls.from_stores([vector_store], default_regulation)
+
+    @classmethod
+    def from_stores(cls, vector_stores: Iterable, default_regulation: str | None = None) -> "ArticleLookup":
+        """Build from several Chroma collections, e.g. one per regulation."""
+        documents = (
+            Document(id=chunk_id, page_content=text, metadata=meta or {})
+            for vector_store in vector_stores
+            for stored in [vector_store.get(include=["documents", "metadatas"])]
+            for chunk_id, text, meta in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        )
+        return cls.from_documents(documents, default_regulation)
+
+    def _regulations(self, query: str) -> list[str | None]:
+        lowered = query.lower()
+        named = {reg for alias, reg in REGULATION_ALIASES.items() if alias in lowered}
+        named |= {reg for (reg, _, _) in self.units if reg and reg in query}
+        if named:
+            return sorted(named)
+        return [self.default_regulation] if self.default_regulation else sorted({reg for (reg, _, _) in self.units}, key=str)
+
+    def match(self, query: str) -> list[Document] | None:
+        """Chunks of the article (or paragraph) or recital named in the query, else None."""
+        article = ARTICLE_QUERY.search(query)
+        recital = RECITAL_QUERY.search(query)
+        if not article and not recital:
+            return None
+        kind, number = ("article", int(article.group(1))) if article else ("recital", int(recital.group(1)))
+        paragraph = int(article.group(2)) if article and article.group(2) else None
+
+        for regulation in self._regulations(query):
+            docs = self.units.get((regulation, kind, number))
+            if not docs:
+                continue
+            if paragraph is not None:
+                narrowed = [
+                    d for d in docs
+                    if (d.metadata.get("paragraph_start") or 0) <= paragraph <= (d.metadata.get("paragraph_end") or 0)
+                ]
+                docs = narrowed or docs
+            return list(docs)
+        return None
+
+
+class ArticleAwareRetriever(BaseRetriever):
+    """Answers "Article N" / "Recital N" queries by lookup, everything else with `retriever`."""
+
+    lookup: ArticleLookup
+    retriever: BaseRetriever
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        docs = self.lookup.match(query)
+        if docs is not None:
+            return docs
+        return self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
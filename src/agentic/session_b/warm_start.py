@@ -0,0 +1,159 @@
+"""
+warm_start.py
+Reopen the persisted Chroma collection instead of re-ingesting on every start.
+
+After a successful ingestion a small manifest is written next to chroma_db
+(`chroma_db.manifest.json`, one entry per collection) with:
+- the embedding model name
+- the chunking parameters (chunker, chunk size, overlap, deduplication)
+- a fingerprint of the corpus (SHA-256 of every PDF)
+- the regulation the collection holds, and the hash of each of its files,
+  so a warm start can group the PDFs without opening them
+
+The manifest is written last, after the caller has saved the indexes derived
+from the collection (BM25, router centroid, cross-references), so a warm
+manifest always comes with up-to-date derived indexes.
+
+On the next start, if the manifest matches and the collection is not empty,
+the collection is only opened: no PDF is parsed, nothing is embedded and the
+embedding model is not even loaded until the first query needs it
+(LazyEmbeddings). Any mismatch falls back to an ingestion run; a different
+embedding model drops the collection and rebuilds it from scratch.
+"""
+
+import json
+import os
+from typing import Callable
+
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
+
+from agentic.session_b import chroma_access
+from agentic.session_b.ingest import SyncReport, sync_documents
+from agentic.session_b.loader import hash_files, hash_text
+
+
+def manifest_path(persist_directory: str) -> str:
+    """Manifest file next to the Chroma directory, like the BM25 index."""
+    return persist_directory.rstrip("/\\") + ".manifest.json"
+
+
+def corpus_fingerprint(file_hashes: dict[str, str]) -> str:
+    """One hash over the normalised path and content hash of every file (see hash_files)."""
+    entries = sorted(f"{path}:{file_hash}" for path, file_hash in file_hashes.items())
+    return hash_text("\n".join(entries))
+
+
+def build_manifest(
+    model: str,
+    paths: list[str],
+    chunker: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    dedup: bool = False,
+    regulation: str | None = None,
+    file_hashes: dict[str, str] | None = None,
+) -> dict:
+    """`file_hashes` (from hash_files, may cover more files) spares hashing the PDFs again."""
+    known = file_hashes or {}
+    files = {os.path.normpath(path): known.get(os.path.normpath(path)) for path in paths}
+    files.update(hash_files([path for path, file_hash in files.items() if file_hash is None]))
+    return {
+        "model": model,
+        "chunker": chunker,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "dedup": dedup,
+        "corpus": corpus_fingerprint(files),
+        "regulation": regulation,
+        "files": files,
+    }
+
+
+def _read_manifests(persist_directory: str) -> dict:
+    try:
+        with open(manifest_path(persist_directory), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def known_regulations(persist_directory: str) -> dict[str, str]:
+    """File hash -> regulation id, for every file of an ingested collection."""
+    return {
+        file_hash: manifest["regulation"]
+        for manifest in _read_manifests(persist_directory).values()
+        if manifest.get("regulation")
+        for file_hash in manifest.get("files", {}).values()
+    }
+
+
+def read_manifest(persist_directory: str, collection_name: str) -> dict | None:
+    return _read_manifests(persist_directory).get(collection_name)
+
+
+def write_manifest(persist_directory: str, collection_name: str, manifest: dict | None):
+    """Store (or with None, remove) the manifest of one collection."""
+    manifests = _read_manifests(persist_directory)
+    if manifest is None:
+        manifests.pop(collection_name, None)
+    else:
+        manifests[collection_name] = manifest
+    path = manifest_path(persist_directory)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifests, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def open_or_ingest(
+    persist_directory: str,
+    collection_name: str,
+    embeddings: Embeddings,
+    model: str,
+    paths: list[str],
+    chunker: str = "recursive",
+    chunk_size: int = 300,
+    chunk_overlap: int = 20,
+    dedup: bool = False,
+    regulation: str | None = None,
+    on_ingested: Callable[[Chroma, SyncReport], None] | None = None,
+    file_hashes: dict[str, str] | None = None,
+) -> tuple[Chroma, SyncReport | None]:
+    """
+    The persisted collection, plus the ingestion report, or None on a warm start
+    (manifest matched: the collection is used as is and never written to).
+    `on_ingested` saves the indexes derived from the collection (BM25, router
+    centroid, ...) after an ingestion; the manifest is written only once it
+    returned, so a crash in between is never taken for a warm start.
+    `file_hashes` (hash_files of the PDFs) is reused instead of hashing them again.
+    """
+    expected = build_manifest(model, paths, chunker, chunk_size, chunk_overlap, dedup, regulation, file_hashes)
+    stored = read_manifest(persist_directory, collection_name)
+    vector_store = Chroma(
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        persist_directory=persist_directory,
+    )
+    if stored == expected and chroma_access.count(vector_store) > 0:
+        return vector_store, None
+
+    # Vectors of another model cannot be reused, start from an empty collection
+    if stored is not None and stored.get("model") != model:
+        vector_store.delete_collection()
+        vector_store = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=persist_directory,
+        )
+
+    # Drop the old manifest first, an interrupted ingestion must not look warm
+    if stored is not None:
+        write_manifest(persist_directory, collection_name, None)
+    report = sync_documents(
+        vector_store, paths, chunk_size, chunk_overlap, chunker=chunker, dedup=dedup, file_hashes=expected["files"]
+    )
+    if on_ingested is not None:
+        on_ingested(vector_store, report)
+    write_manifest(persist_directory, collection_name, expected)
+    return vector_store, report
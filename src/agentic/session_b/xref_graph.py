@@ -0,0 +1,187 @@
+"""
+xref_graph.py
+Article -> article cross-reference graph, for one-hop context expansion.
+
+Articles constantly point at each other ("the conditions referred to in
+Article 6(1)", "Articles 15 to 22"). At ingestion the references of every
+article chunk are extracted into an adjacency index per regulation, saved
+next to chroma_db (`chroma_db.xref.json`) and optionally mirrored to Neo4j
+(as in session_a/ex10.py). At query time CrossReferenceRetriever:
+#1. Runs the wrapped retriever
+#2. Looks up the articles referenced by the hits in the adjacency index
+#3. Appends their chunks (the referenced paragraphs when the reference names
+    one) from ArticleLookup: no extra vector query, no LLM call
+
+References to other acts ("Article 4 of Directive 95/46/EC", "Article 16
+TFEU") are ignored; only references inside the same regulation are kept.
+"""
+
+import json
+import os
+import re
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from agentic.session_b.structure import ArticleLookup
+
+# "Article 6(1)(a)", "Articles 15 to 22", "Articles 13 and 14", "Articles 8, 11, 25 to 39 and 42"
+_NUMBER = r"\d+(?:\(\w{1,4}\))*"
+REFERENCE = re.compile(rf"\bArticles?\s+({_NUMBER}(?:(?:,\s*|\s+and\s+|\s+or\s+|\s+to\s+){_NUMBER})*)")
+REFERENCE_ITEM = re.compile(r"(\d+)(?:\((\d+)\))?(?:\(\w{1,4}\))*(?:\s+to\s+(\d+))?")
+# What follows a reference to another act
+EXTERNAL_ACT = re.compile(r"\s*(?:of\s+(?!this\s+Regulation)|TFEU\b|TEU\b)")
+# Longest "Articles N to M" range expanded
+MAX_RANGE = 30
+
+
+def extract_references(text: str) -> dict[int, set[int]]:
+    """Referenced article -> referenced paragraphs (empty: the whole article)."""
+    references: dict[int, set[int]] = {}
+    whole = set()  # articles also referenced without a paragraph
+    for match in REFERENCE.finditer(text):
+        if EXTERNAL_ACT.match(text, match.end()):
+            continue
+        for item in REFERENCE_ITEM.finditer(match.group(1)):
+            first, paragraph, last = int(item.group(1)), item.group(2), item.group(3)
+            if last and 0 < int(last) - first <= MAX_RANGE:
+                articles = range(first, int(last) + 1)
+            else:
+                articles = [first]
+            for article in articles:
+                references.setdefault(article, set())
+                if paragraph and not last:
+                    references[article].add(int(paragraph))
+                else:
+                    whole.add(article)
+    return {article: set() if article in whole else paragraphs for article, paragraphs in references.items()}
+
+
+class CrossReferenceGraph:
+    """In-memory adjacency index: (regulation, article) -> {referenced article: paragraphs}."""
+
+    def __init__(self):
+        self.edges: dict[str, dict[int, dict[int, list[int]]]] = {}
+
+    # ------------------------------------------------------------------
+    # Build and persist
+    # ------------------------------------------------------------------
+    def update(self, regulation: str, vector_store):
+        """(Re)extract the references of one regulation's article chunks."""
+        stored = vector_store.get(include=["documents", "metadatas"])
+        articles = {meta["article"] for meta in stored["metadatas"] if meta and "article" in meta}
+        adjacency: dict[int, dict[int, set[int]]] = {}
+        for text, meta in zip(stored["documents"], stored["metadatas"]):
+            if not meta or "article" not in meta:
+                continue
+            targets = adjacency.setdefault(meta["article"], {})
+            for article, paragraphs in extract_references(text).items():
+                if article == meta["article"] or article not in articles:
+                    continue
+                known = targets.get(article)
+                # Whole article (empty set) wins over single paragraphs
+                targets[article] = set() if known == set() or not paragraphs else (known or set()) | paragraphs
+        self.edges[regulation] = {
+            source: {target: sorted(paragraphs) for target, paragraphs in sorted(targets.items())}
+            for source, targets in sorted(adjacency.items())
+            if targets
+        }
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.edges, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CrossReferenceGraph":
+        graph = cls()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            # JSON object keys are strings
+            graph.edges = {
+                regulation: {int(s): {int(t): p for t, p in targets.items()} for s, targets in adjacency.items()}
+                for regulation, adjacency in data.items()
+            }
+        return graph
+
+    def mirror_to_neo4j(self, driver, regulation: str):
+        """Replace the REFERS_TO edges of one regulation in Neo4j with the local adjacency."""
+        rows = [
+            {"source": source, "target": target, "paragraphs": paragraphs}
+            for source, targets in self.edges.get(regulation, {}).items()
+            for target, paragraphs in targets.items()
+        ]
+        with driver.session() as session:
+            session.run(
+                "MATCH (:Article {regulation: $regulation})-[r:REFERS_TO]->() DELETE r",
+                parameters={"regulation": regulation},
+            )
+            session.run(
+                """
+                UNWIND $rows AS row
+                MERGE (a:Article {regulation: $regulation, number: row.source})
+                MERGE (b:Article {regulation: $regulation, number: row.target})
+                MERGE (a)-[r:REFERS_TO]->(b)
+                SET r.paragraphs = row.paragraphs
+                """,
+                parameters={"regulation": regulation, "rows": rows},
+            )
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def neighbours(self, regulation: str, article: int) -> dict[int, list[int]]:
+        return self.edges.get(regulation, {}).get(article, {})
+
+    def __len__(self) -> int:
+        return sum(len(targets) for adjacency in self.edges.values() for targets in adjacency.values())
+
+
+class CrossReferenceRetriever(BaseRetriever):
+    """
+    Appends, after the hits of `retriever`, the chunks of up to `max_articles`
+    articles they reference (one hop, in hit rank order).
+    """
+
+    graph: CrossReferenceGraph
+    lookup: ArticleLookup
+    retriever: BaseRetriever
+    max_articles: int = 3
+    _last_expanded: list[str] = PrivateAttr(default_factory=list)
+
+    @property
+    def last_expanded(self) -> list[str]:
+        return self._last_expanded
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        docs = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        seen = {(doc.metadata.get("regulation"), doc.metadata.get("article")) for doc in docs}
+        # Locals only: the retriever is shared by the batch mode's worker threads
+        expanded, labels = [], []
+        for doc in docs:
+            regulation, article = doc.metadata.get("regulation"), doc.metadata.get("article")
+            if article is None:
+                continue
+            for target, paragraphs in self.graph.neighbours(regulation, article).items():
+                if len(labels) >= self.max_articles:
+                    break
+                if (regulation, target) in seen:
+                    continue
+                seen.add((regulation, target))
+                chunks = self.lookup.units.get((regulation, "article", target), [])
+                if paragraphs:
+                    chunks = [
+                        c for c in chunks
+                        if any((c.metadata.get("paragraph_start") or 0) <= p <= (c.metadata.get("paragraph_end") or 0) for p in paragraphs)
+                    ] or chunks
+                expanded.extend(
+                    Document(id=c.id, page_content=c.page_content, metadata={**c.metadata, "referenced_by": article})
+                    for c in chunks
+                )
+                labels.append(f"{regulation} Article {article} -> {target}")
+        self._last_expanded = labels  # diagnostics of the latest request
+        return docs + expanded
@@ -0,0 +1,33 @@
+"""Fixtures shared by the ingestion tests."""
+
+import pytest
+
+from agentic.session_b import ingest, loader
+from agentic.session_b.loader import hash_text
+
+
+@pytest.fixture
+def pdf(monkeypatch):
+    """The pages of fake PDFs by path, as lists of chunks ("\n\n"-separated page text)."""
+    pages = {}
+
+    def iter_pdf_pages(paths, chunk_size, chunk_overlap, max_workers, strip_furniture=False, split=True):
+        for path, number, chunks in ((path, n, c) for path in paths for n, c in enumerate(pages[path])):
+            text = "\n\n".join(chunks)
+            yield {
+                "source": path,
+                "page": number,
+                "page_hash": hash_text(text),
+                "text": text,
+                "chunks": list(chunks) if split else [],
+                "starts": [text.index(chunk) for chunk in chunks] if split else [],
+                "stripped_lines": 0,
+            }
+
+    def hash_file(path):
+        return hash_text(repr(pages[path]))
+
+    monkeypatch.setattr(ingest, "iter_pdf_pages", iter_pdf_pages)
+    monkeypatch.setattr(ingest, "hash_file", hash_file)
+    monkeypatch.setattr(loader, "hash_file", hash_file)
+    return pages
@@ -0,0 +1,98 @@
+"""Resumable batch answering (session_b/batch_qa.py)."""
+
+import json
+import threading
+
+import pytest
+from langchain_core.documents import Document
+
+from agentic.session_b.batch_qa import answered_ids, drop_partial_line, read_questions, run_batch
+
+
+class Chain:
+    """Stand-in for the QA chain: answers by echoing, fails the questions in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.asked = []
+        self.lock = threading.Lock()
+
+    def invoke(self, inputs):
+        with self.lock:
+            self.asked.append(inputs["query"])
+        if inputs["query"] in self.failing:
+            raise TimeoutError("LLM timed out")
+        return {"result": inputs["query"].upper(), "source_documents": [Document(page_content="", metadata={"article": 6})]}
+
+
+class Embeddings:
+    def __init__(self):
+        self.primed = []
+
+    def prime_queries(self, texts):
+        self.primed.append(list(texts))
+
+
+def write(path, text):
+    path.write_bytes(text.encode("utf-8"))
+
+
+@pytest.mark.parametrize(
+    "content, kept",
+    [
+        ('{"id": "q1"}\n{"id": "q2"}\n{"id": "q3", "ans', '{"id": "q1"}\n{"id": "q2"}\n'),
+        ('{"id": "q1"}\n', '{"id": "q1"}\n'),
+        ('{"id": "q1", "ans', ""),  # no newline at all
+        ("", ""),
+    ],
+)
+def test_drop_partial_line(tmp_path, content, kept):
+    path = tmp_path / "answers.jsonl"
+    write(path, content)
+    drop_partial_line(str(path))
+    assert path.read_text(encoding="utf-8") == kept
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 4, 5, 7, 64])
+def test_drop_partial_line_across_block_boundaries(tmp_path, block_size):
+    # The last newline is at offset 3: before, on and after block boundaries
+    path = tmp_path / "answers.jsonl"
+    write(path, "abc\ndefghijk")
+    drop_partial_line(str(path), block_size=block_size)
+    assert path.read_text(encoding="utf-8") == "abc\n"
+
+
+def test_drop_partial_line_of_a_missing_file(tmp_path):
+    drop_partial_line(str(tmp_path / "missing.jsonl"))
+    assert not (tmp_path / "missing.jsonl").exists()
+
+
+def test_answered_ids_skip_errors_and_partial_lines(tmp_path):
+    path = tmp_path / "answers.jsonl"
+    write(path, '{"id": "q1", "answer": "A"}\n{"id": "q2", "error": "Timeout"}\n{"id": "q3", "answer": "C"}\n{"id": "q4", "ans')
+
+    assert answered_ids(str(path)) == {"q1", "q3"}
+    assert answered_ids(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_resumed_run_skips_answered_and_retries_errors(tmp_path):
+    questions_path, output = tmp_path / "questions.jsonl", tmp_path / "answers.jsonl"
+    write(questions_path, "".join(json.dumps({"id": f"q{n}", "question": f"question {n}"}) + "\n" for n in range(1, 6)))
+    questions = read_questions(str(questions_path))
+
+    first = run_batch(Chain(failing={"question 2"}), Embeddings(), questions, str(output), concurrency=2)
+    assert (first["answered"], first["failed"]) == (4, 1)
+
+    # Interrupted while writing a sixth answer
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"id": "q9", "answ')
+
+    chain, embeddings = Chain(), Embeddings()
+    second = run_batch(chain, embeddings, questions, str(output), concurrency=2)
+    assert chain.asked == ["question 2"]
+    assert embeddings.primed == [["question 2"]]
+    assert (second["skipped"], second["answered"], second["failed"]) == (4, 1, 0)
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["id"] for r in records if "error" not in r) == ["q1", "q2", "q3", "q4", "q5"]
+    assert next(r for r in records if r["id"] == "q2" and "answer" in r)["sources"] == [{"article": 6}]
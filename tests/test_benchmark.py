@@ -0,0 +1,50 @@
+"""Retrieval benchmark scoring and the QA-chain retriever mode (session_b/benchmark.py)."""
+
+from langchain_core.documents import Document
+
+from agentic.session_b import benchmark, ex1
+
+GDPR = "CELEX_32016R0679_EN_TXT.pdf"
+QUESTIONS = [
+    {"id": "q1", "source": GDPR, "question": "lawful processing", "articles": [6]},
+    {"id": "q2", "source": GDPR, "question": "erasure", "articles": [17, 19]},
+]
+
+
+def chunk(article, source=GDPR):
+    return Document(page_content=f"Article {article} text", metadata={"source": f"docs/{source}", "article": str(article)})
+
+
+class PackedFake:
+    """Stands in for ex1's packed retriever: fixed chunks per question."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.last_report = None
+
+    def invoke(self, question):
+        docs = self.answers.get(question, [])
+        self.last_report = {"packed_tokens": 10 * len(docs)}
+        return docs
+
+
+def test_score_answer_counts_the_expected_pdf_only():
+    docs = [chunk(6, source="other.pdf"), chunk(5), chunk(6), chunk(6)]
+    assert benchmark.score_answer(docs, QUESTIONS[0], {}) == ({6}, 3)
+    assert benchmark.score_answer([chunk(5)], QUESTIONS[0], {}) == (set(), None)
+
+
+def test_pipeline_mode_scores_the_packed_context(monkeypatch):
+    fake = PackedFake({
+        "lawful processing": [chunk(6), chunk(7)],
+        "erasure": [chunk(1), chunk(2), chunk(17), chunk(3), chunk(4), chunk(19)],
+    })
+    monkeypatch.setattr(ex1, "build_retriever", lambda: (fake, None))
+    monkeypatch.setattr(ex1, "pdf_paths", [])
+
+    result = benchmark.run_pipeline_benchmark(QUESTIONS, k=4)
+
+    assert result["config"]["retriever"] == "qa_chain"
+    assert result["quality"] == {"questions": 2, "recall@4": 0.75, "context_recall": 1.0, "mrr": round((1 + 1 / 3) / 2, 4)}
+    assert result["context"] == {"packed_tokens_mean": 40.0, "chunks_mean": 4.0}
+    assert [detail["in_context"] for detail in result["per_question"]] == [[6], [17, 19]]
@@ -0,0 +1,32 @@
+"""Collection operations missing from the LangChain Chroma wrapper (session_b/chroma_access.py)."""
+
+import chromadb
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agentic.session_b import chroma_access
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+def test_count_update_and_query():
+    embeddings = CountingEmbeddings(size=8)
+    store = Chroma(client=chromadb.EphemeralClient(), collection_name="access", embedding_function=embeddings)
+    store.add_texts(["alpha", "beta"], metadatas=[{"page": 1}, {"page": 2}], ids=["a", "b"])
+    try:
+        assert chroma_access.count(store) == 2
+
+        chroma_access.update_metadata(store, ["a"], [{"page": 7}])
+        assert embeddings.calls == 2  # only the initial add
+        assert store.get(ids=["a"])["metadatas"] == [{"page": 7}]
+
+        hits = chroma_access.query(store, embeddings.embed_query("beta"), k=1)
+        assert hits == {"ids": ["b"], "documents": ["beta"], "metadatas": [{"page": 2}]}
+    finally:
+        store.delete_collection()
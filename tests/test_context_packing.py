@@ -0,0 +1,84 @@
+"""Merging, deduplication and token packing of retrieved chunks (session_b/context_packing.py)."""
+
+from langchain_core.documents import Document
+
+from agentic.session_b.context_packing import join_overlapping, pack_documents
+
+
+class WordEncoding:
+    """One token per word, instead of a tiktoken download."""
+
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+ENCODING = WordEncoding()
+PAGE = "The controller shall be responsible for, and be able to demonstrate compliance with, paragraph 1."
+
+
+def page_chunk(start, end, page=3):
+    return Document(page_content=PAGE[start:end], metadata={"source": "gdpr.pdf", "page": page, "start": start})
+
+
+def article_chunk(paragraph, body):
+    return Document(
+        page_content=f"Article 5 Principles\n{body}",
+        metadata={"source": "gdpr.pdf", "regulation": "2016/679", "article": 5, "paragraph_start": paragraph, "page": 35},
+    )
+
+
+def test_join_overlapping():
+    assert join_overlapping("personal data shall be", "data shall be processed") == "personal data shall be processed"
+    assert join_overlapping("personal data", "processed lawfully") is None
+
+
+def test_overlapping_chunks_of_a_page_are_merged():
+    packed, report = pack_documents([page_chunk(40, len(PAGE)), page_chunk(0, 50)], max_tokens=100, encoding=ENCODING)
+
+    assert [doc.page_content for doc in packed] == [PAGE]
+    assert packed[0].metadata["merged_chunks"] == 2
+    assert packed[0].metadata["start"] == 0
+    assert report["retrieved_documents"] == 2 and report["packed_documents"] == 1
+    assert report["saved_tokens"] == report["retrieved_tokens"] - report["packed_tokens"] > 0
+
+
+def test_chunks_of_other_pages_are_not_merged():
+    packed, _ = pack_documents([page_chunk(0, 50), page_chunk(40, len(PAGE), page=4)], max_tokens=100, encoding=ENCODING)
+    assert len(packed) == 2
+
+
+def test_paragraphs_of_an_article_share_one_header():
+    docs = [article_chunk(2, "2. The controller shall be responsible."), article_chunk(1, "1. Personal data shall be processed lawfully.")]
+    packed, _ = pack_documents(docs, max_tokens=100, encoding=ENCODING)
+
+    assert [doc.page_content for doc in packed] == [
+        "Article 5 Principles\n1. Personal data shall be processed lawfully.\n2. The controller shall be responsible."
+    ]
+
+
+def test_near_duplicates_are_dropped():
+    text = "Each supervisory authority shall be competent for the performance of the tasks assigned to it"
+    docs = [
+        Document(page_content=text, metadata={"source": "a.pdf", "page": 1}),
+        Document(page_content=text + ".", metadata={"source": "b.pdf", "page": 9}),
+        Document(page_content="Recital text about something else entirely", metadata={"source": "a.pdf", "page": 2}),
+    ]
+    packed, _ = pack_documents(docs, max_tokens=100, encoding=ENCODING)
+
+    assert [doc.metadata["source"] for doc in packed] == ["a.pdf", "a.pdf"]
+
+
+def test_budget_truncates_the_last_passage():
+    docs = [
+        Document(page_content="one two three four", metadata={"source": "a.pdf", "page": 1}),
+        Document(page_content="five six seven eight", metadata={"source": "a.pdf", "page": 2}),
+        Document(page_content="nine ten", metadata={"source": "a.pdf", "page": 3}),
+    ]
+    packed, report = pack_documents(docs, max_tokens=6, encoding=ENCODING)
+
+    assert [doc.page_content for doc in packed] == ["one two three four", "five six"]
+    assert packed[1].metadata["truncated"] is True
+    assert report["packed_tokens"] == 6
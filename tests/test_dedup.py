@@ -0,0 +1,55 @@
+"""Page furniture stripping and MinHash near-duplicate filter (session_b/dedup.py)."""
+
+import random
+
+from agentic.session_b.dedup import NearDuplicateFilter, furniture_lines, remove_furniture
+
+FOOTER = "4.5.2016 L 119/{} Official Journal of the European Union"
+BODIES = ["Lawfulness of processing.", "Conditions for consent.", "Right to erasure.", "Data protection by design.", "Security of processing."]
+
+
+def pages(count):
+    return [f"Article {n}\n{BODIES[n - 1]}\n" + FOOTER.format(n) for n in range(1, count + 1)]
+
+
+def test_recurring_footer_is_furniture():
+    texts = pages(5)
+    furniture = furniture_lines(texts)
+
+    assert furniture == {"#.#.# L #/# Official Journal of the European Union"}
+    text, removed = remove_furniture(texts[0], furniture)
+    assert (text, removed) == ("Article 1\nLawfulness of processing.", 1)
+
+
+def test_short_lines_and_small_files_are_left_alone():
+    assert furniture_lines(pages(2)) == set()
+    # "Article #" is on every page, but it is a heading
+    assert not any(line.startswith("Article #") for line in furniture_lines(pages(5)))
+
+
+def words(rng, count):
+    return [rng.choice(["controller", "processor", "data", "subject", "consent", "shall", "measures", "risk", "erasure", "right"])
+            + str(rng.randint(0, 50)) for _ in range(count)]
+
+
+def test_near_duplicates_are_found_and_distinct_texts_are_not():
+    rng = random.Random(1)
+    kept = NearDuplicateFilter(threshold=0.85)
+    originals = [words(rng, 120) for _ in range(20)]
+    for number, text in enumerate(originals):
+        signature = kept.signature(" ".join(text))
+        assert kept.find(signature) is None
+        kept.add(signature, {"number": number})
+
+    for number, text in enumerate(originals):
+        edited = list(text)
+        edited[60] = "pseudonymisation"  # one word changed: 3 of ~118 shingles
+        assert kept.find(kept.signature(" ".join(edited))) == {"number": number}
+        assert kept.find(kept.signature(" ".join(words(rng, 120)))) is None
+    assert len(kept) == 20
+
+
+def test_signature_is_deterministic_per_seed():
+    text = "the controller shall implement appropriate measures"
+    assert (NearDuplicateFilter(seed=4).signature(text) == NearDuplicateFilter(seed=4).signature(text)).all()
+    assert (NearDuplicateFilter(seed=4).signature(text) != NearDuplicateFilter(seed=5).signature(text)).any()
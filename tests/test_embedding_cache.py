@@ -0,0 +1,135 @@
+"""Memory-mapped embedding cache and its append-only index log (session_b/embedding_cache.py)."""
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from agentic.session_b import embedding_cache
+from agentic.session_b.embedding_cache import CachedEmbeddings
+
+MODEL = DeterministicFakeEmbedding(size=8)
+
+
+class CountingEmbeddings(Embeddings):
+    """The fake model, counting the texts it embeds."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return MODEL.embed_documents(texts)
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return MODEL.embed_query(text)
+
+
+def open_cache(tmp_path, namespace="model-a", max_rows=100):
+    model = CountingEmbeddings()
+    return CachedEmbeddings(model, cache_dir=str(tmp_path), namespace=namespace, max_rows=max_rows), model
+
+
+def expected(text):
+    return np.asarray(MODEL.embed_documents([text])[0], dtype=np.float32)
+
+
+def assert_cached(cache, texts):
+    for text in texts:
+        vector = cache.lookup(text)
+        assert vector is not None, text
+        assert np.array_equal(vector, expected(text)), text
+
+
+def test_only_misses_reach_the_model(tmp_path):
+    cache, model = open_cache(tmp_path)
+    cache.embed_documents(["a", "b"])
+    result = cache.embed_documents(["b", "c", "c"])
+
+    assert model.embedded == ["a", "b", "c"]
+    assert np.array_equal(np.asarray(result, dtype=np.float32), [expected(t) for t in ("b", "c", "c")])
+    assert cache.stats()["hits"] == 1 and cache.stats()["rows"] == 3
+
+
+def test_log_is_replayed_after_reopen(tmp_path):
+    cache, _ = open_cache(tmp_path)
+    for batch in (["a", "b"], ["c"], ["d", "e"]):
+        cache.embed_documents(batch)
+
+    reopened, model = open_cache(tmp_path)
+    assert_cached(reopened, ["a", "b", "c", "d", "e"])
+    reopened.embed_documents(["a", "e"])
+    assert model.embedded == []
+
+
+def test_evicted_rows_stay_evicted_after_reload(tmp_path):
+    cache, _ = open_cache(tmp_path, max_rows=3)
+    for text in ("a", "b", "c"):
+        cache.embed_documents([text])
+    cache.lookup("a")  # a is now the most recently used, b the least
+    cache.embed_documents(["d"])  # takes b's row
+    cache.embed_documents(["e"])  # takes c's row
+
+    reopened, _ = open_cache(tmp_path, max_rows=3)
+    assert reopened.lookup("b") is None and reopened.lookup("c") is None
+    assert_cached(reopened, ["a", "d", "e"])
+
+
+def test_compaction_keeps_the_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "MIN_COMPACT_LINES", 0)
+    cache, _ = open_cache(tmp_path, max_rows=2)
+    for text in "abcdefgh":
+        cache.embed_documents([text])
+
+    with open(cache._index_path, encoding="utf-8") as f:
+        assert len(f.readlines()) <= 1 + 2 * 2 + 1  # header + at most twice the live entries (+ the last append)
+    reopened, _ = open_cache(tmp_path, max_rows=2)
+    assert_cached(reopened, ["g", "h"])
+
+
+def test_truncated_last_log_line(tmp_path):
+    cache, _ = open_cache(tmp_path)
+    cache.embed_documents(["a", "b"])
+    with open(cache._index_path, "a", encoding="utf-8") as f:
+        f.write('["0123abc", ')  # interrupted append
+
+    reopened, _ = open_cache(tmp_path)
+    assert_cached(reopened, ["a", "b"])
+    reopened.embed_documents(["c"])  # must not be glued to the cut-off line
+
+    again, model = open_cache(tmp_path)
+    assert_cached(again, ["a", "b", "c"])
+    assert model.embedded == []
+
+
+def test_other_model_starts_from_an_empty_cache(tmp_path):
+    cache, _ = open_cache(tmp_path, namespace="model-a")
+    cache.embed_documents(["a"])
+
+    other, model = open_cache(tmp_path, namespace="model-b")
+    assert other.lookup("a") is None
+    other.embed_documents(["a"])
+    assert model.embedded == ["a"]
+
+
+def test_namespace_in_the_index_header_is_checked(tmp_path):
+    # "model/a" and "model_a" share the same file names
+    cache, _ = open_cache(tmp_path, namespace="model_a")
+    cache.embed_documents(["a"])
+
+    other = CachedEmbeddings(DeterministicFakeEmbedding(size=16), cache_dir=str(tmp_path), namespace="model/a")
+    assert other.lookup("a") is None
+    other.embed_documents(["b"])
+    assert len(other.lookup("b")) == 16
+
+    back, _ = open_cache(tmp_path, namespace="model_a")
+    assert back.lookup("a") is None and back.lookup("b") is None
+
+
+def test_primed_queries_are_embedded_once(tmp_path):
+    cache, model = open_cache(tmp_path)
+    cache.prime_queries(["q1", "q2", "q1"])
+
+    assert cache.embed_query("q1") == MODEL.embed_documents(["q1"])[0]
+    cache.embed_query("q2")
+    assert model.embedded == ["q1", "q2"]
+    assert cache.stats()["rows"] == 0  # queries do not take chunk rows
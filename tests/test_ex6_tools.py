@@ -0,0 +1,115 @@
+"""Tool plans of the tool agent (session_a/ex6.py): timeouts, deadlines and malformed calls."""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+# ex6 creates its OpenAI client on import; no request is made in these tests
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from agentic.session_a import ex6  # noqa: E402
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(2)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/slow"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """A ToolAgent with test tools only (the registry is restored afterwards)."""
+    monkeypatch.setattr(ex6, "TOOLS", {})
+
+    @ex6.tool(description="Echo the text.")
+    def echo(text="hi"):
+        return text
+
+    @ex6.tool(description="Sleep longer than its timeout.", timeout=0.3)
+    def sleepy():
+        time.sleep(1.5)
+        return "woke up"
+
+    tool_agent = ex6.ToolAgent(client=None, model=None, max_workers=4)
+    yield tool_agent
+    tool_agent.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def test_slow_tool_times_out_while_the_others_complete(agent):
+    start = time.monotonic()
+    result = agent.execute('[{"tool": "sleepy", "args": {}}, {"tool": "echo", "args": {"text": "fast"}}]')
+    elapsed = time.monotonic() - start
+
+    assert result.splitlines() == ["⚠️ sleepy timed out after 0.3s", "(Used echo) fast"]
+    assert elapsed < 0.3 + ex6.DEADLINE_GRACE + 0.3
+
+
+def test_single_call_has_the_same_timeout(agent):
+    start = time.monotonic()
+    assert agent.execute('{"tool": "sleepy"}') == "⚠️ sleepy timed out after 0.3s"
+    assert time.monotonic() - start < 0.3 + ex6.DEADLINE_GRACE + 0.3
+
+
+def test_deadline_stops_the_tool_requests(agent, slow_url):
+    @ex6.tool(description="Fetch a slow URL.", timeout=0.5)
+    def fetch(http=None):
+        try:
+            return http.get(slow_url).text
+        except requests.Timeout:
+            return "⚠️ timed out"
+
+    start = time.monotonic()
+    result = agent.execute('{"tool": "fetch", "args": {}}')
+    elapsed = time.monotonic() - start
+
+    # The request itself ended at the deadline, before the result wait gave up
+    assert result == "(Used fetch) ⚠️ timed out"
+    assert 0.4 < elapsed < 0.5 + ex6.DEADLINE_GRACE
+
+
+@pytest.mark.parametrize(
+    "decision, expected",
+    [
+        ('{"args": {"city": "Paris"}}', '⚠️ Malformed tool call (no "tool" name): {"args": {"city": "Paris"}}'),
+        ('{"tool": "echo", "args": "hi"}', '⚠️ Malformed tool call ("args" is not an object): {"tool": "echo", "args": "hi"}'),
+        ('["echo"]', '⚠️ Malformed tool call (not an object): "echo"'),
+        ('{"tool": "missing"}', "⚠️ Unknown tool: missing"),
+    ],
+)
+def test_malformed_plans_are_reported(agent, decision, expected):
+    assert agent.execute(decision) == expected
+
+
+def test_malformed_call_does_not_stop_the_plan(agent):
+    assert agent.execute('[{"tool": "echo"}, {"name": "echo"}]').splitlines() == [
+        "(Used echo) hi",
+        '⚠️ Malformed tool call (no "tool" name): {"name": "echo"}',
+    ]
+
+
+@pytest.mark.parametrize("decision", ["Paris is sunny today.", '"just a string"', "42", "[]"])
+def test_text_decisions_are_returned_as_is(agent, decision):
+    assert agent.execute(decision) == decision
@@ -0,0 +1,83 @@
+"""Brute-force exact top-k search (session_b/exact_store.py)."""
+
+import chromadb
+import numpy as np
+import pytest
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agentic.session_b.exact_store import ExactVectorStore, open_vector_store, top_k
+
+
+def store_of(vectors, metadatas=None):
+    store = ExactVectorStore(DeterministicFakeEmbedding(size=len(vectors[0])))
+    store.add_vectors(vectors, [f"chunk {i}" for i in range(len(vectors))], metadatas, [f"id-{i}" for i in range(len(vectors))])
+    return store
+
+
+def test_top_k_is_sorted_best_first():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7, 0.3], [0.8, 0.2, 0.6, 0.4, 0.0]])
+    indices, values = top_k(scores, 3)
+
+    assert indices.tolist() == [[1, 3, 2], [0, 2, 3]]
+    assert np.allclose(values, [[0.9, 0.7, 0.5], [0.8, 0.6, 0.4]])
+
+
+def test_top_k_with_k_above_the_row_count():
+    indices, values = top_k(np.array([[0.2, 0.4]]), 5)
+    assert indices.tolist() == [[1, 0]]
+    assert top_k(np.empty((1, 0)), 3)[0].shape == (1, 0)
+
+
+def test_ties_return_tied_rows_with_equal_scores():
+    store = store_of([[1, 0], [0, 1], [1, 0], [1, 0], [-1, 0]])
+    hits = store.search_vectors([1, 0], k=2)[0]
+
+    assert {row for row, _ in hits} <= {0, 2, 3}
+    assert [score for _, score in hits] == pytest.approx([1.0, 1.0])
+
+
+def test_search_matches_a_sorted_scan():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 16))
+    queries = rng.normal(size=(5, 16))
+    store = store_of(vectors)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    for query, hits in zip(queries, store.search_vectors(queries, k=10)):
+        expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:10]
+        assert [row for row, _ in hits] == expected.tolist()
+
+
+def test_k_above_the_chunk_count_returns_every_chunk():
+    store = store_of([[1, 0], [0.6, 0.8], [0, 1]])
+
+    assert [row for row, _ in store.search_vectors([1, 0], k=10)[0]] == [0, 1, 2]
+    assert ExactVectorStore(DeterministicFakeEmbedding(size=2)).search_vectors([1, 0], k=3) == [[]]
+
+
+def test_filter_and_documents():
+    store = store_of([[1, 0], [0.9, 0.1], [0, 1]], [{"article": "6"}, {"article": "7"}, {"article": "6"}])
+
+    docs = store.similarity_search_by_vector([1, 0], k=2, filter={"article": "6"})
+    assert [(doc.id, doc.metadata["article"]) for doc in docs] == [("id-0", "6"), ("id-2", "6")]
+    assert store.search_vectors([1, 0], k=2, filter={"article": "9"}) == [[]]
+
+
+def test_delete_keeps_rows_aligned():
+    store = store_of([[1, 0], [0, 1], [0.6, 0.8]])
+    store.delete(["id-0"])
+
+    assert store.ids == ["id-1", "id-2"]
+    assert store.similarity_search_by_vector([0, 1], k=1)[0].page_content == "chunk 1"
+
+
+def test_open_vector_store_uses_chroma_above_the_size_limit():
+    chroma = Chroma(client=chromadb.EphemeralClient(), collection_name="exact", embedding_function=DeterministicFakeEmbedding(size=4))
+    chroma.add_texts(["a", "b", "c"], ids=["1", "2", "3"])
+    try:
+        assert open_vector_store(chroma, exact_max_chunks=2) is chroma
+        exact = open_vector_store(chroma)
+        assert isinstance(exact, ExactVectorStore) and sorted(exact.ids) == ["1", "2", "3"]
+    finally:
+        chroma.delete_collection()
@@ -0,0 +1,124 @@
+"""Coarse-to-fine exact search over article vectors (session_b/hierarchical.py)."""
+
+import chromadb
+import numpy as np
+import pytest
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agentic.session_b.exact_store import ExactVectorStore, open_vector_store
+from agentic.session_b.hierarchical import HierarchicalVectorStore, unit_key
+
+DIM = 16
+
+
+def articles(count=12, chunks=5, seed=0):
+    """Chunks scattered around one direction per article, so the best article holds the best chunks."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(count, DIM))
+    vectors, texts, metadatas = [], [], []
+    for article, centre in enumerate(centres):
+        for chunk in range(chunks):
+            vectors.append(centre + rng.normal(0, 0.1, DIM))
+            texts.append(f"Article {article + 1} chunk {chunk}")
+            metadatas.append({"source": "gdpr.pdf", "article": str(article + 1), "page": article})
+    return np.asarray(vectors, dtype=np.float32), texts, metadatas, centres
+
+
+@pytest.fixture
+def chroma():
+    vectors, texts, metadatas, _ = articles()
+    store = Chroma(client=chromadb.EphemeralClient(), collection_name="hierarchical", embedding_function=DeterministicFakeEmbedding(size=DIM))
+    store._collection.add(ids=[f"id-{i}" for i in range(len(texts))], embeddings=vectors.tolist(), documents=texts, metadatas=metadatas)
+    yield store
+    store.delete_collection()
+
+
+def test_unit_key_prefers_the_article_over_the_page():
+    assert unit_key({"source": "a.pdf", "article": "6", "page": 3}) == ("a.pdf", "article", "6")
+    assert unit_key({"source": "a.pdf", "recital": "40"}) == ("a.pdf", "recital", "40")
+    assert unit_key({"source": "a.pdf", "page": 3}) == ("a.pdf", "page", 3)
+
+
+def test_incremental_index_matches_a_single_build():
+    vectors, texts, metadatas, _ = articles()
+    once = HierarchicalVectorStore(DeterministicFakeEmbedding(size=DIM), top_units=3)
+    once.add_vectors(vectors, texts, metadatas)
+    batched = HierarchicalVectorStore(DeterministicFakeEmbedding(size=DIM), top_units=3)
+    for start in range(0, len(texts), 7):
+        batched.add_vectors(vectors[start:start + 7], texts[start:start + 7], metadatas[start:start + 7])
+
+    assert batched.unit_rows == once.unit_rows
+    assert np.allclose(batched.unit_matrix, once.unit_matrix, atol=1e-6)
+
+
+def test_search_finds_the_flat_top_k():
+    vectors, texts, metadatas, centres = articles()
+    flat = ExactVectorStore(DeterministicFakeEmbedding(size=DIM))
+    flat.add_vectors(vectors, texts, metadatas)
+    store = HierarchicalVectorStore(DeterministicFakeEmbedding(size=DIM), top_units=2)
+    store.add_vectors(vectors, texts, metadatas)
+
+    queries = centres + np.random.default_rng(1).normal(0, 0.05, centres.shape)
+    for found, expected in zip(store.search_vectors(queries, k=4), flat.search_vectors(queries, k=4)):
+        assert [row for row, _ in found] == [row for row, _ in expected]
+        assert [score for _, score in found] == pytest.approx([score for _, score in expected], abs=1e-6)
+
+
+def test_small_units_fall_back_to_flat_search():
+    vectors, texts, metadatas, centres = articles(chunks=2)
+    store = HierarchicalVectorStore(DeterministicFakeEmbedding(size=DIM), top_units=1)
+    store.add_vectors(vectors, texts, metadatas)
+
+    assert len(store.search_vectors(centres[0], k=5)[0]) == 5
+
+
+def test_delete_rebuilds_the_units():
+    vectors, texts, metadatas, _ = articles(count=3, chunks=2)
+    store = HierarchicalVectorStore(DeterministicFakeEmbedding(size=DIM), top_units=1)
+    ids = store.add_vectors(vectors, texts, metadatas)
+    store.delete(ids[:2])  # all of article 1
+
+    assert list(store.unit_index) == [("gdpr.pdf", "article", "2"), ("gdpr.pdf", "article", "3")]
+    assert store.unit_rows == [[0, 1], [2, 3]]
+
+
+def test_unit_index_is_saved_and_reused(chroma, tmp_path, monkeypatch):
+    path = str(tmp_path / "units.npz")
+    built = HierarchicalVectorStore.from_chroma(chroma, top_units=3, units_path=path)
+
+    def no_rebuild(self, rows):
+        raise AssertionError("unit index rebuilt on a warm start")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(HierarchicalVectorStore, "_index_rows", no_rebuild)
+        loaded = HierarchicalVectorStore.from_chroma(chroma, top_units=3, units_path=path)
+
+    assert loaded.unit_index == built.unit_index
+    assert loaded.unit_rows == built.unit_rows
+    assert np.allclose(loaded.unit_matrix, built.unit_matrix)
+    query = built.matrix[7]
+    assert loaded.search_vectors(query, k=4) == built.search_vectors(query, k=4)
+
+
+def test_unit_index_is_rebuilt_after_changes(chroma, tmp_path, monkeypatch):
+    path = str(tmp_path / "units.npz")
+    HierarchicalVectorStore.from_chroma(chroma, top_units=3, units_path=path)
+    rebuilds = []
+    original = HierarchicalVectorStore._index_rows
+    monkeypatch.setattr(HierarchicalVectorStore, "_index_rows", lambda self, rows: rebuilds.append(1) or original(self, rows))
+
+    # The caller knows the collection changed
+    HierarchicalVectorStore.from_chroma(chroma, top_units=3, units_path=path, rebuild_units=True)
+    # The saved file does not cover the chunks any more
+    chroma._collection.delete(ids=["id-0"])
+    store = HierarchicalVectorStore.from_chroma(chroma, top_units=3, units_path=path)
+
+    assert len(rebuilds) == 2
+    assert sum(map(len, store.unit_rows)) == len(store.ids) == 59
+
+
+def test_coarse_to_fine_needs_float32_storage(chroma):
+    with pytest.raises(ValueError, match="float32"):
+        open_vector_store(chroma, storage="int8", top_units=3)
+    assert isinstance(open_vector_store(chroma, top_units=3), HierarchicalVectorStore)
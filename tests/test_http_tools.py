@@ -0,0 +1,104 @@
+"""Pooled HTTP client for tools (session_a/http_tools.py), against a local stub server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from agentic.session_a.http_tools import ToolHTTPClient, request_deadline
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hit = server.hits[self.path]
+        if self.path == "/slow":
+            time.sleep(2)
+        # /flaky fails once, then works
+        status = 503 if self.path == "/flaky" and hit == 1 else 200
+        body = json.dumps({"path": self.path, "hit": hit}).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (read timeout)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    stub = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    stub.daemon_threads = True
+    stub.lock = threading.Lock()
+    stub.connections = set()
+    stub.hits = {}
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    stub.url = f"http://127.0.0.1:{stub.server_port}"
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+@pytest.fixture
+def client():
+    http = ToolHTTPClient(timeout=(1.0, 0.3), retries=2, backoff=0.01)
+    yield http
+    http.close()
+
+
+def test_retries_after_503(server, client):
+    assert client.get_json(f"{server.url}/flaky") == {"path": "/flaky", "hit": 2}
+
+    stats = client.stats()[f"127.0.0.1:{server.server_port}"]
+    assert (stats["requests"], stats["errors"], stats["retries"]) == (2, 1, 1)
+
+
+def test_read_timeout_raises_within_budget(server, client):
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        client.get(f"{server.url}/slow")
+    elapsed = time.monotonic() - start
+
+    assert server.hits["/slow"] == client.retries + 1
+    assert elapsed < client.total_budget()
+
+
+def test_deadline_stops_retries(server, client):
+    start = time.monotonic()
+    with request_deadline(start + 0.5), pytest.raises(requests.Timeout):
+        client.get(f"{server.url}/slow")
+
+    assert time.monotonic() - start < 0.6
+    assert server.hits["/slow"] < client.retries + 1
+
+
+def test_one_connection_for_many_calls(server, client):
+    for _ in range(20):
+        client.get_json(f"{server.url}/ok")
+
+    assert server.hits["/ok"] == 20
+    assert len(server.connections) == 1
+
+
+def test_per_host_stats(server, client):
+    for _ in range(5):
+        client.get(f"{server.url}/ok")
+
+    stats = client.stats()
+    assert list(stats) == [f"127.0.0.1:{server.server_port}"]
+    host = stats[f"127.0.0.1:{server.server_port}"]
+    assert (host["requests"], host["errors"], host["retries"]) == (5, 0, 0)
+    assert 0 < host["p50_ms"] <= host["p95_ms"] < 1000
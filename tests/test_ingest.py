@@ -0,0 +1,99 @@
+"""Incremental sync of the vector store (session_b/ingest.py), on an in-memory Chroma."""
+
+import itertools
+
+import chromadb
+import pytest
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agentic.session_b import ingest
+
+SOURCE = "docs/regulation.pdf"
+_collections = itertools.count()
+
+
+def new_store():
+    return Chroma(
+        collection_name=f"test-{next(_collections)}",
+        embedding_function=DeterministicFakeEmbedding(size=8),
+        client=chromadb.EphemeralClient(),
+    )
+
+
+def stored(store):
+    """{id: (text, page)} of the whole collection."""
+    data = store.get(include=["documents", "metadatas"])
+    return {i: (text, meta["page"]) for i, text, meta in zip(data["ids"], data["documents"], data["metadatas"])}
+
+
+def test_unchanged_file_is_skipped(pdf):
+    pdf[SOURCE] = [["alpha", "beta"], ["gamma"]]
+    store = new_store()
+    first = ingest.sync_documents(store, [SOURCE])
+    second = ingest.sync_documents(store, [SOURCE])
+
+    assert first["added"] == 3
+    assert second == {**second, "added": 0, "deleted": 0, "unchanged": 3, "skipped_files": 1, "pages": 0}
+
+
+def test_changed_page_sharing_a_chunk_with_an_unchanged_page(pdf):
+    pdf[SOURCE] = [["shared", "alpha"], ["shared", "beta"]]
+    store = new_store()
+    ingest.sync_documents(store, [SOURCE])
+
+    pdf[SOURCE] = [["shared", "gamma"], ["shared", "beta"]]
+    report = ingest.sync_documents(store, [SOURCE])
+
+    assert report["added"] == 2  # only the changed page is embedded
+    assert report["deleted"] == 2
+    assert sorted(stored(store).values()) == [("beta", 1), ("gamma", 0), ("shared", 0), ("shared", 1)]
+
+
+def test_identical_pages_keep_distinct_chunks(pdf):
+    pdf[SOURCE] = [["cover"], ["same"], ["same"]]
+    store = new_store()
+    ingest.sync_documents(store, [SOURCE])
+    assert len(stored(store)) == 3
+
+    pdf[SOURCE] = [["new cover"], ["same"], ["same"]]
+    report = ingest.sync_documents(store, [SOURCE])
+
+    assert report["added"] == 1
+    assert sorted(text for text, _ in stored(store).values()) == ["new cover", "same", "same"]
+
+
+def test_interrupted_sync_is_completed(pdf):
+    pdf[SOURCE] = [["alpha"], ["beta"], ["gamma"]]
+    store = new_store()
+    ingest.sync_documents(store, [SOURCE])
+
+    # Crash after the new chunks were embedded, before stale ones were deleted
+    pdf[SOURCE] = [["alpha"], ["beta"], ["delta"]]
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("interrupted")
+
+    store.delete = crash
+    with pytest.raises(RuntimeError):
+        ingest.sync_documents(store, [SOURCE])
+    del store.delete
+
+    assert len(stored(store)) == 4  # both file versions are in the collection now
+    report = ingest.sync_documents(store, [SOURCE])
+
+    assert report["skipped_files"] == 0
+    assert report["deleted"] == 1
+    assert sorted(stored(store).values()) == [("alpha", 0), ("beta", 1), ("delta", 2)]
+
+
+def test_structural_chunker_reads_unsplit_pages(pdf, monkeypatch):
+    pdf[SOURCE] = [["REGULATION (EU) 2016/679", "Article 1", "Subject-matter and objectives", "1. This Regulation lays down rules."]]
+    calls = []
+    fake = ingest.iter_pdf_pages
+    monkeypatch.setattr(ingest, "iter_pdf_pages", lambda *args, **kwargs: calls.append(kwargs) or fake(*args, **kwargs))
+
+    report = ingest.sync_documents(new_store(), [SOURCE], chunk_size=1000, chunker="structure")
+
+    assert calls == [{"strip_furniture": False, "split": False}]
+    assert report["added"] == 1
@@ -0,0 +1,119 @@
+"""Embedding fast path for obvious tool requests (session_a/intent_router.py)."""
+
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from agentic.common.embeddings import LazyEmbeddings
+from agentic.session_a.intent_router import LLM_ROUTE, IntentRouter
+
+VOCABULARY = ["time", "clock", "weather", "rain", "joke", "funny", "poem", "email", "paris", "write"]
+
+
+class BagOfWords(Embeddings):
+    """Word counts over a fixed vocabulary: similarities are easy to reason about."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(term)) for term in VOCABULARY] + [0.01]  # never all zeros
+
+
+def new_router(embeddings=None, threshold=0.7, margin=0.05):
+    router = IntentRouter(embeddings or BagOfWords(), threshold=threshold, margin=margin)
+    router.add("get_time", ["time", "clock time"])
+    router.add("weather", ["weather", "rain weather"], extract=lambda text: {"city": "Paris"} if "paris" in text.lower() else None)
+    router.add("joke", ["joke", "funny joke"])
+    router.add(LLM_ROUTE, ["write poem", "write email"])
+    return router
+
+
+def test_clear_request_is_routed_with_its_arguments():
+    router = new_router()
+    assert router.route("time?") == ("get_time", {})
+    assert router.route("weather paris") == ("weather", {"city": "Paris"})
+
+
+def test_low_similarity_goes_to_the_llm():
+    assert new_router().route("hello there") is None
+
+
+def test_llm_route_goes_to_the_llm():
+    assert new_router().route("write poem") is None
+
+
+def test_missing_arguments_go_to_the_llm():
+    assert new_router().route("weather") is None  # no city the extract pattern knows
+
+
+def test_close_runner_up_goes_to_the_llm():
+    # Equally close to "time" and "joke"
+    assert new_router(threshold=0.5).route("time joke") is None
+    assert new_router(threshold=0.5, margin=0.0).route("time joke") is not None
+
+
+def test_compound_request_does_not_load_the_model():
+    lazy = LazyEmbeddings(BagOfWords)
+    router = new_router(lazy)
+
+    assert router.route("time and a joke") is None
+    assert not lazy.loaded
+
+
+def test_model_load_is_not_routing_time():
+    def slow_factory():
+        time.sleep(0.3)
+        return BagOfWords()
+
+    router = new_router(LazyEmbeddings(slow_factory))
+    for _ in range(3):
+        router.route("time")
+    stats = router.stats()
+
+    assert stats["warmup_s"] >= 0.3
+    assert stats["routing_ms_per_request"] < 100
+
+
+def test_stats_estimate_the_saved_time():
+    router = new_router()
+    router.route("time")
+    router.route("hello")
+    router.record_llm(1.0)
+    stats = router.stats()
+
+    assert (stats["requests"], stats["without_llm"], stats["mean_llm_s"]) == (2, 0.5, 1.0)
+    assert 0.9 < stats["saved_s"] <= 1.0
+
+
+def test_failing_model_disables_the_router(capsys):
+    def broken():
+        raise OSError("model not available offline")
+
+    router = new_router(LazyEmbeddings(broken))
+    assert router.route("time") is None
+    assert not router.enabled
+    assert router.route("time") is None
+    assert "Intent router disabled" in capsys.readouterr().out
+
+
+def test_lazy_embeddings_load_the_model_once_under_concurrency():
+    loads = []
+
+    def factory():
+        loads.append(1)
+        time.sleep(0.1)
+        return BagOfWords()
+
+    lazy = LazyEmbeddings(factory)
+    threads = [threading.Thread(target=lazy.embed_query, args=("time",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert np.allclose(lazy.embed_query("time"), BagOfWords().embed_query("time"))
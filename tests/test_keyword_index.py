@@ -0,0 +1,79 @@
+"""BM25 inverted index over the law chunks (session_b/keyword_index.py)."""
+
+import math
+import random
+
+import pytest
+
+from agentic.session_b.keyword_index import InvertedIndex, tokenize
+
+TEXTS = [
+    "Processing shall be lawful only if the data subject has given consent (Article 6(1)(a)).",
+    "The controller shall implement appropriate technical and organisational measures.",
+    "Pseudonymisation of personal data can reduce the risks to the data subjects concerned.",
+    "Where processing is based on consent, the controller shall be able to demonstrate consent.",
+]
+
+
+def reference_scores(texts: list[str], query: str, k1: float = 1.5, b: float = 0.75) -> list[float]:
+    """BM25 from the textbook formula, one document at a time."""
+    documents = [tokenize(text) for text in texts]
+    average = max(sum(map(len, documents)) / len(documents), 1)
+    scores = []
+    for tokens in documents:
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in other for other in documents)
+            tf = tokens.count(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / average))
+        scores.append(score)
+    return scores
+
+
+def test_tokenize_keeps_article_references_and_their_prefixes():
+    assert tokenize("Article 6(1)(f) applies to controllers") == ["article", "6(1)(f)", "6(1)", "6", "applie", "controller"]
+    assert tokenize("the processing of data") == ["processing", "data"]
+    assert tokenize("access") == ["access"]  # "ss" is not a plural
+
+
+def test_search_ranks_by_bm25():
+    index = InvertedIndex.build([f"id-{i}" for i in range(len(TEXTS))], TEXTS, [{}] * len(TEXTS))
+
+    numbers = [number for number, _ in index.search("controller consent", k=4)]
+    assert numbers[0] == 3  # the only chunk with both terms
+    assert set(numbers) == {0, 1, 3}
+    assert index.search("6(1)", k=4)[0][0] == 0
+    assert index.search("unknown words", k=4) == []
+
+
+def test_scores_match_the_textbook_formula():
+    rng = random.Random(3)
+    vocabulary = ["controller", "processor", "consent", "data", "erasure", "6(1)(a)", "article"]
+    texts = [" ".join(rng.choices(vocabulary, k=rng.randint(1, 12))) for _ in range(40)]
+    index = InvertedIndex.build([str(i) for i in range(len(texts))], texts, [{}] * len(texts))
+
+    for query in ("consent", "controller erasure", "article 6(1)", "data data processor"):
+        expected = reference_scores(texts, query)
+        results = index.search(query, k=len(texts))
+        assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+        for number, score in results:
+            assert score == pytest.approx(expected[number], rel=1e-5)
+        assert len(results) == sum(score > 0 for score in expected)
+
+
+def test_save_and_load(tmp_path):
+    index = InvertedIndex.build(["a", "b"], TEXTS[:2], [{"page": 1}, {"page": 2}])
+    path = str(tmp_path / "bm25.pkl")
+    index.save(path)
+    loaded = InvertedIndex.load(path)
+
+    assert loaded.ids == ["a", "b"]
+    assert loaded.metadatas == [{"page": 1}, {"page": 2}]
+    assert loaded.search("controller") == index.search("controller")
+
+
+def test_empty_index():
+    assert InvertedIndex.build([], [], []).search("consent") == []
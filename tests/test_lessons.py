@@ -0,0 +1,68 @@
+"""Persistent lesson index (session_b/lessons.py)."""
+
+import json
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agentic.common.embeddings import normalize
+from agentic.session_b.lessons import LessonStore
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=8)
+
+
+def open_store(tmp_path):
+    return LessonStore(EMBEDDINGS, path=str(tmp_path / "lessons"))
+
+
+def assert_pairs_match(store):
+    """Every lesson is indexed under the vector of its own question and text."""
+    for row, (lesson, meta) in enumerate(zip(store.store.texts, store.store.metadatas)):
+        expected = normalize(store.embed(meta["question"], lesson))[0]
+        assert np.allclose(store.store.matrix[row], expected), lesson
+
+
+def test_lessons_survive_a_restart(tmp_path):
+    store = open_store(tmp_path)
+    store.add("What is GDPR?", "Cite the article number.")
+    store.add("Who is a controller?", "Quote Article 4(7).")
+
+    reopened = open_store(tmp_path)
+    assert reopened.store.texts == ["Cite the article number.", "Quote Article 4(7)."]
+    assert_pairs_match(reopened)
+
+
+@pytest.mark.parametrize("ahead", ["vectors", "records", "partial record"])
+def test_file_a_record_ahead_is_truncated(tmp_path, ahead):
+    store = open_store(tmp_path)
+    store.add("q1", "lesson 1")
+    store.add("q2", "lesson 2")
+
+    # An append interrupted between the two files
+    if ahead == "vectors":
+        with open(tmp_path / "lessons.f32", "ab") as f:
+            store.embed("q3", "lost").tofile(f)
+    elif ahead == "records":
+        with open(tmp_path / "lessons.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"question": "q3", "lesson": "lost", "dim": 8}) + "\n")
+    else:
+        with open(tmp_path / "lessons.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"question": "q3", "les')
+
+    reopened = open_store(tmp_path)
+    assert reopened.store.texts == ["lesson 1", "lesson 2"]
+    reopened.add("q4", "lesson 4")
+
+    again = open_store(tmp_path)
+    assert again.store.texts == ["lesson 1", "lesson 2", "lesson 4"]
+    assert_pairs_match(again)
+    assert (tmp_path / "lessons.f32").stat().st_size == 3 * 8 * 4
+
+
+def test_relevant_lessons(tmp_path):
+    store = open_store(tmp_path)
+    assert store.relevant("anything") == []
+    store.add("q1", "lesson 1")
+
+    assert store.relevant("q1\nlesson 1", k=1) == ["lesson 1"]
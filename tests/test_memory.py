@@ -0,0 +1,71 @@
+"""Token-budgeted conversation memory (session_b/memory.py)."""
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from agentic.session_b.memory import MESSAGE_OVERHEAD_TOKENS, TokenBudgetMemory
+
+
+class WordEncoding:
+    """One token per word, instead of a tiktoken download."""
+
+    def encode(self, text):
+        return text.split()
+
+
+class FailingChatModel(FakeListChatModel):
+    def invoke(self, *args, **kwargs):
+        raise TimeoutError("summary call timed out")
+
+
+def new_memory(llm=None, max_tokens=60):
+    memory = TokenBudgetMemory(llm=llm or FakeListChatModel(responses=["summary 1", "summary 2"]), max_tokens=max_tokens)
+    memory._encoding = WordEncoding()
+    return memory
+
+
+def turn(memory, number, words=5):
+    memory.save_context({"input": f"question {number} " + "q " * words}, {"output": f"answer {number} " + "a " * words})
+
+
+def test_no_fold_below_budget():
+    memory = new_memory()
+    turn(memory, 1)
+    turn(memory, 2)
+
+    assert memory.summary == ""
+    assert len(memory.chat_memory.messages) == 4
+
+
+def test_fold_keeps_recent_whole_turns_within_retain_share():
+    memory = new_memory()
+    for number in range(1, 4):  # 22 tokens per turn, the third one goes over 60
+        turn(memory, number)
+
+    messages = memory.chat_memory.messages
+    assert memory.summary == "summary 1"
+    assert messages[0].type == "human"
+    assert memory.count_tokens(messages) <= memory.max_tokens * memory.retain_share
+    assert [m.content.split()[:2] for m in messages] == [["question", "3"], ["answer", "3"]]
+    assert memory.load_memory_variables({})["history"].startswith("System: Summary of the earlier conversation: summary 1")
+
+    # Hysteresis: the next turn fits again without an LLM call
+    turn(memory, 4)
+    assert memory.summary == "summary 1"
+    assert len(memory.chat_memory.messages) == 4
+
+
+def test_count_tokens_adds_the_message_overhead():
+    memory = new_memory()
+    turn(memory, 1, words=0)
+
+    assert memory.count_tokens(memory.chat_memory.messages) == 2 * (2 + MESSAGE_OVERHEAD_TOKENS)
+
+
+def test_failed_summary_keeps_the_messages(capsys):
+    memory = new_memory(llm=FailingChatModel(responses=[]))
+    for number in range(1, 5):
+        turn(memory, number)
+
+    assert memory.summary == ""
+    assert len(memory.chat_memory.messages) == 8
+    assert "Memory not summarised" in capsys.readouterr().out
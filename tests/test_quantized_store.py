@@ -0,0 +1,89 @@
+"""Quantized and dimension-reduced exact search (session_b/quantized_store.py)."""
+
+import os
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agentic.session_b.exact_store import ExactVectorStore
+from agentic.session_b.quantized_store import QuantizedVectorStore
+
+
+@pytest.fixture
+def reference():
+    # 8 latent directions in 32 dimensions, like embeddings a PCA can shrink
+    rng = np.random.default_rng(0)
+    vectors = (rng.normal(size=(300, 8)) @ rng.normal(size=(8, 32)) + rng.normal(0, 0.1, (300, 32))).astype(np.float32)
+    store = ExactVectorStore(DeterministicFakeEmbedding(size=32))
+    store.add_vectors(vectors, [f"chunk {i}" for i in range(len(vectors))], [{"n": i} for i in range(len(vectors))])
+    return store
+
+
+def test_temporary_rescore_file_is_deleted_on_close(reference):
+    store = QuantizedVectorStore.from_exact(reference, "binary")
+    path = store.rescore_path
+    assert os.path.exists(path)
+
+    store.close()
+    assert not os.path.exists(path)
+
+
+def test_temporary_rescore_file_is_deleted_with_the_store(reference):
+    store = QuantizedVectorStore.from_exact(reference, "binary")
+    path = store.rescore_path
+    del store
+    assert not os.path.exists(path)
+
+
+def test_persisted_rescore_file_is_kept(reference, tmp_path):
+    path = str(tmp_path / "f32.npy")
+    store = QuantizedVectorStore.from_exact(reference, "binary", rescore_path=path)
+    store.close()
+
+    assert np.allclose(np.load(path), reference.matrix)
+
+
+@pytest.mark.parametrize(
+    "storage, min_recall, min_compression",
+    [("int8", 0.95, 3.9), ("int8-pca16", 0.9, 5), ("binary", 0.9, 31)],
+)
+def test_recall_and_memory(reference, storage, min_recall, min_compression):
+    store = QuantizedVectorStore.from_exact(reference, storage)
+    queries = reference.matrix[:30] + np.random.default_rng(1).normal(0, 0.05, (30, 32))
+    try:
+        assert store.recall_at_k(reference, queries, k=5) >= min_recall
+        assert store.memory_report()["compression"] >= min_compression
+    finally:
+        store.close()
+
+
+def test_binary_scores_are_full_precision(reference):
+    store = QuantizedVectorStore.from_exact(reference, "binary", rescore_factor=300)
+    query = np.random.default_rng(2).normal(size=32)
+    try:
+        # A shortlist of every row: rescoring gives the exact ranking
+        found, expected = store.search_vectors(query, k=5)[0], reference.search_vectors(query, k=5)[0]
+        assert [row for row, _ in found] == [row for row, _ in expected]
+        assert [score for _, score in found] == pytest.approx([score for _, score in expected], abs=1e-6)
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("storage", ["int8", "binary"])
+def test_filter_delete_and_k_above_the_chunk_count(reference, storage):
+    store = QuantizedVectorStore.from_exact(reference, storage)
+    try:
+        hits = store.search_vectors(reference.matrix[3], k=2, filter={"n": 3})[0]
+        assert [row for row, _ in hits] == [3]
+
+        store.delete([reference.ids[0]])
+        assert len(store.search_vectors(reference.matrix[3], k=1000)[0]) == 299
+        assert store.search_vectors(reference.matrix[3], k=1)[0][0][0] == 2  # row 3 moved up
+    finally:
+        store.close()
+
+
+def test_unknown_storage_is_rejected():
+    with pytest.raises(ValueError, match="Unknown vector storage"):
+        QuantizedVectorStore(DeterministicFakeEmbedding(size=8), "float16")
@@ -0,0 +1,133 @@
+"""Per-regulation centroid router (session_b/router.py)."""
+
+import chromadb
+import numpy as np
+from langchain_community.vectorstores import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.retrievers import BaseRetriever
+
+from agentic.session_b.loader import hash_file
+from agentic.session_b.router import RegulationRouter, RoutedRetriever, collection_name, group_by_regulation
+
+GDPR, CTR, AI_ACT = "2016/679", "536/2014", "2024/1689"
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def router(margin=0.05):
+    routing = RegulationRouter(margin=margin)
+    routing.centroids = {GDPR: unit(1, 0, 0), CTR: unit(0, 1, 0), AI_ACT: unit(0, 0, 1)}
+    return routing
+
+
+def test_collection_name():
+    assert collection_name("law", GDPR) == "law_2016_679"
+
+
+def test_clear_lead_routes_to_one_regulation():
+    assert router().route("who is a controller?", [[0.9, 0.2, 0.1]]) == [GDPR]
+
+
+def test_close_call_searches_every_regulation_best_first():
+    assert router(margin=0.05).route("consent", [[0.6, 0.58, 0.1]]) == [GDPR, CTR, AI_ACT]
+    assert router(margin=0.01).route("consent", [[0.6, 0.58, 0.1]]) == [GDPR]
+
+
+def test_named_regulation_wins_over_the_vector():
+    assert router().route("What does the GDPR say about trials?", [[0, 1, 0]]) == [GDPR]
+    assert router().route("Regulation 536/2014 sponsors", [[1, 0, 0]]) == [CTR]
+
+
+def test_single_or_no_regulation():
+    single = RegulationRouter()
+    assert single.route("anything", [[1, 0]]) == []
+    single.centroids = {GDPR: unit(1, 0)}
+    assert single.route("anything", [[0, 1]]) == [GDPR]
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "router.json")
+    router(margin=0.1).save(path)
+    loaded = RegulationRouter.load(path)
+
+    assert loaded.margin == 0.1
+    assert set(loaded.centroids) == {GDPR, CTR, AI_ACT}
+    assert np.allclose(loaded.centroids[CTR], unit(0, 1, 0))
+    assert RegulationRouter.load(str(tmp_path / "missing.json")).centroids == {}
+
+
+def test_centroid_is_the_mean_of_the_normalised_vectors():
+    store = Chroma(collection_name="router-test", embedding_function=DeterministicFakeEmbedding(size=4), client=chromadb.EphemeralClient())
+    store.add_texts(["a", "b"], ids=["1", "2"])
+    routing = RegulationRouter()
+    routing.update(GDPR, store)
+
+    vectors = np.asarray(DeterministicFakeEmbedding(size=4).embed_documents(["a", "b"]))
+    mean = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).mean(axis=0)
+    assert np.allclose(routing.centroids[GDPR], mean / np.linalg.norm(mean), atol=1e-6)
+
+    store.delete(ids=["1", "2"])
+    routing.update(GDPR, store)
+    assert GDPR not in routing.centroids
+
+
+def test_known_files_are_grouped_without_opening_them(tmp_path):
+    paths = []
+    for name in ("gdpr.pdf", "ctr.pdf"):
+        path = tmp_path / name
+        path.write_bytes(b"not a pdf: " + name.encode())
+        paths.append(str(path))
+    known = {hash_file(paths[0]): GDPR, hash_file(paths[1]): CTR}
+
+    assert group_by_regulation(paths, known) == {GDPR: [paths[0]], CTR: [paths[1]]}
+
+
+class FixedRetriever(BaseRetriever):
+    name: str
+    depth: int = 3
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return [Document(page_content=f"{self.name}-{n}") for n in range(self.depth)]
+
+
+class QueryEmbeddings:
+    """The query vector comes from a fixed table; prime_queries is a no-op."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def prime_queries(self, texts):
+        pass
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+
+def routed_retriever(retrievers, k=None):
+    embeddings = QueryEmbeddings({"gdpr question": [1, 0, 0], "unclear": [0.6, 0.58, 0.1], "ai question": [0, 0, 1]})
+    return RoutedRetriever(router=router(), retrievers=retrievers, embeddings=embeddings, k=k)
+
+
+def test_routed_retriever_searches_only_the_routed_collection():
+    retriever = routed_retriever({GDPR: FixedRetriever(name="gdpr"), CTR: FixedRetriever(name="ctr")})
+
+    assert [d.page_content for d in retriever.invoke("gdpr question")] == ["gdpr-0", "gdpr-1", "gdpr-2"]
+    assert retriever.last_route == [GDPR]
+
+
+def test_routed_retriever_interleaves_by_rank():
+    retriever = routed_retriever({GDPR: FixedRetriever(name="gdpr"), CTR: FixedRetriever(name="ctr", depth=1)}, k=3)
+
+    assert [d.page_content for d in retriever.invoke("unclear")] == ["gdpr-0", "ctr-0", "gdpr-1"]
+
+
+def test_routed_retriever_falls_back_to_every_collection():
+    # The AI Act has a centroid but no retriever (collection not loaded)
+    retriever = routed_retriever({GDPR: FixedRetriever(name="gdpr", depth=1), CTR: FixedRetriever(name="ctr", depth=1)}, k=2)
+
+    assert [d.page_content for d in retriever.invoke("ai question")] == ["gdpr-0", "ctr-0"]
+    assert retriever.last_route == [GDPR, CTR]
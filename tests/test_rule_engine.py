@@ -0,0 +1,107 @@
+"""Aho-Corasick rule matcher and hot-reloaded rule file (session_a/rule_engine.py)."""
+
+import json
+import os
+import random
+import time
+
+from agentic.session_a.rule_engine import Rule, RuleEngine, RuleMatcher
+
+
+def rule(keyword, response=None, priority=0, whole_word=True) -> Rule:
+    return Rule(keyword=keyword, response=response or keyword, priority=priority, whole_word=whole_word)
+
+
+def reference_match(rules: list[Rule], text: str) -> Rule | None:
+    """Naive scan with the same semantics: every occurrence, best (priority, order) wins."""
+    text = text.lower()
+
+    def found(r):
+        keyword = r["keyword"].lower()
+        for start in range(len(text) - len(keyword) + 1):
+            if not text.startswith(keyword, start):
+                continue
+            end = start + len(keyword)
+            before = start > 0 and (text[start - 1].isalnum() or text[start - 1] == "_")
+            after = end < len(text) and (text[end].isalnum() or text[end] == "_")
+            if not r["whole_word"] or not (before or after):
+                return True
+        return False
+
+    candidates = [(-r["priority"], i) for i, r in enumerate(rules) if found(r)]
+    return rules[min(candidates)[1]] if candidates else None
+
+
+def test_priority_then_rule_order():
+    matcher = RuleMatcher([rule("bye"), rule("hello"), rule("weather", priority=5), rule("hello there", priority=5)])
+
+    assert matcher.match("Hello and bye")["keyword"] == "bye"
+    assert matcher.match("hello there, what weather?")["keyword"] == "weather"
+    assert matcher.match("nothing to see") is None
+
+
+def test_whole_word_and_substring_rules():
+    matcher = RuleMatcher([rule("hi"), rule("cat", whole_word=False)])
+
+    assert matcher.match("this is it") is None
+    assert matcher.match("hi!")["keyword"] == "hi"
+    assert matcher.match("concatenate")["keyword"] == "cat"
+    assert matcher.match("snake_hi") is None  # "_" is a word character
+
+
+def test_overlapping_keywords_are_all_seen():
+    # "she" ends inside "ushers"; "he" and "hers" are suffixes found through failure links
+    matcher = RuleMatcher([rule("he", whole_word=False), rule("she", whole_word=False),
+                           rule("hers", priority=1, whole_word=False), rule("his", whole_word=False)])
+
+    assert matcher.match("ushers")["keyword"] == "hers"
+
+
+def test_matches_a_naive_scan():
+    rng = random.Random(7)
+    keywords = ["ab", "abc", "bc", "c", "hi", "this", "is", "his", "a b", "b c"]
+    words = ["abc", "this", "hi", "a", "b", "c", "his", "bc"]
+    for _ in range(2000):
+        rules = [rule(rng.choice(keywords), str(i), rng.randint(0, 3), rng.random() < 0.5) for i in range(rng.randint(0, 6))]
+        text = " ".join(rng.choices(words, k=rng.randint(0, 6)))
+        assert RuleMatcher(rules).match(text) is reference_match(rules, text), (rules, text)
+
+
+def write_rules(path, rules):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in rules)
+    # A distinct mtime even on filesystems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def wait_for_reloads(engine, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while engine.reloads < count and time.monotonic() < deadline:
+        engine.match("")
+        time.sleep(0.01)
+    return engine.reloads
+
+
+def test_rule_file_is_hot_reloaded(tmp_path):
+    path = str(tmp_path / "rules.jsonl")
+    write_rules(path, [rule("hello", "Hi!")])
+    engine = RuleEngine(path, check_interval=0)
+    assert engine.match("hello there")["response"] == "Hi!"
+
+    write_rules(path, [rule("hello", "Hi!"), rule("hello there", "Hello to you", priority=1)])
+    assert wait_for_reloads(engine, 2) == 2
+    assert engine.match("hello there")["response"] == "Hello to you"
+
+
+def test_broken_rule_file_keeps_the_current_rules(tmp_path, capsys):
+    path = str(tmp_path / "rules.jsonl")
+    write_rules(path, [rule("hello", "Hi!")])
+    engine = RuleEngine(path, check_interval=0)
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"keyword": broken\n')
+    engine.reload_if_changed()
+
+    assert engine.match("hello")["response"] == "Hi!"
+    assert "Rules not reloaded" in capsys.readouterr().out
@@ -0,0 +1,89 @@
+"""Sharded SQLite session memory (session_b/session_store.py)."""
+
+import threading
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agentic.session_b.session_store import SessionStore
+
+
+class WordEncoding:
+    """One token per word, instead of a tiktoken download."""
+
+    def encode(self, text):
+        return text.split()
+
+
+def contents(history):
+    return [message.content for message in history.messages]
+
+
+def exchange(number):
+    return [HumanMessage(content=f"question {number}"), AIMessage(content=f"answer {number}")]
+
+
+def test_messages_survive_a_reopen(tmp_path):
+    store = SessionStore(str(tmp_path), shards=4)
+    store.history("alice").add_messages(exchange(1))
+    store.history("alice").add_messages(exchange(2))
+    store.close()
+
+    reopened = SessionStore(str(tmp_path), shards=4)
+    history = reopened.history("alice")
+    assert contents(history) == ["question 1", "answer 1", "question 2", "answer 2"]
+    assert [m.type for m in history.messages] == ["human", "ai", "human", "ai"]
+
+
+def test_sessions_are_isolated(tmp_path):
+    # One shard: both sessions share the same file
+    store = SessionStore(str(tmp_path), shards=1)
+    store.history("alice").add_messages(exchange(1))
+    store.history("bob").add_messages(exchange(2))
+    store.history("bob").clear()
+
+    assert contents(store.history("alice")) == ["question 1", "answer 1"]
+    assert contents(store.history("bob")) == []
+
+
+def test_window_keeps_the_latest_messages(tmp_path):
+    store = SessionStore(str(tmp_path), window=3)
+    history = store.history("alice")
+    for number in range(1, 4):
+        history.add_messages(exchange(number))
+
+    assert contents(history) == ["answer 2", "question 3", "answer 3"]
+    assert contents(store.history("alice")) == ["answer 2", "question 3", "answer 3"]
+
+
+def test_folded_summary_and_window_persist(tmp_path):
+    store = SessionStore(str(tmp_path))
+    memory = store.memory("alice", FakeListChatModel(responses=["alice asked three questions"]), max_tokens=25)
+    memory._encoding = WordEncoding()
+    for number in range(1, 4):  # 6 tokens per message: the third exchange folds
+        memory.save_context({"input": f"question {number}"}, {"output": f"answer {number}"})
+    assert memory.summary == "alice asked three questions"
+    window = contents(memory.chat_memory)
+
+    reopened = SessionStore(str(tmp_path)).memory("alice", FakeListChatModel(responses=[]))
+    assert reopened.summary == "alice asked three questions"
+    assert contents(reopened.chat_memory) == window == ["question 3", "answer 3"]
+
+
+def test_concurrent_writers(tmp_path):
+    store = SessionStore(str(tmp_path), shards=2)
+
+    def chat(user):
+        for number in range(20):
+            store.history(user).add_messages(exchange(number))
+        store.close()
+
+    threads = [threading.Thread(target=chat, args=(f"user-{n}",)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for n in range(6):
+        assert contents(store.history(f"user-{n}"))[-2:] == ["question 19", "answer 19"]
+        assert len(store.history(f"user-{n}").messages) == 40
@@ -0,0 +1,16 @@
+"""Shared latency percentile (common/stats.py)."""
+
+import random
+
+import numpy as np
+import pytest
+
+from agentic.common.stats import percentile
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 100, 1001])
+@pytest.mark.parametrize("q", [1, 50, 95, 99])
+def test_percentile_matches_numpy(size, q):
+    rng = random.Random(size)
+    values = [rng.random() for _ in range(size)]
+    assert percentile(values, q) == pytest.approx(float(np.percentile(values, q)))
@@ -0,0 +1,90 @@
+"""Article-aware structural chunker and direct article lookup (session_b/structure.py)."""
+
+import pytest
+from langchain_core.documents import Document
+
+from agentic.session_b.structure import ArticleLookup, iter_structured_chunks, regulation_id
+
+LONG_PARAGRAPH = "Personal data shall be processed lawfully. " * 40
+PAGES = [
+    (0, """REGULATION (EU) 2016/679 OF THE EUROPEAN PARLIAMENT AND OF THE COUNCIL
+of 27 April 2016
+Whereas:
+(1) The protection of natural persons is a fundamental right.
+(2) The principles should respect their fundamental rights,
+whatever their nationality.
+HAVE ADOPTED THIS REGULATION:
+CHAPTER I
+General provisions
+Article 1
+Subject-matter and objectives
+1. This Regulation lays down rules.
+2. This Regulation protects fundamental rights.
+4.5.2016 L 119/1 Official Journal of the European Union
+(1) OJ C 229, 31.7.2012, p. 90."""),
+    (1, f"""Article 2
+Material scope
+1. This Regulation applies to the processing of personal data.
+CHAPTER II
+Principles
+Article 3
+Principles relating to processing
+1. {LONG_PARAGRAPH}
+2. The controller shall be responsible."""),
+]
+
+
+@pytest.fixture(scope="module")
+def chunks():
+    return list(iter_structured_chunks(PAGES, "gdpr.pdf", max_chars=400))
+
+
+def test_regulation_id():
+    assert regulation_id("REGULATION (EU) No 536/2014 OF THE EUROPEAN\nPARLIAMENT") == "536/2014"
+    assert regulation_id("Directive 95/46/EC") is None
+
+
+def test_recitals_are_one_chunk_each(chunks):
+    recitals = [(text, meta) for text, meta in chunks if "recital" in meta]
+
+    assert [text for text, _ in recitals] == [
+        "Recital (1)\nThe protection of natural persons is a fundamental right.",
+        "Recital (2)\nThe principles should respect their fundamental rights, whatever their nationality.",
+    ]
+    assert all(meta["regulation"] == "2016/679" and meta["page"] == 0 for _, meta in recitals)
+
+
+def test_small_paragraphs_are_merged_without_page_furniture(chunks):
+    text, meta = next((text, meta) for text, meta in chunks if meta.get("article") == 1)
+
+    assert text == (
+        "Article 1 — Subject-matter and objectives\n"
+        "1. This Regulation lays down rules.\n"
+        "2. This Regulation protects fundamental rights."
+    )
+    assert (meta["chapter"], meta["paragraph_start"], meta["paragraph_end"]) == ("I", 1, 2)
+
+
+def test_long_paragraphs_are_split_and_keep_their_header(chunks):
+    article_3 = [(text, meta) for text, meta in chunks if meta.get("article") == 3]
+
+    assert len(article_3) > 2
+    assert all(text.startswith("Article 3 — Principles relating to processing\n") for text, _ in article_3)
+    assert all(len(text.split("\n", 1)[1]) <= 400 for text, _ in article_3)
+    assert {meta["chapter"] for _, meta in article_3} == {"II"}
+    assert article_3[-1] == (
+        "Article 3 — Principles relating to processing\n2. The controller shall be responsible.",
+        {"source": "gdpr.pdf", "page": 1, "regulation": "2016/679", "chapter": "II", "article": 3,
+         "paragraph_start": 2, "paragraph_end": 2},
+    )
+
+
+def test_lookup_by_article_paragraph_and_recital(chunks):
+    lookup = ArticleLookup.from_documents(Document(page_content=text, metadata=meta) for text, meta in chunks)
+
+    paragraph = lookup.match("What does Article 3(2) of the GDPR say?")
+    assert [doc.page_content.split("\n", 1)[1] for doc in paragraph] == ["2. The controller shall be responsible."]
+    assert len(lookup.match("Article 3")) == sum(meta.get("article") == 3 for _, meta in chunks)
+    assert lookup.match("tell me about recital 2")[0].metadata["recital"] == 2
+    assert lookup.match("Article 99") is None
+    assert lookup.match("what is consent?") is None
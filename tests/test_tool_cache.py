@@ -0,0 +1,167 @@
+"""TTL / stale-while-revalidate cache of tool results (session_a/tool_cache.py)."""
+
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from agentic.session_a import tool_cache
+from agentic.session_a.tool_cache import ToolCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Tool:
+    """Counts its runs and returns "<answer> #<run>"."""
+
+    def __init__(self, answer="sunny"):
+        self.answer = answer
+        self.runs = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.release.wait(5)
+        self.runs += 1
+        return f"{self.answer} #{self.runs}"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+def test_fresh_hit_does_not_run_the_tool(clock):
+    cache, tool = ToolCache(), Tool()
+    first = cache.call("weather", tool, {"city": "Athens"}, ttl=60)
+    clock.now += 59
+    second = cache.call("weather", tool, {"city": "Athens"}, ttl=60)
+
+    assert first == second == "sunny #1"
+    assert cache.stats() == {"weather": {"hits": 1, "stale_hits": 0, "misses": 1, "refreshes": 0}}
+
+
+def test_key_function_and_arguments(clock):
+    cache, tool = ToolCache(), Tool()
+
+    def key(arguments):
+        return arguments["city"].strip().lower()
+
+    cache.call("weather", tool, {"city": "Athens"}, ttl=60, key=key)
+    cache.call("weather", tool, {"city": " athens "}, ttl=60, key=key)
+    cache.call("weather", tool, {"city": "Paris"}, ttl=60, key=key)
+
+    assert tool.runs == 2
+
+
+def test_stale_hit_is_served_and_refreshed_once(clock):
+    cache, tool = ToolCache(), Tool()
+    cache.call("weather", tool, {}, ttl=60, stale_ttl=600)
+    clock.now += 120
+
+    tool.release.clear()  # hold the background refresh
+    assert cache.call("weather", tool, {}, ttl=60, stale_ttl=600) == "sunny #1"
+    assert cache.call("weather", tool, {}, ttl=60, stale_ttl=600) == "sunny #1"
+    tool.release.set()
+    cache.close()  # waits for the refresh
+
+    assert tool.runs == 2
+    assert cache.call("weather", tool, {}, ttl=60, stale_ttl=600) == "sunny #2"
+    assert cache.stats()["weather"] == {"hits": 1, "stale_hits": 2, "misses": 1, "refreshes": 1}
+
+
+def test_too_stale_runs_the_tool(clock):
+    cache, tool = ToolCache(), Tool()
+    cache.call("weather", tool, {}, ttl=60, stale_ttl=600)
+    clock.now += 661
+
+    assert cache.call("weather", tool, {}, ttl=60, stale_ttl=600) == "sunny #2"
+    assert cache.stats()["weather"]["misses"] == 2
+
+
+def test_errors_are_not_cached(clock):
+    cache, tool = ToolCache(), Tool("⚠️ API down")
+
+    def not_an_error(result):
+        return not result.startswith("⚠️")
+
+    cache.call("weather", tool, {}, ttl=60, should_cache=not_an_error)
+    cache.call("weather", tool, {}, ttl=60, should_cache=not_an_error)
+
+    assert tool.runs == 2
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache, tool = ToolCache(max_entries=2), Tool()
+    for city in ("Athens", "Paris", "Athens", "Rome"):
+        cache.call("weather", tool, {"city": city}, ttl=60)
+    assert tool.runs == 3
+
+    cache.call("weather", tool, {"city": "Athens"}, ttl=60)  # still cached
+    cache.call("weather", tool, {"city": "Paris"}, ttl=60)  # evicted by Rome
+    assert tool.runs == 4
+
+
+def test_disk_tier_survives_a_restart(clock, tmp_path):
+    path = str(tmp_path / "tools.sqlite")
+    cache, tool = ToolCache(disk_path=path), Tool()
+    cache.call("wikipedia_search", tool, {"topic": "GDPR"}, ttl=3600)
+    cache.close()
+
+    restarted = ToolCache(disk_path=path)
+    clock.now += 10
+    assert restarted.call("wikipedia_search", tool, {"topic": "GDPR"}, ttl=3600) == "sunny #1"
+    assert tool.runs == 1
+    restarted.close()
+
+
+def disk_keys(path):
+    with sqlite3.connect(path) as db:
+        return sorted(key for (key,) in db.execute("SELECT key FROM results"))
+
+
+def test_expired_disk_rows_are_purged_on_open(clock, tmp_path):
+    path = str(tmp_path / "tools.sqlite")
+    cache, tool = ToolCache(disk_path=path), Tool()
+    cache.call("weather", tool, {"city": "Athens"}, ttl=60, stale_ttl=30)
+    cache.call("wikipedia_search", tool, {"topic": "GDPR"}, ttl=3600)
+    cache.close()
+
+    clock.now += 91
+    ToolCache(disk_path=path).close()
+    assert disk_keys(path) == ['wikipedia_search:{"topic": "GDPR"}']
+
+
+def test_expired_disk_rows_are_purged_while_running(clock, tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_cache, "PURGE_EVERY_WRITES", 2)
+    path = str(tmp_path / "tools.sqlite")
+    cache, tool = ToolCache(disk_path=path), Tool()
+    cache.call("weather", tool, {"city": "Athens"}, ttl=60)
+    clock.now += 61
+    cache.call("weather", tool, {"city": "Paris"}, ttl=60)  # second write: purge
+
+    assert disk_keys(path) == ['weather:{"city": "Paris"}']
+    cache.close()
+
+
+def test_table_without_expiry_is_migrated(clock, tmp_path):
+    path = str(tmp_path / "tools.sqlite")
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE results (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)")
+        db.execute("INSERT INTO results VALUES ('weather:old', '\"rain\"', 1.0)")
+    db.close()
+
+    cache, tool = ToolCache(disk_path=path), Tool()
+    assert disk_keys(path) == []
+    cache.call("weather", tool, {"city": "Athens"}, ttl=60)
+    assert cache.call("weather", tool, {"city": "Athens"}, ttl=60) == "sunny #1"
+    cache.close()
@@ -0,0 +1,84 @@
+"""Warm start from the persisted collection and its manifest (session_b/warm_start.py)."""
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agentic.session_b import loader
+from agentic.session_b.router import group_by_regulation
+from agentic.session_b.warm_start import known_regulations, open_or_ingest, read_manifest
+
+SOURCE = "docs/regulation.pdf"
+EMBEDDINGS = DeterministicFakeEmbedding(size=8)
+
+
+def start(persist_directory, on_ingested=None, model="model-a"):
+    return open_or_ingest(
+        persist_directory, "law_test", EMBEDDINGS, model, [SOURCE], regulation="2016/679", on_ingested=on_ingested
+    )
+
+
+def test_second_start_is_warm(pdf, tmp_path):
+    pdf[SOURCE] = [["alpha", "beta"], ["gamma"]]
+    persist_directory = str(tmp_path / "chroma_db")
+    derived = []
+
+    store, report = start(persist_directory, lambda store, report: derived.append(report["added"]))
+    assert report["added"] == 3 and derived == [3]
+
+    store, report = start(persist_directory, lambda store, report: derived.append(report["added"]))
+    assert report is None
+    assert derived == [3]  # nothing to rebuild on a warm start
+    assert store._collection.count() == 3
+    assert set(known_regulations(persist_directory).values()) == {"2016/679"}
+
+
+def test_crash_before_the_derived_indexes_are_saved_is_not_warm(pdf, tmp_path):
+    pdf[SOURCE] = [["alpha"], ["beta"]]
+    persist_directory = str(tmp_path / "chroma_db")
+    start(persist_directory)
+
+    pdf[SOURCE] = [["alpha"], ["delta"]]
+
+    def crash(store, report):
+        raise RuntimeError("interrupted while building the BM25 index")
+
+    with pytest.raises(RuntimeError):
+        start(persist_directory, crash)
+    assert read_manifest(persist_directory, "law_test") is None
+
+    # The next start ingests again (nothing left to embed) and rebuilds the derived indexes
+    rebuilt = []
+    _, report = start(persist_directory, lambda store, report: rebuilt.append(report))
+    assert report is not None and rebuilt == [report]
+    assert read_manifest(persist_directory, "law_test") is not None
+
+
+def test_other_model_rebuilds_the_collection(pdf, tmp_path):
+    pdf[SOURCE] = [["alpha", "beta"]]
+    persist_directory = str(tmp_path / "chroma_db")
+    start(persist_directory)
+
+    store, report = start(persist_directory, model="model-b")
+    assert report["added"] == 2
+    assert read_manifest(persist_directory, "law_test")["model"] == "model-b"
+
+
+def test_each_file_is_hashed_once_per_start(pdf, tmp_path, monkeypatch):
+    pdf[SOURCE] = [["alpha", "beta"]]
+    persist_directory = str(tmp_path / "chroma_db")
+    start(persist_directory)
+
+    hashed = []
+    fake = loader.hash_file
+    monkeypatch.setattr(loader, "hash_file", lambda path: hashed.append(path) or fake(path))
+    monkeypatch.setattr("agentic.session_b.router.hash_file", loader.hash_file)
+
+    # Same sequence as ex1: hash, group by the manifests' regulations, open
+    file_hashes = loader.hash_files([SOURCE])
+    groups = group_by_regulation([SOURCE], known_regulations(persist_directory), file_hashes)
+    _, report = open_or_ingest(
+        persist_directory, "law_test", EMBEDDINGS, "model-a", groups["2016/679"], regulation="2016/679", file_hashes=file_hashes
+    )
+
+    assert report is None
+    assert hashed == [SOURCE]
@@ -0,0 +1,87 @@
+"""Cross-reference extraction and one-hop expansion (session_b/xref_graph.py)."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from agentic.session_b.structure import ArticleLookup
+from agentic.session_b.xref_graph import MAX_RANGE, CrossReferenceGraph, CrossReferenceRetriever, extract_references
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("the conditions referred to in Article 6(1)", {6: {1}}),
+        ("point (a) of Article 6(1)(a)", {6: {1}}),
+        ("Articles 13 and 14", {13: set(), 14: set()}),
+        ("Articles 8, 11 or 42", {8: set(), 11: set(), 42: set()}),
+        ("Articles 15 to 18", {15: set(), 16: set(), 17: set(), 18: set()}),
+        ("Article 5(1) and Article 5(2)", {5: {1, 2}}),
+        ("Article 12 of this Regulation", {12: set()}),
+        ("no reference here", {}),
+    ],
+)
+def test_extract_references(text, expected):
+    assert extract_references(text) == expected
+
+
+def test_whole_article_wins_over_paragraphs():
+    assert extract_references("Article 5(1) and Article 5") == {5: set()}
+
+
+def test_references_to_other_acts_are_ignored():
+    text = "Article 4 of Directive 95/46/EC, Article 16 TFEU and Article 9"
+    assert extract_references(text) == {9: set()}
+
+
+def test_long_ranges_are_not_expanded():
+    assert extract_references(f"Articles 1 to {MAX_RANGE + 2}") == {1: set()}
+
+
+def test_graph_save_and_load(tmp_path):
+    graph = CrossReferenceGraph()
+    graph.edges = {"gdpr": {7: {6: [1]}, 15: {12: []}}}
+    path = str(tmp_path / "xref.json")
+    graph.save(path)
+
+    assert CrossReferenceGraph.load(path).edges == graph.edges
+    assert CrossReferenceGraph.load(str(tmp_path / "missing.json")).edges == {}
+
+
+class FixedRetriever(BaseRetriever):
+    """The hit of each query: "article N" -> that article's chunk."""
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        article = int(query.split()[-1])
+        return [Document(page_content=f"Article {article}", metadata={"regulation": "gdpr", "article": article})]
+
+
+def expansion_retriever(max_articles):
+    graph = CrossReferenceGraph()
+    graph.edges = {"gdpr": {1: {2: [], 3: [], 4: []}, 10: {11: [], 12: []}}}
+    lookup = ArticleLookup.from_documents(
+        Document(page_content=f"Article {n}", metadata={"regulation": "gdpr", "article": n}) for n in (2, 3, 4, 11, 12)
+    )
+    return CrossReferenceRetriever(graph=graph, lookup=lookup, retriever=FixedRetriever(), max_articles=max_articles)
+
+
+def test_expansion_is_capped_per_query():
+    retriever = expansion_retriever(max_articles=2)
+    docs = retriever.invoke("article 1")
+
+    assert [doc.metadata["article"] for doc in docs] == [1, 2, 3]
+    assert docs[1].metadata["referenced_by"] == 1
+    assert retriever.last_expanded == ["gdpr Article 1 -> 2", "gdpr Article 1 -> 3"]
+
+
+def test_concurrent_queries_do_not_share_expansions():
+    retriever = expansion_retriever(max_articles=2)
+    queries = ["article 1", "article 10"] * 50
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(retriever.invoke, queries))
+
+    for query, docs in zip(queries, results):
+        expected = [1, 2, 3] if query == "article 1" else [10, 11, 12]
+        assert [doc.metadata["article"] for doc in docs] == expected